@@ -1,13 +1,61 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 
 class Settings(BaseSettings):
 	app_name: str = "FastAPI CRUD"
 	debug: bool = True
 	database_url: str = "sqlite:///fastapi.db"
+	# Serve requests from an AsyncSession (aiosqlite) instead of the sync engine + thread pool
+	db_async: bool = False
+	# Defaults to database_url with the aiosqlite driver
+	async_database_url: Optional[str] = None
 	cors_allow_origins: List[str] = ["http://localhost:3000", "*"]
+	# Answer transaction `q` searches from the FTS5 index (falls back to LIKE when disabled)
+	transaction_fts_enabled: bool = True
+	# Serve /transactions/summary from transaction_daily_rollup for spans of at least summary_rollup_min_days whole days
+	transaction_rollup_enabled: bool = True
+	summary_rollup_min_days: int = 31
+	# Store money as integer cents and quantities as integer thousandths instead of NUMERIC/REAL
+	# (switch an existing database with scripts/migrate_fixed_point.py)
+	fixed_point_storage: bool = False
+	# Render responses with orjson (a pinned dependency; falls back to the stdlib encoder if it cannot be imported)
+	orjson_responses: bool = True
+	# Seconds between inventory_snapshots taken by the background job (0 disables it)
+	inventory_snapshot_interval: float = 86400.0
+	# Report each request's statement count and DB time in a Server-Timing header
+	server_timing: bool = True
+	# Serve GET /metrics (Prometheus text format) and record per-route request metrics
+	metrics_enabled: bool = True
+	# Opt-in request profiling: profile a request sent with `X-Profile: 1` (or `?profile=1`; the value may
+	# also name a format), plus 1 in N requests per route template in profile_sample_rates,
+	# e.g. PROFILE_SAMPLE_RATES='{"/transactions/search": 100}'
+	# (also serves the /admin/profiles and /admin/memory routes)
+	profiling_enabled: bool = False
+	profile_dir: str = "profiles"
+	profile_format: Literal["pstats", "collapsed"] = "pstats"
+	profile_sample_rates: Dict[str, int] = {}
+	# Newest profile files kept in profile_dir (older ones are deleted)
+	profile_keep: int = 50
+	# Stack sampling period of the collapsed (flamegraph) format
+	profile_sample_interval_ms: float = 1.0
+	# tracemalloc snapshots kept by /admin/memory (oldest dropped first)
+	memory_snapshot_limit: int = 10
+	# Log statements slower than this many milliseconds, with their EXPLAIN QUERY PLAN (0 disables)
+	slow_query_ms: float = 250.0
+	# Maximum rows accepted by one bulk ingestion / upsert request
+	bulk_max_rows: int = 50000
+	# Rows fetched and written per chunk by the streaming transaction export
+	export_batch_size: int = 1000
+	# SQLite PRAGMAs applied to every new pooled connection (see app/db/session.py)
+	sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+	sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+	sqlite_cache_size: int = -64000  # negative = KiB, positive = pages
+	sqlite_mmap_size: int = 268435456  # bytes; 0 disables memory-mapped I/O
+	sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+	sqlite_busy_timeout_ms: int = 5000
+	sqlite_foreign_keys: bool = True
 
 	@field_validator("cors_allow_origins", mode="before")
 	def ensure_list(cls, v):  # type: ignore[override]
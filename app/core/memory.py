@@ -0,0 +1,137 @@
+import gc
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+from app.core.config import settings
+
+# Allocations made by tracemalloc itself and by the import machinery are noise in every diff
+NOISE = (
+	tracemalloc.Filter(False, tracemalloc.__file__),
+	tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+	tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+	tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryTracer:
+	"""tracemalloc shared by the admin session and per-request peak measurements.
+
+	Tracing runs while the admin session is on or a request is being measured, whichever
+	lasts longer, so a measured request never stops a session (or the reverse). Only
+	touched from the event loop.
+	"""
+
+	def __init__(self):
+		self.session = False
+		self.measuring = 0
+		self.snapshots: "OrderedDict[str, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+		self.requests: Deque[dict] = deque(maxlen=100)
+
+	def _acquire(self, frames: int = 1) -> None:
+		if not tracemalloc.is_tracing():
+			tracemalloc.start(frames)
+
+	def _release(self) -> None:
+		if not self.session and not self.measuring and tracemalloc.is_tracing():
+			tracemalloc.stop()
+
+	def start(self, frames: int = 1) -> None:
+		self._acquire(frames)
+		self.session = True
+
+	def stop(self) -> None:
+		"""End the session; snapshots already taken are kept for diffing."""
+		self.session = False
+		self._release()
+
+	def status(self) -> dict:
+		current, peak = tracemalloc.get_traced_memory()
+		return {
+			"tracing": tracemalloc.is_tracing(),
+			"session": self.session,
+			"frames": tracemalloc.get_traceback_limit(),
+			"traced_bytes": current,
+			"peak_bytes": peak,
+			"tracemalloc_bytes": tracemalloc.get_tracemalloc_memory(),
+			"snapshots": [self.describe(name) for name in self.snapshots],
+		}
+
+	def check_snapshot(self, name: str) -> None:
+		"""Raise RuntimeError without a running session, KeyError if `name` is taken."""
+		if not self.session:
+			raise RuntimeError("tracemalloc session is not running")
+		if name in self.snapshots:
+			raise KeyError(name)
+
+	def add_snapshot(self, name: str, snapshot: tracemalloc.Snapshot) -> dict:
+		"""Store a snapshot from `capture_snapshot`; checked again since capturing may have yielded the loop."""
+		self.check_snapshot(name)
+		self.snapshots[name] = (datetime.now(), snapshot)
+		while len(self.snapshots) > max(settings.memory_snapshot_limit, 1):
+			self.snapshots.popitem(last=False)
+		return self.describe(name)
+
+	def take_snapshot(self, name: str) -> dict:
+		self.check_snapshot(name)
+		return self.add_snapshot(name, capture_snapshot())
+
+	def describe(self, name: str) -> dict:
+		taken, snapshot = self.snapshots[name]
+		return {
+			"name": name,
+			"taken": taken,
+			"traced_bytes": sum(trace.size for trace in snapshot.traces),
+			"blocks": len(snapshot.traces),
+		}
+
+	def top(self, name: str, group_by: str = "lineno", limit: int = 20) -> List[dict]:
+		_, snapshot = self.snapshots[name]
+		return [allocation(stat.traceback, stat.size, stat.count) for stat in snapshot.statistics(group_by)[:limit]]
+
+	def diff(self, base: str, target: str, group_by: str = "lineno", limit: int = 20) -> List[dict]:
+		"""Allocation sites ordered by how much their live memory changed from `base` to `target`."""
+		stats = self.snapshots[target][1].compare_to(self.snapshots[base][1], group_by)
+		return [
+			allocation(stat.traceback, stat.size, stat.count, stat.size_diff, stat.count_diff)
+			for stat in stats[:limit]
+		]
+
+	def begin_request(self) -> int:
+		"""Start measuring one request's peak; returns the baseline to pass to `request_peak`."""
+		self._acquire()
+		self.measuring += 1
+		tracemalloc.reset_peak()
+		return tracemalloc.get_traced_memory()[0]
+
+	def request_peak(self, baseline: int) -> int:
+		return max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+	def end_request(self, baseline: int, **labels) -> int:
+		peak = self.request_peak(baseline)
+		self.measuring -= 1
+		self._release()
+		self.requests.appendleft({**labels, "peak_bytes": peak, "finished": datetime.now()})
+		return peak
+
+
+def capture_snapshot() -> tracemalloc.Snapshot:
+	"""Collect garbage and snapshot traced memory. Blocking (both walk the whole heap); safe off the event loop."""
+	# Unreachable cycles would otherwise show up as growth until the collector next runs
+	gc.collect()
+	return tracemalloc.take_snapshot().filter_traces(NOISE)
+
+
+def allocation(traceback: tracemalloc.Traceback, size: int, count: int, size_diff: int = 0, count_diff: int = 0) -> dict:
+	frame: Optional[tracemalloc.Frame] = traceback[0] if len(traceback) else None
+	return {
+		"file": frame.filename if frame else "<unknown>",
+		"line": frame.lineno if frame and frame.lineno else None,  # 0 when grouped by filename
+		"size": size,
+		"size_diff": size_diff,
+		"count": count,
+		"count_diff": count_diff,
+	}
+
+
+memory_tracer = MemoryTracer()
@@ -0,0 +1,158 @@
+import cProfile
+from abc import ABC, abstractmethod
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+from app.core.config import settings
+
+# Up to 3.11 cProfile hooks only the thread that enables it. From 3.12 it runs on the
+# interpreter-wide sys.monitoring, sees every thread and refuses a second active profiler.
+PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+
+
+class RequestProfile(ABC):
+	"""Profile of one request: the event loop thread plus every worker thread `run` is called in.
+
+	Profiling is per process thread, so coroutines of other requests interleaved on the
+	event loop while this one is awaited appear in the profile as well.
+	"""
+
+	suffix = ""
+
+	@abstractmethod
+	def start(self) -> None:
+		...
+
+	@abstractmethod
+	def stop(self) -> None:
+		...
+
+	@contextmanager
+	def thread(self) -> Iterator[None]:
+		yield
+
+	def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+		"""Call `fn` in the current (worker) thread with that thread profiled too."""
+		with self.thread():
+			return fn(*args, **kwargs)
+
+	@abstractmethod
+	def dump(self, path: str) -> None:
+		...
+
+
+class CProfileRequestProfile(RequestProfile):
+	"""Deterministic cProfile output, written as a pstats file (`python -m pstats`, snakeviz)."""
+
+	suffix = ".prof"
+
+	def __init__(self):
+		self.profile = cProfile.Profile()
+		self.workers: List[cProfile.Profile] = []
+		self._lock = threading.Lock()
+
+	def start(self) -> None:
+		self.profile.enable()
+
+	def stop(self) -> None:
+		self.profile.disable()
+
+	@contextmanager
+	def thread(self) -> Iterator[None]:
+		if not PER_THREAD_CPROFILE:
+			# The request's profiler already sees this thread
+			yield
+			return
+		# Each worker call gets its own profile, merged on dump
+		profile = cProfile.Profile()
+		profile.enable()
+		try:
+			yield
+		finally:
+			profile.disable()
+			with self._lock:
+				self.workers.append(profile)
+
+	def dump(self, path: str) -> None:
+		stats = pstats.Stats(self.profile)
+		for profile in self.workers:
+			stats.add(profile)
+		stats.dump_stats(path)
+
+
+class SamplingRequestProfile(RequestProfile):
+	"""Wall-clock stack samples in collapsed format (one `frame;frame;... count` per line).
+
+	Feed the file to flamegraph.pl or speedscope. A background thread reads the stacks of
+	the registered threads every `interval` seconds, so idle time (awaiting I/O, waiting
+	on the pool) shows up as the frames it waits in.
+	"""
+
+	suffix = ".collapsed"
+
+	def __init__(self, interval: Optional[float] = None):
+		self.interval = settings.profile_sample_interval_ms / 1000 if interval is None else interval
+		self.threads: Dict[int, int] = Counter()
+		self.stacks: Counter = Counter()
+		self._lock = threading.Lock()
+		self._stopped = threading.Event()
+		self._sampler: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		with self._lock:
+			self.threads[threading.get_ident()] += 1
+		self._sampler = threading.Thread(target=self._sample, name="request-profile-sampler", daemon=True)
+		self._sampler.start()
+
+	def stop(self) -> None:
+		self._stopped.set()
+		if self._sampler is not None:
+			self._sampler.join()
+
+	@contextmanager
+	def thread(self) -> Iterator[None]:
+		ident = threading.get_ident()
+		with self._lock:
+			self.threads[ident] += 1
+		try:
+			yield
+		finally:
+			with self._lock:
+				self.threads[ident] -= 1
+
+	def _sample(self) -> None:
+		while not self._stopped.wait(self.interval):
+			frames = sys._current_frames()
+			with self._lock:
+				idents = [ident for ident, depth in self.threads.items() if depth > 0]
+			for ident in idents:
+				frame = frames.get(ident)
+				if frame is not None:
+					self.stacks[collapse(frame)] += 1
+
+	def dump(self, path: str) -> None:
+		with open(path, "w", encoding="utf-8") as fh:
+			for stack, count in self.stacks.most_common():
+				fh.write(f"{stack} {count}\n")
+
+
+def collapse(frame) -> str:
+	names = []
+	while frame is not None:
+		code = frame.f_code
+		names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".replace(";", ":"))
+		frame = frame.f_back
+	return ";".join(reversed(names))
+
+
+PROFILE_FORMATS: Dict[str, Type[RequestProfile]] = {
+	"pstats": CProfileRequestProfile,
+	"collapsed": SamplingRequestProfile,
+}
+
+# The profile of the request being handled; run_db routes worker-thread calls through it
+active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
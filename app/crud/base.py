@@ -0,0 +1,170 @@
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from sqlalchemy import select, insert, inspect, update as sql_update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db import generations
+from app.db.session import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+
+
+def existing_ids(db: Session, column, ids: set) -> set:
+	"""Return the subset of `ids` present in `column`, using chunked IN queries."""
+	found = set()
+	ids = sorted(ids)
+	# Stay well under SQLite's bound-parameter limit
+	for start in range(0, len(ids), 500):
+		found.update(db.scalars(select(column).where(column.in_(ids[start:start + 500]))))
+	return found
+
+
+def schema_columns(model, schema: Type[BaseModel], **expressions) -> List[Any]:
+	"""Column expressions for every field of `schema`, labelled by field name.
+
+	Fields map to the model attribute of the same name unless given in `expressions`
+	(computed fields such as Transaction.total_amount).
+	"""
+	return [(expressions[name] if name in expressions else getattr(model, name)).label(name) for name in schema.model_fields]
+
+
+def fetch_dicts(db: Session, stmt) -> List[Dict[str, Any]]:
+	"""Run a column SELECT and return plain dicts: no ORM instances, identity map or instance state."""
+	result = db.execute(stmt)
+	keys = list(result.keys())
+	return [dict(zip(keys, row)) for row in result]
+
+
+class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+	"""get / get_multi / create / update / remove for one model.
+
+	Writes are a single INSERT ... RETURNING or UPDATE ... RETURNING statement that
+	hydrates the ORM object directly, so there is no refresh SELECT after commit.
+	Subclasses override create_values / update_values to validate or reshape input.
+	With `list_columns` (see schema_columns), get_multi returns dicts of just those columns
+	instead of entities; read-only listings never need the ORM bookkeeping.
+	"""
+
+	def __init__(self, model: Type[ModelType], list_columns: Optional[Sequence[Any]] = None):
+		self.model = model
+		self.list_columns = list_columns
+
+	def get(self, db: Session, id: int) -> Optional[ModelType]:
+		return db.get(self.model, id)
+
+	def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Any]:
+		if self.list_columns:
+			return fetch_dicts(db, select(*self.list_columns).offset(skip).limit(limit))
+		stmt = select(self.model).offset(skip).limit(limit)
+		return list(db.scalars(stmt))
+
+	def create_values(self, db: Session, obj_in: CreateSchemaType) -> Dict[str, Any]:
+		return obj_in.model_dump()
+
+	def update_values(self, db: Session, db_obj: ModelType, obj_in: UpdateSchemaType) -> Dict[str, Any]:
+		return obj_in.model_dump(exclude_unset=True)
+
+	def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
+		values = self.create_values(db, obj_in)
+		db_obj = db.scalar(insert(self.model).values(**values).returning(self.model))
+		db.commit()
+		return db_obj
+
+	def update(self, db: Session, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
+		values = self.update_values(db, db_obj, obj_in)
+		if not values:
+			return db_obj
+		stmt = (
+			sql_update(self.model)
+			.where(self.model.id == db_obj.id)
+			.values(**values)
+			.returning(self.model)
+		)
+		# populate_existing writes the returned row onto the instance already in the session
+		db_obj = db.scalar(stmt, execution_options={"populate_existing": True})
+		db.commit()
+		return db_obj
+
+	def remove(self, db: Session, db_obj: ModelType) -> ModelType:
+		db.delete(db_obj)
+		try:
+			db.commit()
+		except IntegrityError:
+			# Still referenced (ON DELETE RESTRICT); leave the session usable for the caller
+			db.rollback()
+			raise
+		return db_obj
+
+
+class CachedCRUD(CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+	"""CRUDBase for small, rarely written reference tables (categories, weights).
+
+	Reads are answered from an in-process snapshot of transient model instances. The snapshot
+	is loaded at startup or on first use and remembers the table's `table_generations` counter;
+	every read compares it with the live counter (one primary-key lookup) and reloads on a
+	change, so writes from other workers or scripts are seen at once. Without generation
+	tracking installed every read reloads. `get` still hits the session, because update/remove
+	need a persistent instance.
+	"""
+
+	def __init__(self, model: Type[ModelType]):
+		super().__init__(model)
+		# (generation, rows) swapped as one value so readers never pair rows with another generation
+		self._cache: Optional[Tuple[Optional[tuple], Dict[int, ModelType]]] = None
+
+	def generation(self, db: Session) -> Optional[tuple]:
+		state = generations.current(db, (self.model.__tablename__,))
+		return state.get(self.model.__tablename__) if state else None
+
+	def load(self, db: Session, generation: Optional[tuple] = None) -> Dict[int, ModelType]:
+		# Read the counter before the rows: a write landing in between only causes one extra reload
+		if generation is None:
+			generation = self.generation(db)
+		attrs = [getattr(self.model, prop.key) for prop in inspect(self.model).column_attrs]
+		rows = db.execute(select(*attrs).order_by(self.model.id))
+		snapshot = {row.id: self.model(**row._mapping) for row in rows}
+		self._cache = (generation, snapshot)
+		return snapshot
+
+	def invalidate(self) -> None:
+		self._cache = None
+
+	def snapshot(self, db: Session) -> Dict[int, ModelType]:
+		cache = self._cache
+		generation = self.generation(db)
+		if cache is None or generation is None or cache[0] != generation:
+			return self.load(db, generation)
+		return cache[1]
+
+	def get_cached(self, db: Session, id: int) -> Optional[ModelType]:
+		return self.snapshot(db).get(id)
+
+	def existing(self, db: Session, ids: set) -> set:
+		"""Cached counterpart of existing_ids for this model's primary key."""
+		return ids & self.snapshot(db).keys()
+
+	def exists(self, db: Session, id: int) -> bool:
+		return bool(self.existing(db, {id}))
+
+	def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
+		return list(self.snapshot(db).values())[skip:skip + limit]
+
+	def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
+		try:
+			return super().create(db, obj_in)
+		finally:
+			self.invalidate()
+
+	def update(self, db: Session, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
+		try:
+			return super().update(db, db_obj, obj_in)
+		finally:
+			self.invalidate()
+
+	def remove(self, db: Session, db_obj: ModelType) -> ModelType:
+		try:
+			return super().remove(db, db_obj)
+		finally:
+			self.invalidate()
@@ -1,38 +1,16 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import select
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.crud.base import CachedCRUD
 
 
-def get(db: Session, category_id: int) -> Optional[Category]:
-    return db.get(Category, category_id)
+# Reference data: list/detail reads and existence checks are served from memory
+category = CachedCRUD[Category, CategoryCreate, CategoryUpdate](Category)
 
-
-def get_multi(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
-    stmt = select(Category).offset(skip).limit(limit)
-    return list(db.scalars(stmt))
-
-
-def create(db: Session, obj_in: CategoryCreate) -> Category:
-    db_obj = Category(name=obj_in.name, description=obj_in.description)
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
-
-
-def update(db: Session, db_obj: Category, obj_in: CategoryUpdate) -> Category:
-    data = obj_in.model_dump(exclude_unset=True)
-    for field, value in data.items():
-        setattr(db_obj, field, value)
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
-
-
-def remove(db: Session, db_obj: Category) -> Category:
-    db.delete(db_obj)
-    db.commit()
-    return db_obj
\ No newline at end of file
+get = category.get
+get_multi = category.get_multi
+get_cached = category.get_cached
+exists = category.exists
+existing = category.existing
+create = category.create
+update = category.update
+remove = category.remove
@@ -1,48 +1,147 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_, func
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import inspect, select, and_, or_, func, case, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from decimal import Decimal
+from app.db.generations import bulk_write
+from app.db.stock import STOCK_SIGN, inventory_snapshots
+from app.db.types import fixed_round, local_naive
 from app.models.inventory import Inventory
-from app.schemas.inventory import InventoryCreate, InventoryUpdate
+from app.models.transaction import Transaction
+from app.schemas.inventory import InventoryCreate, InventoryUpdate, InventoryReadSimple, InventoryBulkResult, InventoryAsOf
+from app.crud.pagination import paginate
+from app.crud.base import CRUDBase, fetch_dicts, schema_columns
+from app.crud import category as crud_category
+from app.crud import weight as crud_weight
 
 
-def get(db: Session, inventory_id: int) -> Optional[Inventory]:
-    return db.get(Inventory, inventory_id)
+LIST_COLUMNS = schema_columns(Inventory, InventoryReadSimple)
 
+# Loader options for InventoryReadDetailed: one extra IN query per relationship, whatever the row count.
+DETAILED_OPTIONS = (selectinload(Inventory.category), selectinload(Inventory.weight))
 
-def get_multi(db: Session, skip: int = 0, limit: int = 100) -> List[Inventory]:
-    stmt = select(Inventory).offset(skip).limit(limit)
+
+def get_detailed(db: Session, inventory_id: int) -> Optional[Inventory]:
+    """Inventory with category and weight loaded up front (no lazy loads during serialization)."""
+    return db.get(Inventory, inventory_id, options=list(DETAILED_OPTIONS))
+
+
+def get_multi_detailed(db: Session, skip: int = 0, limit: int = 100) -> List[Inventory]:
+    stmt = select(Inventory).options(*DETAILED_OPTIONS).offset(skip).limit(limit)
     return list(db.scalars(stmt))
 
 
-def create(db: Session, obj_in: InventoryCreate) -> Inventory:
-    db_obj = Inventory(
-        name=obj_in.name,
-        shortname=obj_in.shortname,
-        quantity=obj_in.quantity,
-        category_id=obj_in.category_id,
-        weight_id=obj_in.weight_id,
-    )
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+def get_page_detailed(db: Session, *, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Inventory], Optional[str]]:
+    stmt = select(Inventory).options(*DETAILED_OPTIONS)
+    return paginate(db, stmt, keys=((Inventory.id, int),), cursor=cursor, limit=limit)
 
 
-def update(db: Session, db_obj: Inventory, obj_in: InventoryUpdate) -> Inventory:
-    data = obj_in.model_dump(exclude_unset=True)
-    for field, value in data.items():
-        setattr(db_obj, field, value)
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+def get_by_shortname(db: Session, shortname: str) -> Optional[Inventory]:
+    stmt = select(Inventory).where(Inventory.shortname == shortname)
+    return db.scalar(stmt)
+
+
+def get_page(db: Session, *, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return paginate(db, select(*LIST_COLUMNS), keys=((Inventory.id, int),), cursor=cursor, limit=limit)
+
+
+class CRUDInventory(CRUDBase[Inventory, InventoryCreate, InventoryUpdate]):
+    def create_values(self, db: Session, obj_in: InventoryCreate) -> Dict[str, Any]:
+        if obj_in.shortname is not None and get_by_shortname(db, obj_in.shortname):
+            raise ValueError("Duplicate shortname")
+        data = obj_in.model_dump()
+        data["opening_quantity"] = data["quantity"]
+        return data
+
+    def update_values(self, db: Session, db_obj: Inventory, obj_in: InventoryUpdate) -> Dict[str, Any]:
+        data = obj_in.model_dump(exclude_unset=True)
+        if data.get("shortname") is not None and data["shortname"] != db_obj.shortname:
+            if get_by_shortname(db, data["shortname"]):
+                raise ValueError("Duplicate shortname")
+        if data.get("quantity") is not None:
+            # A manual stock count shifts the ledger baseline by the adjustment
+            data["opening_quantity"] = fixed_round(Inventory.opening_quantity + (data["quantity"] - Inventory.quantity), 3)
+        return data
+
+
+inventory = CRUDInventory(Inventory, list_columns=LIST_COLUMNS)
+
+get = inventory.get
+get_multi = inventory.get_multi
+create = inventory.create
+update = inventory.update
+remove = inventory.remove
+
+
+SHORTNAME_INDEX = "ix_inventory_shortname"
+
+
+def shortname_index_ready(db: Session) -> bool:
+    """Whether the unique index upsert_many's ON CONFLICT(shortname) needs exists.
+
+    Startup skips it (with a warning) while the table holds duplicate shortnames.
+    """
+    indexes = inspect(db.connection()).get_indexes(Inventory.__tablename__)
+    return any(index["name"] == SHORTNAME_INDEX and index["unique"] for index in indexes)
+
+
+def upsert_many(db: Session, objs_in: List[InventoryCreate]) -> List[InventoryBulkResult]:
+    """Insert or update inventory rows keyed by shortname in one commit.
+
+    Category and weight ids are validated once for the whole batch (from the reference cache). Uses
+    INSERT ... ON CONFLICT(shortname) DO UPDATE, so existing items keep their id.
+    Returns one result per input row, in order.
+    """
+    categories = crud_category.existing(db, {obj.category_id for obj in objs_in})
+    weights = crud_weight.existing(db, {obj.weight_id for obj in objs_in})
 
+    results = []
+    rows = []
+    seen = set()
+    for index, obj in enumerate(objs_in):
+        result = InventoryBulkResult(index=index, shortname=obj.shortname)
+        results.append(result)
+        if not obj.shortname:
+            result.error = "shortname is required for upsert"
+        elif obj.shortname in seen:
+            result.error = "Duplicate shortname in batch"
+        elif obj.category_id not in categories:
+            result.error = "Category not found"
+        elif obj.weight_id not in weights:
+            result.error = "Weight not found"
+        else:
+            seen.add(obj.shortname)
+            rows.append(dict(obj.model_dump(), opening_quantity=obj.quantity))
+    if not rows:
+        return results
 
-def remove(db: Session, db_obj: Inventory) -> Inventory:
-    db.delete(db_obj)
+    existing = set()
+    shortnames = sorted(seen)
+    for start in range(0, len(shortnames), 500):
+        chunk = shortnames[start:start + 500]
+        existing.update(db.scalars(select(Inventory.shortname).where(Inventory.shortname.in_(chunk))))
+
+    stmt = sqlite_insert(Inventory)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Inventory.shortname],
+        set_={
+            "name": stmt.excluded.name,
+            "quantity": stmt.excluded.quantity,
+            "opening_quantity": fixed_round(Inventory.opening_quantity + (stmt.excluded.quantity - Inventory.quantity), 3),
+            "category_id": stmt.excluded.category_id,
+            "weight_id": stmt.excluded.weight_id,
+        },
+    ).returning(Inventory.id, Inventory.shortname)
+    with bulk_write(db, "inventory"):
+        ids = {shortname: id_ for id_, shortname in db.execute(stmt, rows)}
     db.commit()
-    return db_obj
+
+    for result in results:
+        if result.error is None:
+            result.id = ids[result.shortname]
+            result.status = "updated" if result.shortname in existing else "created"
+    return results
 
 
 def search(
@@ -55,7 +154,7 @@ def search(
     max_quantity: Optional[Decimal] = None,
     skip: int = 0,
     limit: int = 100,
-) -> List[Inventory]:
+) -> List[Dict[str, Any]]:
     """Search inventory items with various filters."""
     filters = []
     
@@ -80,8 +179,95 @@ def search(
             )
         )
     
-    stmt = select(Inventory)
+    stmt = select(*LIST_COLUMNS)
     if filters:
         stmt = stmt.where(and_(*filters))
     stmt = stmt.offset(skip).limit(limit)
-    return list(db.scalars(stmt))
\ No newline at end of file
+    return fetch_dicts(db, stmt)
+
+
+def _stock_delta():
+    signs = [(Transaction.transaction_type == kind, sign) for kind, sign in STOCK_SIGN.items()]
+    return case(*signs, else_=0) * Transaction.quantity
+
+
+def _replayed(item_id, after, until=None):
+    """Signed stock movement of transactions dated in (after, until]."""
+    stmt = select(func.coalesce(func.sum(_stock_delta()), 0)).where(Transaction.inventory_id == item_id, Transaction.date > after)
+    if until is not None:
+        stmt = stmt.where(Transaction.date <= until)
+    return stmt.scalar_subquery()
+
+
+def as_of_statement(at: datetime, *, inventory_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None):
+    """Quantity per item at `at`: nearest earlier snapshot plus the transactions dated after it.
+
+    Both lookups are range scans on (inventory_id, taken_at) / (inventory_id, date), so the cost
+    is bounded by the snapshot interval. With no earlier snapshot (`at` before the item's opening
+    snapshot) the nearest later one is replayed backwards instead; that is the opening snapshot,
+    which precedes every count, so stock counts made after `at` cannot change the answer. Items
+    with no snapshot at all fall back to the current quantity.
+    """
+    snaps = inventory_snapshots
+    items = select(
+        Inventory.id,
+        Inventory.name,
+        Inventory.shortname,
+        Inventory.quantity,
+        select(func.max(snaps.c.taken_at))
+        .where(snaps.c.inventory_id == Inventory.id, snaps.c.taken_at <= at)
+        .scalar_subquery()
+        .label("snapshot_at"),
+        select(func.min(snaps.c.taken_at))
+        .where(snaps.c.inventory_id == Inventory.id, snaps.c.taken_at > at)
+        .scalar_subquery()
+        .label("later_at"),
+    )
+    if inventory_id is not None:
+        items = items.where(Inventory.id == inventory_id)
+    if limit is not None:
+        items = items.order_by(Inventory.id).offset(skip).limit(limit)
+    items = items.subquery()
+
+    def snapshot_quantity(taken_at):
+        return (
+            select(snaps.c.quantity)
+            .where(snaps.c.inventory_id == items.c.id, snaps.c.taken_at == taken_at)
+            .scalar_subquery()
+        )
+
+    quantity = case(
+        (items.c.snapshot_at.is_not(None), snapshot_quantity(items.c.snapshot_at) + _replayed(items.c.id, items.c.snapshot_at, at)),
+        (items.c.later_at.is_not(None), snapshot_quantity(items.c.later_at) - _replayed(items.c.id, at, items.c.later_at)),
+        else_=items.c.quantity - _replayed(items.c.id, at),
+    )
+    # Loaded through the column type: an exact 3-place Decimal in either storage mode
+    quantity = type_coerce(fixed_round(quantity, 3), Inventory.quantity.type)
+    return select(
+        items.c.id, items.c.name, items.c.shortname, items.c.snapshot_at, quantity.label("quantity")
+    ).order_by(items.c.id)
+
+
+def _as_of_rows(db: Session, stmt, at: datetime) -> List[InventoryAsOf]:
+    return [
+        InventoryAsOf(
+            id=row.id,
+            name=row.name,
+            shortname=row.shortname,
+            quantity=row.quantity,
+            at=at,
+            snapshot_at=row.snapshot_at,
+        )
+        for row in db.execute(stmt)
+    ]
+
+
+def get_as_of(db: Session, inventory_id: int, at: datetime) -> Optional[InventoryAsOf]:
+    at = local_naive(at)
+    rows = _as_of_rows(db, as_of_statement(at, inventory_id=inventory_id), at)
+    return rows[0] if rows else None
+
+
+def get_multi_as_of(db: Session, at: datetime, skip: int = 0, limit: int = 100) -> List[InventoryAsOf]:
+    at = local_naive(at)
+    return _as_of_rows(db, as_of_statement(at, skip=skip, limit=limit), at)
@@ -1,69 +1,116 @@
-from typing import List, Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_, func
-from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, insert, and_, or_, func, ColumnElement, Select
+from app.core.config import settings
+from app.db import fts, rollup
+from app.db.generations import bulk_write
+from app.db.types import local_naive
 from app.models.transaction import Transaction, TransactionType
-from app.schemas.item import TransactionCreate, TransactionUpdate
+from app.models.user import User
+from app.models.inventory import Inventory
+from app.schemas.item import TransactionCreate, TransactionUpdate, TransactionReadSimple, TransactionBulkResult, TransactionSummary
+from app.crud.pagination import paginate
+from app.crud.base import CRUDBase, existing_ids, fetch_dicts, schema_columns
 
 
-def get(db: Session, transaction_id: int) -> Optional[Transaction]:
-	return db.get(Transaction, transaction_id)
+# Keyset order for cursor pagination: (date, id) is unique and backed by ix_transactions_date_id.
+PAGE_KEYS = ((Transaction.date, datetime.fromisoformat), (Transaction.id, int))
+TOTAL_KEYS = ((Transaction.total_amount_cents, int), (Transaction.id, int))
 
+# sort values for search / search_page: (keyset keys, descending). Each is served by an index
+# ending in id: (date, id) / (owner_id, date, id) and (total_amount_cents, id) / (owner_id, total_amount_cents, id).
+SEARCH_SORTS = {
+	"date": (PAGE_KEYS, False),
+	"-date": (PAGE_KEYS, True),
+	"total_amount": (TOTAL_KEYS, False),
+	"-total_amount": (TOTAL_KEYS, True),
+}
 
-def get_multi(db: Session, skip: int = 0, limit: int = 100) -> List[Transaction]:
-	stmt = select(Transaction).offset(skip).limit(limit)
+
+# TransactionReadSimple straight from SQL; the total_amount hybrid is the exact half-even cents expression
+LIST_COLUMNS = schema_columns(Transaction, TransactionReadSimple)
+
+
+transaction = CRUDBase[Transaction, TransactionCreate, TransactionUpdate](Transaction, list_columns=LIST_COLUMNS)
+
+get = transaction.get
+get_multi = transaction.get_multi
+create = transaction.create
+update = transaction.update
+remove = transaction.remove
+
+
+# Loader options for TransactionReadDetailed: one extra IN query per relationship, whatever the row count.
+DETAILED_OPTIONS = (selectinload(Transaction.owner), selectinload(Transaction.inventory))
+
+
+def get_detailed(db: Session, transaction_id: int) -> Optional[Transaction]:
+	"""Transaction with owner and inventory loaded up front (no lazy loads during serialization)."""
+	return db.get(Transaction, transaction_id, options=list(DETAILED_OPTIONS))
+
+
+def get_multi_detailed(db: Session, skip: int = 0, limit: int = 100) -> List[Transaction]:
+	stmt = select(Transaction).options(*DETAILED_OPTIONS).offset(skip).limit(limit)
 	return list(db.scalars(stmt))
 
 
-def create(db: Session, obj_in: TransactionCreate) -> Transaction:
-	db_obj = Transaction(
-		title=obj_in.title,
-		description=obj_in.description,
-		owner_id=obj_in.owner_id,
-		transaction_type=obj_in.transaction_type,
-		amount_per_unit=Decimal(obj_in.amount_per_unit),
-		quantity=Decimal(obj_in.quantity),
-		purchase_price=Decimal(obj_in.purchase_price),
-		date=obj_in.date,
-		inventory_id=obj_in.inventory_id,
-	)
-	db.add(db_obj)
-	db.commit()
-	db.refresh(db_obj)
-	return db_obj
+def get_page_detailed(db: Session, *, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Transaction], Optional[str]]:
+	stmt = select(Transaction).options(*DETAILED_OPTIONS)
+	return paginate(db, stmt, keys=PAGE_KEYS, cursor=cursor, limit=limit)
 
 
-def update(db: Session, db_obj: Transaction, obj_in: TransactionUpdate) -> Transaction:
-	data = obj_in.model_dump(exclude_unset=True)
-	for field, value in data.items():
-		if field in ("amount_per_unit", "purchase_price", "quantity") and value is not None:
-			value = Decimal(value)
-		setattr(db_obj, field, value)
-	db.add(db_obj)
-	db.commit()
-	db.refresh(db_obj)
-	return db_obj
+def get_page(db: Session, *, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+	return search_page(db, cursor=cursor, limit=limit)
 
 
-def remove(db: Session, db_obj: Transaction) -> Transaction:
-	db.delete(db_obj)
-	db.commit()
-	return db_obj
+def create_many(db: Session, objs_in: List[TransactionCreate]) -> List[TransactionBulkResult]:
+	"""Validate owners/inventory with set-based lookups and insert every valid row in one commit.
 
+	Returns one result per input row, in order, with the new id or the validation error.
+	"""
+	owners = existing_ids(db, User.id, {obj.owner_id for obj in objs_in})
+	inventory = existing_ids(db, Inventory.id, {obj.inventory_id for obj in objs_in if obj.inventory_id is not None})
 
-def search(
-	db: Session,
+	results = []
+	rows = []
+	for index, obj in enumerate(objs_in):
+		if obj.owner_id not in owners:
+			results.append(TransactionBulkResult(index=index, error="Owner not found"))
+		elif obj.inventory_id is not None and obj.inventory_id not in inventory:
+			results.append(TransactionBulkResult(index=index, error="Inventory not found"))
+		else:
+			results.append(TransactionBulkResult(index=index))
+			rows.append(obj.model_dump())
+	if rows:
+		with bulk_write(db, "transactions"):
+			# executemany (insertmanyvalues batches) with RETURNING in parameter order
+			ids = db.scalars(insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows).all()
+		pending = iter(ids)
+		for result in results:
+			if result.error is None:
+				result.id = next(pending)
+		db.commit()
+	return results
+
+
+def search_statement(
 	*,
 	owner_id: Optional[int] = None,
 	q: Optional[str] = None,
 	transaction_type: Optional[TransactionType] = None,
 	date_from: Optional[datetime] = None,
 	date_to: Optional[datetime] = None,
-	skip: int = 0,
-	limit: int = 100,
+	min_total: Optional[Decimal] = None,
+	max_total: Optional[Decimal] = None,
+) -> Tuple[Select, Optional[ColumnElement]]:
+	"""Build the filtered SELECT shared by search, search_page and the index advisor.
 
-) -> List[Transaction]:
+	Returns the statement and, when `q` is answered by the FTS index, its bm25 rank column.
+	"""
+	stmt = select(Transaction)
+	rank = None
 	filters = []
 	if owner_id is not None:
 		filters.append(Transaction.owner_id == owner_id)
@@ -73,16 +120,268 @@ def search(
 		filters.append(Transaction.date >= date_from)
 	if date_to is not None:
 		filters.append(Transaction.date <= date_to)
+	# Inclusive bounds on total_amount, compared in whole cents against the indexed column
+	if min_total is not None:
+		filters.append(Transaction.total_amount_cents >= int((min_total * 100).to_integral_value(rounding=ROUND_CEILING)))
+	if max_total is not None:
+		filters.append(Transaction.total_amount_cents <= int((max_total * 100).to_integral_value(rounding=ROUND_FLOOR)))
 	if q:
-		like_exp = f"%{q.lower()}%"
-		filters.append(
-			or_(
-				func.lower(Transaction.title).like(like_exp),
-				func.lower(Transaction.description).like(like_exp),
+		fts_query = fts.match_query(q) if settings.transaction_fts_enabled else None
+		if fts_query:
+			stmt = stmt.join(fts.transactions_fts, fts.transactions_fts.c.rowid == Transaction.id)
+			filters.append(fts.match(fts_query))
+			rank = fts.transactions_fts.c.rank
+		else:
+			like_exp = f"%{q.lower()}%"
+			filters.append(
+				or_(
+					func.lower(Transaction.title).like(like_exp),
+					func.lower(Transaction.description).like(like_exp),
+				)
 			)
-		)
-	stmt = select(Transaction)
 	if filters:
 		stmt = stmt.where(and_(*filters))
+	return stmt, rank
+
+
+def search(
+	db: Session,
+	*,
+	owner_id: Optional[int] = None,
+	q: Optional[str] = None,
+	transaction_type: Optional[TransactionType] = None,
+	date_from: Optional[datetime] = None,
+	date_to: Optional[datetime] = None,
+	min_total: Optional[Decimal] = None,
+	max_total: Optional[Decimal] = None,
+	sort: Optional[str] = None,
+	skip: int = 0,
+	limit: int = 100,
+) -> List[Dict[str, Any]]:
+	"""Offset search; `sort` is a SEARCH_SORTS key, otherwise FTS rank order for `q`."""
+	stmt, rank = search_statement(
+		owner_id=owner_id, q=q, transaction_type=transaction_type, date_from=date_from, date_to=date_to,
+		min_total=min_total, max_total=max_total,
+	)
+	stmt = stmt.with_only_columns(*LIST_COLUMNS)
+	if sort is not None:
+		keys, descending = SEARCH_SORTS[sort]
+		stmt = stmt.order_by(*(column.desc() if descending else column for column, _ in keys))
+	elif rank is not None:
+		stmt = stmt.order_by(rank, Transaction.id)
 	stmt = stmt.offset(skip).limit(limit)
-	return list(db.scalars(stmt))
+	return fetch_dicts(db, stmt)
+
+
+def search_page(
+	db: Session,
+	*,
+	owner_id: Optional[int] = None,
+	q: Optional[str] = None,
+	transaction_type: Optional[TransactionType] = None,
+	date_from: Optional[datetime] = None,
+	date_to: Optional[datetime] = None,
+	min_total: Optional[Decimal] = None,
+	max_total: Optional[Decimal] = None,
+	sort: str = "date",
+	cursor: Optional[str] = None,
+	limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+	"""Keyset-paginated search in `sort` order (default (date, id)); raises ValueError for a malformed cursor.
+
+	A cursor is only valid for the sort it was issued with.
+	"""
+	stmt, _ = search_statement(
+		owner_id=owner_id, q=q, transaction_type=transaction_type, date_from=date_from, date_to=date_to,
+		min_total=min_total, max_total=max_total,
+	)
+	keys, descending = SEARCH_SORTS[sort]
+	columns = list(LIST_COLUMNS)
+	if keys is TOTAL_KEYS:
+		# Page keys are read back by name; total_amount itself is the Decimal form
+		columns.append(Transaction.total_amount_cents)
+	return paginate(db, stmt.with_only_columns(*columns), keys=keys, cursor=cursor, limit=limit, descending=descending)
+
+
+def stream_search(
+	db: Session,
+	*,
+	owner_id: Optional[int] = None,
+	q: Optional[str] = None,
+	transaction_type: Optional[TransactionType] = None,
+	date_from: Optional[datetime] = None,
+	date_to: Optional[datetime] = None,
+	min_total: Optional[Decimal] = None,
+	max_total: Optional[Decimal] = None,
+	batch_size: int = 1000,
+) -> Iterator[List[Transaction]]:
+	"""Yield every matching transaction in (date, id) order, `batch_size` rows at a time.
+
+	Rows come from a server-side cursor (yield_per), so memory is bounded by one batch
+	whatever the result size. Consume the iterator before closing `db`.
+	"""
+	stmt, _ = search_statement(
+		owner_id=owner_id, q=q, transaction_type=transaction_type, date_from=date_from, date_to=date_to,
+		min_total=min_total, max_total=max_total,
+	)
+	stmt = stmt.order_by(Transaction.date, Transaction.id).execution_options(yield_per=batch_size)
+	for batch in db.scalars(stmt).partitions():
+		yield batch
+		# Drop the batch from the identity map so it can be garbage collected
+		for obj in batch:
+			db.expunge(obj)
+
+
+# group_by values for summarize: at most one period bucket plus any keys. Periods take the
+# day expression of the source (transactions.date or rollup.day; both ISO text).
+SUMMARY_PERIODS = {
+	"day": lambda day: func.date(day),
+	"week": lambda day: func.date(day, "weekday 0", "-6 days"),  # Monday starting the week
+	"month": lambda day: func.strftime("%Y-%m", day),
+}
+SUMMARY_KEYS = ("type", "owner_id", "inventory_id")
+SUMMARY_LABELS = {"type": "transaction_type", "owner_id": "owner_id", "inventory_id": "inventory_id"}
+
+
+def summary_row(key: dict, count: int, quantity_milli: Optional[int], total_cents: Optional[int]) -> TransactionSummary:
+	"""Build a TransactionSummary from exact integer aggregates (thousandths / cents)."""
+	total = Decimal(total_cents or 0).scaleb(-2)
+	average = (total / count).quantize(Decimal("0.01"), rounding=ROUND_HALF_EVEN) if count else Decimal("0.00")
+	return TransactionSummary(
+		**key,
+		count=count,
+		quantity=Decimal(quantity_milli or 0).scaleb(-3),
+		total_amount=total,
+		average_amount=average,
+	)
+
+
+def summary_keys(group_by: Sequence[str], *, day, transaction_type, owner_id, inventory_id) -> list:
+	columns = {"type": transaction_type, "owner_id": owner_id, "inventory_id": inventory_id}
+	return [
+		SUMMARY_PERIODS[name](day).label("period") if name in SUMMARY_PERIODS else columns[name].label(SUMMARY_LABELS[name])
+		for name in group_by
+	]
+
+
+def raw_summary_statement(group_by: Sequence[str], **filters) -> Select:
+	"""GROUP BY over transactions; exact integer sums via the total_amount_cents / quantity_milli hybrids."""
+	stmt, _ = search_statement(**filters)
+	keys = summary_keys(
+		group_by,
+		day=Transaction.date,
+		transaction_type=Transaction.transaction_type,
+		owner_id=Transaction.owner_id,
+		inventory_id=Transaction.inventory_id,
+	)
+	stmt = stmt.with_only_columns(
+		*keys,
+		func.count().label("count"),
+		func.sum(Transaction.quantity_milli).label("quantity_milli"),
+		func.sum(Transaction.total_amount_cents).label("total_cents"),
+	)
+	return stmt.group_by(*keys) if keys else stmt
+
+
+def rollup_summary_statement(
+	group_by: Sequence[str],
+	*,
+	owner_id: Optional[int],
+	transaction_type: Optional[TransactionType],
+	first_day: Optional[date],
+	last_day: Optional[date],
+) -> Select:
+	"""The same aggregates read from transaction_daily_rollup for whole days [first_day, last_day]."""
+	r = rollup.transaction_daily_rollup.c
+	keys = summary_keys(
+		group_by,
+		day=r.day,
+		transaction_type=r.transaction_type,
+		owner_id=r.owner_id,
+		inventory_id=func.nullif(r.inventory_key, 0),
+	)
+	stmt = select(
+		*keys,
+		func.sum(r.count).label("count"),
+		func.sum(r.quantity_milli).label("quantity_milli"),
+		func.sum(r.total_cents).label("total_cents"),
+	)
+	if owner_id is not None:
+		stmt = stmt.where(r.owner_id == owner_id)
+	if transaction_type is not None:
+		stmt = stmt.where(r.transaction_type == transaction_type)
+	if first_day is not None:
+		stmt = stmt.where(r.day >= first_day.isoformat())
+	if last_day is not None:
+		stmt = stmt.where(r.day <= last_day.isoformat())
+	return stmt.group_by(*keys) if keys else stmt
+
+
+def rollup_days(date_from: Optional[datetime], date_to: Optional[datetime]) -> Optional[Tuple[Optional[date], Optional[date]]]:
+	"""Whole days inside [date_from, date_to] (None = unbounded), or None if the span is too short for the rollup."""
+	first = None
+	if date_from is not None:
+		first = date_from.date() if date_from.time() == time.min else date_from.date() + timedelta(days=1)
+	last = None
+	if date_to is not None:
+		last = date_to.date() if date_to.time() == time.max else date_to.date() - timedelta(days=1)
+	if first is not None and last is not None and (last - first).days + 1 < settings.summary_rollup_min_days:
+		return None
+	return first, last
+
+
+def summarize(
+	db: Session,
+	*,
+	group_by: Sequence[str] = (),
+	owner_id: Optional[int] = None,
+	q: Optional[str] = None,
+	transaction_type: Optional[TransactionType] = None,
+	date_from: Optional[datetime] = None,
+	date_to: Optional[datetime] = None,
+) -> List[TransactionSummary]:
+	"""Count, quantity, total and average of total_amount per group.
+
+	Short ranges and keyword (`q`) queries run one GROUP BY over transactions. Ranges of at
+	least settings.summary_rollup_min_days whole days (or unbounded) read those days from
+	transaction_daily_rollup and only the partial first/last day from transactions.
+	Sums are integer cents / thousandths, so totals equal the sum of per-row total_amount.
+	Raises ValueError when more than one period is requested.
+	"""
+	group_by = list(dict.fromkeys(group_by))
+	if len([name for name in group_by if name in SUMMARY_PERIODS]) > 1:
+		raise ValueError("Group by at most one of day, week, month")
+	# Stored dates are naive local timestamps
+	date_from, date_to = local_naive(date_from), local_naive(date_to)
+	filters = dict(owner_id=owner_id, q=q, transaction_type=transaction_type)
+
+	days = None
+	if not q and settings.transaction_rollup_enabled and rollup.has_transaction_rollup(db.connection()):
+		days = rollup_days(date_from, date_to)
+	if days is None:
+		statements = [raw_summary_statement(group_by, date_from=date_from, date_to=date_to, **filters)]
+	else:
+		first, last = days
+		statements = [rollup_summary_statement(
+			group_by, owner_id=owner_id, transaction_type=transaction_type, first_day=first, last_day=last
+		)]
+		# Partial days at either end come from the raw rows
+		if first is not None and date_from < datetime.combine(first, time.min):
+			edge_to = datetime.combine(first, time.min) - timedelta(microseconds=1)
+			statements.append(raw_summary_statement(group_by, date_from=date_from, date_to=edge_to, **filters))
+		if last is not None and date_to > datetime.combine(last, time.max):
+			edge_from = datetime.combine(last + timedelta(days=1), time.min)
+			statements.append(raw_summary_statement(group_by, date_from=edge_from, date_to=date_to, **filters))
+
+	names = ["period" if name in SUMMARY_PERIODS else SUMMARY_LABELS[name] for name in group_by]
+	totals = {}
+	for stmt in statements:
+		for row in db.execute(stmt):
+			values = row._mapping
+			key = tuple(values[name] for name in names)
+			acc = totals.setdefault(key, [0, 0, 0])
+			acc[0] += values["count"] or 0
+			acc[1] += values["quantity_milli"] or 0
+			acc[2] += values["total_cents"] or 0
+	ordered = sorted(totals.items(), key=lambda item: tuple((value is not None, value) for value in item[0]))
+	return [summary_row(dict(zip(names, key)), *acc) for key, acc in ordered]
@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app.crud.base import fetch_dicts
+
+
+# Keyset (cursor) pagination helpers.
+# A cursor is an opaque, URL-safe token holding the sort key of the last row of the
+# previous page. Each page is a `WHERE (key...) > (cursor...) ORDER BY key... LIMIT n`
+# range scan on an index, so its cost does not grow with how deep the client is.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_default(value: Any):
+	if isinstance(value, datetime):
+		return value.isoformat()
+	raise TypeError(f"Type {type(value)} not serializable in cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+	raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+	return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, converters: Sequence[Callable[[Any], Any]]) -> Tuple[Any, ...]:
+	"""Decode a cursor produced by `encode_cursor`; raises ValueError if it is malformed."""
+	try:
+		padded = cursor + "=" * (-len(cursor) % 4)
+		values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+	except Exception as e:
+		raise ValueError("Invalid cursor") from e
+	if not isinstance(values, list) or len(values) != len(converters):
+		raise ValueError("Invalid cursor")
+	try:
+		return tuple(convert(value) for convert, value in zip(converters, values))
+	except (TypeError, ValueError) as e:
+		raise ValueError("Invalid cursor") from e
+
+
+def keyset_statement(
+	stmt: Select,
+	*,
+	keys: Sequence[Tuple[Any, Callable[[Any], Any]]],
+	cursor: Optional[str],
+	limit: int,
+	descending: bool = False,
+) -> Select:
+	"""Apply the keyset range, order and limit (+1 to detect a next page) to `stmt`.
+
+	`descending` walks every key from high to low (an index on the keys serves both directions).
+	"""
+	columns = [column for column, _ in keys]
+	if cursor:
+		values = decode_cursor(cursor, [convert for _, convert in keys])
+		bounds = [literal(value, column.type) for column, value in zip(columns, values)]
+		if len(columns) == 1:
+			left, right = columns[0], bounds[0]
+		else:
+			left, right = tuple_(*columns), tuple_(*bounds)
+		stmt = stmt.where(left < right if descending else left > right)
+	order = [column.desc() for column in columns] if descending else columns
+	return stmt.order_by(*order).limit(limit + 1)
+
+
+def paginate(
+	db: Session,
+	stmt: Select,
+	*,
+	keys: Sequence[Tuple[Any, Callable[[Any], Any]]],
+	cursor: Optional[str],
+	limit: int,
+	descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+	"""Run `stmt` as one keyset page ordered by `keys` ((column, converter) pairs, unique as a whole).
+
+	An empty or missing cursor starts from the first row. Returns the page and the cursor
+	for the next page, or None when there are no more rows. A single-entity SELECT yields
+	instances; a column SELECT yields dicts.
+	"""
+	stmt = keyset_statement(stmt, keys=keys, cursor=cursor, limit=limit, descending=descending)
+	description = stmt.column_descriptions
+	if len(description) == 1 and description[0]["expr"] is description[0]["entity"]:
+		items = list(db.scalars(stmt))
+		key_of = getattr
+	else:
+		# Column SELECT: dicts keyed by label (keys must be selected under their own name)
+		items = fetch_dicts(db, stmt)
+		key_of = dict.__getitem__
+	next_cursor = None
+	if len(items) > limit:
+		items = items[:limit]
+		last = items[-1]
+		next_cursor = encode_cursor([key_of(last, column.key) for column, _ in keys])
+	return items, next_cursor
@@ -1,12 +1,37 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import select
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.models.transaction import Transaction
+from app.schemas.user import UserCreate, UserUpdate, UserReadSimple
+from app.crud.pagination import paginate
+from app.crud.base import CRUDBase, schema_columns
 
 
-def get(db: Session, user_id: int) -> Optional[User]:
-	return db.get(User, user_id)
+LIST_COLUMNS = schema_columns(User, UserReadSimple)
+
+
+def get_with_transactions(db: Session, user_id: int, limit: int = 0) -> Optional[User]:
+	"""User whose `transactions` holds only the `limit` most recent rows (none when limit is 0).
+
+	The bounded list is installed as the loaded collection, so serializing UserRead never
+	lazy-loads the full history.
+	"""
+	db_obj = db.get(User, user_id)
+	if db_obj is None:
+		return None
+	transactions = []
+	if limit:
+		stmt = (
+			select(Transaction)
+			.where(Transaction.owner_id == user_id)
+			.order_by(Transaction.date.desc(), Transaction.id.desc())
+			.limit(limit)
+		)
+		transactions = list(db.scalars(stmt))
+	set_committed_value(db_obj, "transactions", transactions)
+	return db_obj
 
 
 def get_by_email(db: Session, email: str) -> Optional[User]:
@@ -14,39 +39,28 @@ def get_by_email(db: Session, email: str) -> Optional[User]:
 	return db.scalar(stmt)
 
 
-def get_multi(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-	stmt = select(User).offset(skip).limit(limit)
-	return list(db.scalars(stmt))
+def get_page(db: Session, *, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+	return paginate(db, select(*LIST_COLUMNS), keys=((User.id, int),), cursor=cursor, limit=limit)
 
 
-def create(db: Session, obj_in: UserCreate) -> User:
-	if get_by_email(db, obj_in.email):
-		raise ValueError("Duplicate email")
-	db_obj = User(
-		email=obj_in.email,
-		full_name=obj_in.full_name,
-		is_active=obj_in.is_active,
-	)
-	db.add(db_obj)
-	db.commit()
-	db.refresh(db_obj)
-	return db_obj
+class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+	def create_values(self, db: Session, obj_in: UserCreate) -> Dict[str, Any]:
+		if get_by_email(db, obj_in.email):
+			raise ValueError("Duplicate email")
+		return obj_in.model_dump()
 
+	def update_values(self, db: Session, db_obj: User, obj_in: UserUpdate) -> Dict[str, Any]:
+		data = obj_in.model_dump(exclude_unset=True)
+		if "email" in data and data["email"] != db_obj.email:
+			if get_by_email(db, data["email"]):
+				raise ValueError("Duplicate email")
+		return data
 
-def update(db: Session, db_obj: User, obj_in: UserUpdate) -> User:
-	data = obj_in.model_dump(exclude_unset=True)
-	if "email" in data and data["email"] != db_obj.email:
-		if get_by_email(db, data["email"]):
-			raise ValueError("Duplicate email")
-	for field, value in data.items():
-		setattr(db_obj, field, value)
-	db.add(db_obj)
-	db.commit()
-	db.refresh(db_obj)
-	return db_obj
 
+user = CRUDUser(User, list_columns=LIST_COLUMNS)
 
-def remove(db: Session, db_obj: User) -> User:
-	db.delete(db_obj)
-	db.commit()
-	return db_obj
+get = user.get
+get_multi = user.get_multi
+create = user.create
+update = user.update
+remove = user.remove
@@ -0,0 +1,58 @@
+import re
+from typing import Optional
+from sqlalchemy import Integer, column, inspect, literal_column, table, text
+
+
+# FTS5 shadow index over transactions.title/description.
+# External-content table: the text lives only in `transactions`; triggers keep the index in sync.
+TRANSACTIONS_FTS = "transactions_fts"
+
+transactions_fts = table(TRANSACTIONS_FTS, column("rowid", Integer), column("rank"))
+
+_DDL = [
+	f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSACTIONS_FTS} USING fts5(
+		title, description,
+		content='transactions', content_rowid='id',
+		tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+	)""",
+	f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS}_ai AFTER INSERT ON transactions BEGIN
+		INSERT INTO {TRANSACTIONS_FTS}(rowid, title, description) VALUES (new.id, new.title, new.description);
+	END""",
+	f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS}_ad AFTER DELETE ON transactions BEGIN
+		INSERT INTO {TRANSACTIONS_FTS}({TRANSACTIONS_FTS}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+	END""",
+	f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS}_au AFTER UPDATE OF title, description ON transactions BEGIN
+		INSERT INTO {TRANSACTIONS_FTS}({TRANSACTIONS_FTS}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+		INSERT INTO {TRANSACTIONS_FTS}(rowid, title, description) VALUES (new.id, new.title, new.description);
+	END""",
+]
+
+
+def ensure_transactions_fts(conn) -> None:
+	"""Create the FTS table and sync triggers if missing; backfill when the table is new."""
+	created = not inspect(conn).has_table(TRANSACTIONS_FTS)
+	for ddl in _DDL:
+		conn.execute(text(ddl))
+	if created:
+		rebuild_transactions_fts(conn)
+
+
+def rebuild_transactions_fts(conn) -> None:
+	"""Re-index every transaction from the content table (backfill / repair)."""
+	conn.execute(text(f"INSERT INTO {TRANSACTIONS_FTS}({TRANSACTIONS_FTS}) VALUES ('rebuild')"))
+
+
+def match_query(q: str) -> Optional[str]:
+	"""Turn free text into an FTS5 query: every word must match as a prefix.
+
+	Words are quoted so FTS5 operators in user input are treated as plain text.
+	Returns None when `q` contains no searchable words.
+	"""
+	words = re.findall(r"\w+", q, flags=re.UNICODE)
+	if not words:
+		return None
+	return " ".join(f'"{word}"*' for word in words)
+
+
+def match(fts_query: str):
+	return literal_column(TRANSACTIONS_FTS).match(fts_query)
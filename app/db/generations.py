@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+from sqlalchemy import column, select, table, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+
+# Per-table change counters for conditional GETs.
+# Every INSERT/UPDATE/DELETE on a tracked table bumps its row here (via triggers), so an
+# unchanged generation means an unchanged table, whoever wrote to it.
+# Bulk writes bump once up front and set `deferred`, which the triggers skip on (see bulk_write).
+TABLE_GENERATIONS = "table_generations"
+
+TRACKED_TABLES = ("users", "transactions", "categories", "weights", "inventory")
+
+table_generations = table(
+	TABLE_GENERATIONS, column("name"), column("generation"), column("modified_at"), column("deferred")
+)
+
+_BUMP = "generation = generation + 1, modified_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+_TABLE_DDL = f"""CREATE TABLE IF NOT EXISTS {TABLE_GENERATIONS} (
+		name TEXT PRIMARY KEY,
+		generation INTEGER NOT NULL DEFAULT 0,
+		modified_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+		deferred INTEGER NOT NULL DEFAULT 0
+	)"""
+
+GENERATION_TRIGGERS: Dict[str, str] = {}
+for _table in TRACKED_TABLES:
+	for _suffix, _event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+		GENERATION_TRIGGERS[f"{_table}_generation_{_suffix}"] = f"""CREATE TRIGGER {_table}_generation_{_suffix} AFTER {_event} ON {_table}
+	WHEN (SELECT deferred FROM {TABLE_GENERATIONS} WHERE name = '{_table}') = 0 BEGIN
+		UPDATE {TABLE_GENERATIONS} SET {_BUMP} WHERE name = '{_table}';
+	END"""
+
+
+def ensure_table_generations(conn) -> None:
+	"""Create the generation table, its rows and the per-table triggers if missing.
+
+	Triggers from before the `deferred` guard are replaced.
+	"""
+	conn.execute(text(_TABLE_DDL))
+	columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({TABLE_GENERATIONS})"))}
+	if "deferred" not in columns:
+		conn.execute(text(f"ALTER TABLE {TABLE_GENERATIONS} ADD COLUMN deferred INTEGER NOT NULL DEFAULT 0"))
+	for name in TRACKED_TABLES:
+		conn.execute(text(f"INSERT OR IGNORE INTO {TABLE_GENERATIONS}(name) VALUES ('{name}')"))
+	installed = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all())
+	for name, ddl in GENERATION_TRIGGERS.items():
+		if installed.get(name) == ddl:
+			continue
+		if name in installed:
+			conn.execute(text(f"DROP TRIGGER {name}"))
+		conn.execute(text(ddl))
+
+
+@contextmanager
+def bulk_write(db: Session, name: str) -> Iterator[None]:
+	"""Bump `name`'s generation once for a multi-row write instead of once per row.
+
+	Must run inside the write's own transaction: `deferred` is only ever seen set by that
+	transaction, and a rollback undoes the bump together with the rows.
+	"""
+	tg = table_generations
+	try:
+		db.execute(update(tg).where(tg.c.name == name).values(
+			generation=tg.c.generation + 1, modified_at=text("strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"), deferred=1,
+		))
+		deferred = True
+	except OperationalError:
+		# Tracking not installed or not upgraded yet (startup hook not run); triggers bump per row
+		deferred = False
+	try:
+		yield
+	finally:
+		if deferred:
+			db.execute(update(tg).where(tg.c.name == name).values(deferred=0))
+
+
+def current(db: Session, tables: Sequence[str]) -> Optional[Dict[str, tuple]]:
+	"""{table: (generation, modified_at)} for `tables`, or None when tracking is not installed."""
+	tg = table_generations
+	stmt = select(tg.c.name, tg.c.generation, tg.c.modified_at).where(tg.c.name.in_(tables))
+	try:
+		rows = db.execute(stmt).all()
+	except OperationalError:
+		# Table not created yet (startup hook not run); serve without validators
+		return None
+	return {name: (generation, modified_at) for name, generation, modified_at in rows}
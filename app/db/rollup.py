@@ -0,0 +1,105 @@
+from sqlalchemy import Enum, Integer, column, inspect, table, text
+from app.db.types import cents_product_sql, fixed_units_sql
+from app.models.transaction import TransactionType
+
+
+# Per-day transaction aggregates for long-range summaries.
+# One row per (day, owner_id, transaction_type, inventory_key); inventory_key is 0 for
+# transactions without inventory (NULLs would never conflict in the upsert). Triggers on
+# `transactions` keep it current inside the writing transaction, including cascaded
+# deletes and ON DELETE SET NULL from users/inventory.
+TRANSACTION_DAILY_ROLLUP = "transaction_daily_rollup"
+
+transaction_daily_rollup = table(
+	TRANSACTION_DAILY_ROLLUP,
+	column("day"),
+	column("owner_id", Integer),
+	column("transaction_type", Enum(TransactionType)),
+	column("inventory_key", Integer),
+	column("count", Integer),
+	column("quantity_milli", Integer),
+	column("total_cents", Integer),
+)
+
+
+ROLLUP_TRIGGERS = tuple(f"{TRANSACTION_DAILY_ROLLUP}_{suffix}" for suffix in ("ai", "ad", "au"))
+
+
+def _quantity_milli(row: str) -> str:
+	return fixed_units_sql(f"{row}.quantity", 3)
+
+
+def _total_cents(row: str) -> str:
+	# Same arithmetic as transactions.total_amount_cents
+	return cents_product_sql(f"{row}.amount", f"{row}.quantity")
+
+
+def _add(row: str, sign: int) -> str:
+	return f"""INSERT INTO {TRANSACTION_DAILY_ROLLUP}
+			(day, owner_id, transaction_type, inventory_key, count, quantity_milli, total_cents)
+		VALUES (date({row}.date), {row}.owner_id, {row}.transaction_type, coalesce({row}.inventory_id, 0),
+			{sign}, {sign} * {_quantity_milli(row)}, {sign} * {_total_cents(row)})
+		ON CONFLICT(day, owner_id, transaction_type, inventory_key) DO UPDATE SET
+			count = count + excluded.count,
+			quantity_milli = quantity_milli + excluded.quantity_milli,
+			total_cents = total_cents + excluded.total_cents;"""
+
+
+_PRUNE = f"DELETE FROM {TRANSACTION_DAILY_ROLLUP} WHERE count = 0;"
+
+_TABLE_DDL = f"""CREATE TABLE IF NOT EXISTS {TRANSACTION_DAILY_ROLLUP} (
+	day TEXT NOT NULL,
+	owner_id INTEGER NOT NULL,
+	transaction_type TEXT NOT NULL,
+	inventory_key INTEGER NOT NULL,
+	count INTEGER NOT NULL,
+	quantity_milli INTEGER NOT NULL,
+	total_cents INTEGER NOT NULL,
+	PRIMARY KEY (day, owner_id, transaction_type, inventory_key)
+) WITHOUT ROWID"""
+
+
+def trigger_ddl() -> list:
+	# Built per call: the scaling to cents / thousandths depends on settings.fixed_point_storage
+	return [
+		f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTION_DAILY_ROLLUP}_ai AFTER INSERT ON transactions BEGIN
+			{_add("new", 1)}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTION_DAILY_ROLLUP}_ad AFTER DELETE ON transactions BEGIN
+			{_add("old", -1)}
+			{_PRUNE}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS {TRANSACTION_DAILY_ROLLUP}_au
+		AFTER UPDATE OF date, owner_id, transaction_type, inventory_id, amount, quantity ON transactions BEGIN
+			{_add("old", -1)}
+			{_add("new", 1)}
+			{_PRUNE}
+		END""",
+	]
+
+
+def ensure_transaction_rollup(conn) -> None:
+	"""Create the rollup table and its triggers if missing; backfill when the table is new."""
+	created = not inspect(conn).has_table(TRANSACTION_DAILY_ROLLUP)
+	for ddl in [_TABLE_DDL, *trigger_ddl()]:
+		conn.execute(text(ddl))
+	if created:
+		rebuild_transaction_rollup(conn)
+
+
+def rebuild_transaction_rollup(conn) -> int:
+	"""Recompute every rollup row from `transactions` (backfill / repair); returns rows written."""
+	conn.execute(text(f"DELETE FROM {TRANSACTION_DAILY_ROLLUP}"))
+	result = conn.execute(text(f"""
+		INSERT INTO {TRANSACTION_DAILY_ROLLUP}
+			(day, owner_id, transaction_type, inventory_key, count, quantity_milli, total_cents)
+		SELECT date(t.date), t.owner_id, t.transaction_type, coalesce(t.inventory_id, 0),
+			COUNT(*), SUM({_quantity_milli("t")}), SUM({_total_cents("t")})
+		FROM transactions AS t
+		GROUP BY 1, 2, 3, 4
+	"""))
+	return result.rowcount
+
+
+def has_transaction_rollup(conn) -> bool:
+	return inspect(conn).has_table(TRANSACTION_DAILY_ROLLUP)
@@ -1,6 +1,16 @@
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy import create_engine
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
+from app.core.profiling import active_profile
+
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -8,7 +18,123 @@ class Base(DeclarativeBase):
 
 
 engine = create_engine(settings.database_url, future=True, echo=False)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+
+
+def sqlite_pragmas() -> list:
+	return [
+		f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+		f"PRAGMA synchronous={settings.sqlite_synchronous}",
+		f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+		f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+		f"PRAGMA temp_store={settings.sqlite_temp_store}",
+		f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+		f"PRAGMA foreign_keys={'ON' if settings.sqlite_foreign_keys else 'OFF'}",
+	]
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+	cursor = dbapi_connection.cursor()
+	try:
+		for pragma in sqlite_pragmas():
+			cursor.execute(pragma)
+	finally:
+		cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+	event.listen(engine, "connect", apply_sqlite_pragmas)
+
+
+class QueryStats:
+	"""Statements executed and seconds spent in the driver for one request."""
+
+	__slots__ = ("count", "seconds")
+
+	def __init__(self):
+		self.count = 0
+		self.seconds = 0.0
+
+
+# Set per request by app/routers/timing.ServerTimingMiddleware. Worker threads (run_in_threadpool) and
+# greenlets (AsyncSession.run_sync) run in a copy of the request's context, so they update the same object.
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+	conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+	elapsed = time.perf_counter() - conn.info["query_started"].pop()
+	stats = query_stats.get()
+	if stats is not None:
+		stats.count += 1
+		stats.seconds += elapsed
+	if settings.slow_query_ms > 0 and elapsed * 1000 >= settings.slow_query_ms:
+		log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+
+def _handle_error(exception_context):
+	# after_cursor_execute does not run for a failed statement
+	started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+	if started:
+		started.pop()
+
+
+def explain_query_plan(conn, statement: str, parameters) -> list:
+	"""EXPLAIN QUERY PLAN detail lines, run on a raw DBAPI cursor so it is neither timed nor logged."""
+	cursor = conn.connection.dbapi_connection.cursor()
+	try:
+		cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+		return [row[3] for row in cursor.fetchall()]
+	finally:
+		cursor.close()
+
+
+def log_slow_query(conn, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+	plan = []
+	if not executemany and conn.dialect.name == "sqlite" and statement.lstrip().upper().startswith(_EXPLAINABLE):
+		try:
+			plan = explain_query_plan(conn, statement, parameters)
+		except Exception as e:  # the log line matters more than the plan
+			plan = [f"EXPLAIN failed: {e}"]
+	logger.warning(
+		"Slow query (%.1f ms): %s\n%s", elapsed * 1000, statement, "\n".join(f"  {detail}" for detail in plan)
+	)
+
+
+def instrument_engine(target) -> None:
+	"""Time every statement on `target` (a sync Engine) for query_stats and the slow-query log."""
+	event.listen(target, "before_cursor_execute", _before_cursor_execute)
+	event.listen(target, "after_cursor_execute", _after_cursor_execute)
+	event.listen(target, "handle_error", _handle_error)
+
+
+instrument_engine(engine)
+
+# expire_on_commit=False: CRUD writes hydrate objects via RETURNING, so nothing needs reloading after commit
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, future=True)
+
+
+def async_url(url: str) -> str:
+	if url.startswith("sqlite:"):
+		return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+	return url
+
+
+# The async engine is only built when enabled so the sync path does not need aiosqlite installed.
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+	async_engine = create_async_engine(settings.async_database_url or async_url(settings.database_url), echo=False)
+	if async_engine.dialect.name == "sqlite":
+		event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+	instrument_engine(async_engine.sync_engine)
+	AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+AnySession = Union[Session, AsyncSession]
 
 
 def get_db():
@@ -17,3 +143,27 @@ def get_db():
 		yield db
 	finally:
 		db.close()
+
+
+async def get_async_db():
+	async with AsyncSessionLocal() as db:
+		yield db
+
+
+# Request-scoped session dependency used by the routers
+get_session = get_async_db if settings.db_async else get_db
+
+
+async def run_db(db: AnySession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+	"""Run a sync CRUD callable `fn(session, *args, **kwargs)` from an async route.
+
+	With an AsyncSession the call runs on the driver's greenlet via `run_sync`, so no
+	worker thread is held; with a sync Session it runs in the anyio thread pool as before.
+	"""
+	if isinstance(db, AsyncSession):
+		return await db.run_sync(fn, *args, **kwargs)
+	profile = active_profile.get()
+	if profile is not None:
+		# The worker thread is outside the event loop thread the request profile hooks
+		return await run_in_threadpool(profile.run, fn, db, *args, **kwargs)
+	return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import List, Optional
+from decimal import Decimal
+from sqlalchemy import DateTime, Integer, bindparam, column, event, func, inspect, select, table, text
+from app.core.config import settings
+from app.db.session import Base
+from app.db.types import FixedPoint, fixed_round_sql
+from app.models.transaction import TransactionType
+
+
+# Stock ledger: every transaction linked to an inventory item moves its quantity.
+# Purchases (expense) add stock, sales (earning) remove it, capital does not touch stock.
+STOCK_SIGN = {
+	TransactionType.expense: 1,
+	TransactionType.earning: -1,
+	TransactionType.capital: 0,
+}
+
+STOCK_TRIGGERS = ("stock_ledger_ai", "stock_ledger_ad", "stock_ledger_au")
+
+
+def _signed_quantity(row: str) -> str:
+	# transaction_type is stored by enum name
+	cases = " ".join(f"WHEN '{kind.name}' THEN {sign}" for kind, sign in STOCK_SIGN.items())
+	return f"(CASE {row}.transaction_type {cases} ELSE 0 END * {row}.quantity)"
+
+
+def _quantity(expr: str) -> str:
+	# NUMERIC storage is REAL-backed: round() keeps it from accumulating float error.
+	# Integer thousandths (settings.fixed_point_storage) are exact already.
+	return fixed_round_sql(expr, 3)
+
+
+def _quantity_type() -> str:
+	return "INTEGER" if settings.fixed_point_storage else "NUMERIC(10, 3)"
+
+
+def _move(row: str, op: str) -> str:
+	return f"""UPDATE inventory SET quantity = {_quantity(f"quantity {op} {_signed_quantity(row)}")}
+		WHERE id = {row}.inventory_id;"""
+
+
+def _stock_ddl() -> List[str]:
+	return [
+		f"""CREATE TRIGGER IF NOT EXISTS stock_ledger_ai AFTER INSERT ON transactions
+		WHEN new.inventory_id IS NOT NULL BEGIN
+			{_move("new", "+")}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS stock_ledger_ad AFTER DELETE ON transactions
+		WHEN old.inventory_id IS NOT NULL BEGIN
+			{_move("old", "-")}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS stock_ledger_au
+		AFTER UPDATE OF inventory_id, transaction_type, quantity ON transactions BEGIN
+			{_move("old", "-")}
+			{_move("new", "+")}
+		END""",
+	]
+
+# Point-in-time stock. A snapshot row holds an item's quantity as of taken_at, counting every
+# transaction dated <= taken_at. Rows come from item creation ('opening'), the periodic job
+# ('periodic') and direct quantity writes ('count'); triggers shift the snapshots a backdated
+# transaction precedes, so as-of reads only replay transactions dated after the nearest earlier
+# snapshot, or back from the nearest later one, never across a count made after `at`.
+INVENTORY_SNAPSHOTS = "inventory_snapshots"
+SNAPSHOT_TRIGGERS = tuple(f"{INVENTORY_SNAPSHOTS}_{suffix}" for suffix in ("ai", "ad", "au", "count", "opening"))
+
+inventory_snapshots = table(
+	INVENTORY_SNAPSHOTS,
+	column("inventory_id", Integer),
+	column("taken_at", DateTime),
+	column("quantity", FixedPoint(10, 3)),
+	column("source"),
+)
+
+# Same text format SQLAlchemy writes for naive local datetimes (transactions.date)
+_LOCAL_NOW = "(strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime') || '000')"
+
+
+def _future_quantity(item: str, after: str) -> str:
+	return f"""coalesce((SELECT SUM({_signed_quantity("t")}) FROM transactions AS t
+		WHERE t.inventory_id = {item} AND t.date > {after}), 0)"""
+
+
+def _shift_snapshots(row: str, op: str) -> str:
+	return f"""UPDATE {INVENTORY_SNAPSHOTS} SET quantity = {_quantity(f"quantity {op} {_signed_quantity(row)}")}
+		WHERE inventory_id = {row}.inventory_id AND taken_at >= {row}.date;"""
+
+
+def _snapshot_ddl() -> List[str]:
+	return [
+		f"""CREATE TABLE IF NOT EXISTS {INVENTORY_SNAPSHOTS} (
+			inventory_id INTEGER NOT NULL REFERENCES inventory(id) ON DELETE CASCADE,
+			taken_at DATETIME NOT NULL,
+			quantity {_quantity_type()} NOT NULL,
+			source TEXT NOT NULL,
+			PRIMARY KEY (inventory_id, taken_at)
+		) WITHOUT ROWID""",
+		f"""CREATE TRIGGER IF NOT EXISTS {INVENTORY_SNAPSHOTS}_ai AFTER INSERT ON transactions
+		WHEN new.inventory_id IS NOT NULL BEGIN
+			{_shift_snapshots("new", "+")}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS {INVENTORY_SNAPSHOTS}_ad AFTER DELETE ON transactions
+		WHEN old.inventory_id IS NOT NULL BEGIN
+			{_shift_snapshots("old", "-")}
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS {INVENTORY_SNAPSHOTS}_au
+		AFTER UPDATE OF inventory_id, transaction_type, quantity, date ON transactions BEGIN
+			{_shift_snapshots("old", "-")}
+			{_shift_snapshots("new", "+")}
+		END""",
+		# The opening count: every item gets a snapshot from the moment it exists
+		f"""CREATE TRIGGER IF NOT EXISTS {INVENTORY_SNAPSHOTS}_opening AFTER INSERT ON inventory BEGIN
+			INSERT INTO {INVENTORY_SNAPSHOTS} (inventory_id, taken_at, quantity, source)
+			VALUES (new.id, {_LOCAL_NOW}, {_quantity(f"new.quantity - {_future_quantity('new.id', _LOCAL_NOW)}")}, 'opening')
+			ON CONFLICT(inventory_id, taken_at) DO NOTHING;
+		END""",
+		# A direct quantity write (stock count) is the only thing that moves opening_quantity
+		f"""CREATE TRIGGER IF NOT EXISTS {INVENTORY_SNAPSHOTS}_count
+		AFTER UPDATE OF opening_quantity ON inventory
+		WHEN new.opening_quantity IS NOT old.opening_quantity BEGIN
+			INSERT INTO {INVENTORY_SNAPSHOTS} (inventory_id, taken_at, quantity, source)
+			VALUES (new.id, {_LOCAL_NOW}, {_quantity(f"new.quantity - {_future_quantity('new.id', _LOCAL_NOW)}")}, 'count')
+			ON CONFLICT(inventory_id, taken_at) DO UPDATE SET quantity = excluded.quantity, source = excluded.source;
+		END""",
+	]
+
+
+def _expected_sql() -> str:
+	# Quantity each item should hold: its opening balance plus every linked transaction
+	return f"""
+		SELECT i.id, i.name, i.quantity,
+			{_quantity(f'i.opening_quantity + coalesce(SUM({_signed_quantity("t")}), 0)')} AS expected
+		FROM inventory AS i
+		LEFT JOIN transactions AS t ON t.inventory_id = i.id
+		GROUP BY i.id
+	"""
+
+
+def ensure_stock_ledger(conn) -> None:
+	"""Install the ledger triggers; on first install the current quantities become the baseline."""
+	if not (inspect(conn).has_table("inventory") and inspect(conn).has_table("transactions")):
+		return
+	columns = {c["name"] for c in inspect(conn).get_columns("inventory")}
+	if "opening_quantity" not in columns:
+		conn.execute(text(f"ALTER TABLE inventory ADD COLUMN opening_quantity {_quantity_type()} DEFAULT 0 NOT NULL"))
+	installed = {
+		name for (name,) in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+	}
+	for ddl in _stock_ddl():
+		conn.execute(text(ddl))
+	if not installed.issuperset(STOCK_TRIGGERS):
+		# Existing stock is taken as correct: opening = quantity - what transactions explain
+		explained = f"""coalesce((
+			SELECT SUM({_signed_quantity("t")}) FROM transactions AS t WHERE t.inventory_id = inventory.id
+		), 0)"""
+		conn.execute(text(f"UPDATE inventory SET opening_quantity = {_quantity(f'quantity - {explained}')}"))
+	# After the baseline above, so installing does not record every item as a stock count
+	for ddl in _snapshot_ddl():
+		conn.execute(text(ddl))
+	if f"{INVENTORY_SNAPSHOTS}_opening" not in installed:
+		# Items from before opening snapshots get one now, ahead of any later count
+		conn.execute(text(f"""
+			INSERT INTO {INVENTORY_SNAPSHOTS} (inventory_id, taken_at, quantity, source)
+			SELECT i.id, {_LOCAL_NOW}, {_quantity(f"i.quantity - {_future_quantity('i.id', _LOCAL_NOW)}")}, 'opening'
+			FROM inventory AS i
+			WHERE NOT EXISTS (SELECT 1 FROM {INVENTORY_SNAPSHOTS} AS s WHERE s.inventory_id = i.id)
+			ON CONFLICT(inventory_id, taken_at) DO NOTHING
+		"""))
+
+
+def install_stock_triggers(conn) -> None:
+	"""(Re)create the ledger and snapshot triggers only, e.g. after a storage migration dropped them."""
+	for ddl in _stock_ddl() + _snapshot_ddl():
+		conn.execute(text(ddl))
+
+
+def take_inventory_snapshot(conn, at: datetime) -> int:
+	"""Record every item's quantity as of `at` (transactions dated later are backed out)."""
+	result = conn.execute(text(f"""
+		INSERT INTO {INVENTORY_SNAPSHOTS} (inventory_id, taken_at, quantity, source)
+		SELECT i.id, :at, {_quantity(f"i.quantity - {_future_quantity('i.id', ':at')}")}, 'periodic'
+		FROM inventory AS i
+		WHERE true -- disambiguates ON CONFLICT after INSERT ... SELECT
+		ON CONFLICT(inventory_id, taken_at) DO NOTHING
+	""").bindparams(bindparam("at", at, type_=DateTime)))
+	return result.rowcount
+
+
+def last_periodic_snapshot(conn) -> Optional[datetime]:
+	snapshots = inventory_snapshots
+	return conn.scalar(select(func.max(snapshots.c.taken_at)).where(snapshots.c.source == "periodic"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_on_create_all(target, connection, **kw) -> None:
+	# Inventory.opening_quantity is mapped, so any create_all() caller (startup, scripts, tests)
+	# must also migrate older databases before the ORM touches the table.
+	ensure_stock_ledger(connection)
+
+
+def find_drift(conn) -> List[tuple]:
+	"""(id, name, quantity, expected) for every item whose quantity disagrees with its ledger."""
+	stmt = text(_expected_sql()).columns(
+		column("id", Integer), column("name"), column("quantity", FixedPoint(10, 3)), column("expected", FixedPoint(10, 3))
+	)
+	rows = conn.execute(stmt).all()
+	return [row for row in rows if abs(Decimal(row.quantity) - Decimal(row.expected)) >= Decimal("0.0005")]
+
+
+def repair_drift(conn) -> int:
+	"""Reset drifted items to their ledger quantity; returns the number of items fixed."""
+	drift = find_drift(conn)
+	for row in drift:
+		conn.execute(
+			text("UPDATE inventory SET quantity = :expected WHERE id = :id").bindparams(bindparam("expected", type_=FixedPoint(10, 3))),
+			{"expected": row.expected, "id": row.id},
+		)
+	return len(drift)
@@ -0,0 +1,42 @@
+from sqlalchemy import event, inspect, text
+from app.db.session import Base
+from app.db.types import cents_product_sql
+
+
+# transactions.total_amount_cents: exact half-even cents of amount x quantity as a VIRTUAL
+# generated column (Transaction.total_amount_cents). Its expression depends on
+# settings.fixed_point_storage, so the storage migration drops and re-adds it.
+TOTAL_AMOUNT_CENTS = "total_amount_cents"
+
+
+def _indexes():
+	# Declared on the model; create_all() only creates them along with a new table
+	return [index for index in Base.metadata.tables["transactions"].indexes if TOTAL_AMOUNT_CENTS in index.columns]
+
+
+def ensure_total_amount_column(conn) -> None:
+	"""Add the generated column and its indexes to databases created before it existed."""
+	if not inspect(conn).has_table("transactions"):
+		return
+	columns = {c["name"] for c in inspect(conn).get_columns("transactions")}
+	if TOTAL_AMOUNT_CENTS not in columns:
+		conn.execute(text(
+			f"ALTER TABLE transactions ADD COLUMN {TOTAL_AMOUNT_CENTS} INTEGER "
+			f"GENERATED ALWAYS AS ({cents_product_sql('amount', 'quantity')}) VIRTUAL"
+		))
+	for index in _indexes():
+		index.create(conn, checkfirst=True)
+
+
+def drop_total_amount_column(conn) -> None:
+	if TOTAL_AMOUNT_CENTS not in {c["name"] for c in inspect(conn).get_columns("transactions")}:
+		return
+	for index in _indexes():
+		index.drop(conn, checkfirst=True)
+	conn.execute(text(f"ALTER TABLE transactions DROP COLUMN {TOTAL_AMOUNT_CENTS}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_on_create_all(target, connection, **kw) -> None:
+	# Transaction.total_amount_cents is mapped, so older databases need it before the ORM reads them
+	ensure_total_amount_column(connection)
@@ -0,0 +1,137 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Optional
+from sqlalchemy import Integer, Numeric, cast, func, inspect, text, type_coerce
+from sqlalchemy.types import TypeDecorator
+from app.core.config import settings
+
+
+class Cents(TypeDecorator):
+	"""Integer cents read back as a 2-place Decimal (1250 -> Decimal('12.50'))."""
+
+	impl = Integer
+	cache_ok = True
+
+	def process_bind_param(self, value, dialect):
+		return None if value is None else int(Decimal(value).scaleb(2))
+
+	def process_result_value(self, value, dialect):
+		return None if value is None else Decimal(value).scaleb(-2)
+
+
+def local_naive(value: Optional[datetime]) -> Optional[datetime]:
+	"""`value` as the naive local time dates are stored in; offset-aware values are converted first."""
+	if value is None or value.tzinfo is None:
+		return value
+	return value.astimezone().replace(tzinfo=None)
+
+
+# Fixed-point storage. With settings.fixed_point_storage, money is stored as integer cents and
+# quantities as integer thousandths; Decimals exist only in bound parameters and loaded values.
+# Otherwise columns are NUMERIC, which SQLite keeps as REAL.
+
+
+class FixedPoint(TypeDecorator):
+	"""Numeric(precision, scale) in the API; INTEGER units of 10**-scale in fixed-point storage."""
+
+	impl = Numeric
+	cache_ok = True
+
+	def __init__(self, precision: int, scale: int):
+		super().__init__(precision, scale)
+		# Kept here: the dialect-level copy swaps impl_instance for Integer in fixed-point mode
+		self.precision, self.scale = precision, scale
+
+	def load_dialect_impl(self, dialect):
+		if settings.fixed_point_storage:
+			return dialect.type_descriptor(Integer())
+		return dialect.type_descriptor(self.impl_instance)
+
+	def process_bind_param(self, value, dialect):
+		if value is None or not settings.fixed_point_storage:
+			return value
+		units = Decimal(repr(value) if isinstance(value, float) else value).scaleb(self.scale)
+		return int(units.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+	def process_result_value(self, value, dialect):
+		if value is None or not settings.fixed_point_storage:
+			return value
+		# Computed expressions (round(), arithmetic) can come back as REAL
+		return Decimal(int(round(value))).scaleb(-self.scale)
+
+
+def fixed_units(expr, scale: int):
+	"""`expr` (a FixedPoint column or expression) as an integer count of 10**-scale units."""
+	if settings.fixed_point_storage:
+		return type_coerce(expr, Integer)
+	return cast(func.round(expr * 10 ** scale), Integer)
+
+
+def fixed_units_sql(expr: str, scale: int) -> str:
+	"""SQL-text counterpart of fixed_units, for trigger bodies."""
+	if settings.fixed_point_storage:
+		return f"({expr})"
+	return f"CAST(round({expr} * {10 ** scale}) AS INTEGER)"
+
+
+def cents_product_sql(amount: str, quantity: str) -> str:
+	"""SQL text for amount x quantity in integer cents, rounded half-even like Decimal.quantize.
+
+	Both factors as integers (cents x thousandths = 1e-5 units), so no float arithmetic is involved.
+	"""
+	product = f"({fixed_units_sql(amount, 2)} * {fixed_units_sql(quantity, 3)})"
+	whole, rest = f"(abs({product}) / 1000)", f"(abs({product}) % 1000)"
+	rounded = f"({whole} + CASE WHEN {rest} > 500 OR ({rest} = 500 AND {whole} % 2 = 1) THEN 1 ELSE 0 END)"
+	return f"(CASE WHEN {product} < 0 THEN -{rounded} ELSE {rounded} END)"
+
+
+def fixed_round(expr, scale: int):
+	"""Round arithmetic on FixedPoint values back to `scale` places (integer storage needs nothing)."""
+	return expr if settings.fixed_point_storage else func.round(expr, scale)
+
+
+def fixed_round_sql(expr: str, scale: int) -> str:
+	return f"({expr})" if settings.fixed_point_storage else f"round({expr}, {scale})"
+
+
+# Which representation a database holds, so the app never reads one as the other
+STORAGE_FORMAT = "storage_format"
+
+
+def stored_fixed_point(conn) -> Optional[bool]:
+	"""True/False from the database's storage flag, or None when it has not been recorded."""
+	if not inspect(conn).has_table(STORAGE_FORMAT):
+		return None
+	value = conn.execute(text(f"SELECT fixed_point FROM {STORAGE_FORMAT}")).scalar()
+	return None if value is None else bool(value)
+
+
+def record_fixed_point(conn, fixed_point: bool) -> None:
+	conn.execute(text(f"CREATE TABLE IF NOT EXISTS {STORAGE_FORMAT} (fixed_point INTEGER NOT NULL)"))
+	conn.execute(text(f"DELETE FROM {STORAGE_FORMAT}"))
+	conn.execute(text(f"INSERT INTO {STORAGE_FORMAT} (fixed_point) VALUES (:value)"), {"value": int(fixed_point)})
+
+
+def current_fixed_point(conn) -> bool:
+	"""The database's storage format; unflagged databases with data predate integer storage."""
+	stored = stored_fixed_point(conn)
+	if stored is not None:
+		return stored
+	has_rows = any(
+		conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first()
+		for table in ("transactions", "inventory")
+		if inspect(conn).has_table(table)
+	)
+	return False if has_rows else settings.fixed_point_storage
+
+
+def ensure_storage_format(conn) -> None:
+	"""Record the format of a new database; refuse to run against the other one."""
+	stored = current_fixed_point(conn)
+	if stored_fixed_point(conn) is None:
+		record_fixed_point(conn, stored)
+	if stored != settings.fixed_point_storage:
+		raise RuntimeError(
+			f"Database uses {'integer fixed-point' if stored else 'NUMERIC'} storage but FIXED_POINT_STORAGE="
+			f"{str(settings.fixed_point_storage).lower()}; run scripts/migrate_fixed_point.py"
+		)
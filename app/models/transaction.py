@@ -3,10 +3,11 @@ from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 from enum import Enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Numeric
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Computed, Index, type_coerce
 from sqlalchemy.ext.hybrid import hybrid_property
 from decimal import Decimal
 from app.db.session import Base
+from app.db.types import Cents, FixedPoint, cents_product_sql, fixed_units
 
 if TYPE_CHECKING:
 	from app.models.user import User
@@ -21,6 +22,18 @@ class TransactionType(str, Enum):
 
 class Transaction(Base):
 	__tablename__ = "transactions"
+	__table_args__ = (
+		# Keyset pagination order (see app/crud/pagination.py)
+		Index("ix_transactions_date_id", "date", "id"),
+		# Search shapes: owner/type equality + date range, ending in id so keyset pages need no sort step
+		Index("ix_transactions_owner_id_date", "owner_id", "date", "id"),
+		Index("ix_transactions_type_date", "transaction_type", "date", "id"),
+		# Stock replay per item over a date range (as-of reads, snapshots)
+		Index("ix_transactions_inventory_id_date", "inventory_id", "date"),
+		# min_total / max_total ranges and sort=total_amount, alone or per owner
+		Index("ix_transactions_total_amount_cents_id", "total_amount_cents", "id"),
+		Index("ix_transactions_owner_id_total_amount_cents", "owner_id", "total_amount_cents", "id"),
+	)
 
 	id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 	title: Mapped[str] = mapped_column(String(255), index=True, nullable=False)
@@ -28,11 +41,14 @@ class Transaction(Base):
 	owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
 	transaction_type: Mapped[TransactionType] = mapped_column(default=TransactionType.expense, nullable=False)
 	# Renamed logically from 'amount' to 'amount_per_unit'; keep underlying column name 'amount' for backward compatibility.
-	amount_per_unit: Mapped[Decimal] = mapped_column('amount', Numeric(10, 2), default=Decimal('0.00'), nullable=False)
-	quantity: Mapped[Decimal] = mapped_column(Numeric(10, 3), default=Decimal('1.000'), nullable=False)
-	purchase_price: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal('0.00'), nullable=False)
+	amount_per_unit: Mapped[Decimal] = mapped_column('amount', FixedPoint(10, 2), default=Decimal('0.00'), nullable=False)
+	quantity: Mapped[Decimal] = mapped_column(FixedPoint(10, 3), default=Decimal('1.000'), nullable=False)
+	purchase_price: Mapped[Decimal] = mapped_column(FixedPoint(10, 2), default=Decimal('0.00'), nullable=False)
 	inventory_id: Mapped[Optional[int]] = mapped_column(ForeignKey("inventory.id", ondelete="SET NULL"), index=True, nullable=True)
 	date: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+	# amount_per_unit x quantity in exact half-even cents. A VIRTUAL generated column: computed by
+	# SQLite on read and never written by the app, but indexable (added to older databases by app/db/totals.py).
+	total_amount_cents: Mapped[int] = mapped_column(Integer, Computed(cents_product_sql("amount", "quantity")), nullable=False)
 
 	owner: Mapped["User"] = relationship("User", back_populates="transactions")
 	inventory: Mapped[Optional["Inventory"]] = relationship("Inventory", back_populates="transactions")
@@ -44,4 +60,17 @@ class Transaction(Base):
 
 	@total_amount.expression
 	def total_amount(cls):  # type: ignore[override]
-		return cls.amount_per_unit * cls.quantity
+		# The generated cents column, returned as a Decimal
+		return type_coerce(cls.total_amount_cents, Cents)
+
+	@hybrid_property
+	def quantity_milli(self) -> int:
+		return int((self.quantity or Decimal('0.000')) * 1000)
+
+	@quantity_milli.expression
+	def quantity_milli(cls):  # type: ignore[override]
+		return fixed_units(cls.quantity, 3)
+
+
+# Registers the create_all() hook that adds total_amount_cents to older databases
+import app.db.totals  # noqa: E402,F401
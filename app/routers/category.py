@@ -1,37 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import Optional
-from app.db.session import get_db
+from sqlalchemy.exc import IntegrityError
+from app.db.session import AnySession, get_session, run_db
 from app.crud import category as crud_category
 from app.schemas.category import CategoryRead, CategoryCreate, CategoryUpdate, CategoryReadSimple
+from app.routers.conditional import conditional_get
+from app.routers.responses import list_response
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 @router.post("", response_model=CategoryReadSimple, status_code=201)
-def create_category(*, db: Session = Depends(get_db), obj_in: CategoryCreate):
-    return crud_category.create(db, obj_in)
+async def create_category(*, db: AnySession = Depends(get_session), obj_in: CategoryCreate):
+    return await run_db(db, crud_category.create, obj_in)
 
-@router.get("", response_model=list[CategoryReadSimple])
-def list_categories(*, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1)):
-    return crud_category.get_multi(db, skip=skip, limit=limit)
+@router.get("", response_model=list[CategoryReadSimple], dependencies=[Depends(conditional_get("categories"))])
+async def list_categories(*, db: AnySession = Depends(get_session), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1), response: Response):
+    return list_response(CategoryReadSimple, await run_db(db, crud_category.get_multi, skip=skip, limit=limit), response)
 
-@router.get("/{category_id}", response_model=CategoryRead)
-def get_category(*, db: Session = Depends(get_db), category_id: int):
-    db_obj = crud_category.get(db, category_id)
+@router.get("/{category_id}", response_model=CategoryRead, dependencies=[Depends(conditional_get("categories"))])
+async def get_category(*, db: AnySession = Depends(get_session), category_id: int):
+    db_obj = await run_db(db, crud_category.get_cached, category_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Category not found")
     return db_obj
 
 @router.put("/{category_id}", response_model=CategoryRead)
-def update_category(*, db: Session = Depends(get_db), category_id: int, obj_in: CategoryUpdate):
-    db_obj = crud_category.get(db, category_id)
+async def update_category(*, db: AnySession = Depends(get_session), category_id: int, obj_in: CategoryUpdate):
+    db_obj = await run_db(db, crud_category.get, category_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Category not found")
-    return crud_category.update(db, db_obj, obj_in)
+    return await run_db(db, crud_category.update, db_obj, obj_in)
 
 @router.delete("/{category_id}", response_model=CategoryReadSimple)
-def delete_category(*, db: Session = Depends(get_db), category_id: int):
-    db_obj = crud_category.get(db, category_id)
+async def delete_category(*, db: AnySession = Depends(get_session), category_id: int):
+    db_obj = await run_db(db, crud_category.get, category_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Category not found")
-    return crud_category.remove(db, db_obj)
\ No newline at end of file
+    try:
+        return await run_db(db, crud_category.remove, db_obj)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Category is still used by inventory items")
\ No newline at end of file
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Callable, Optional
+from fastapi import Depends, HTTPException, Request, Response
+from app.db.session import AnySession, get_session, run_db
+from app.db import generations
+
+
+def make_etag(request: Request, state: dict) -> str:
+	"""Strong ETag from the request URL and the generations of the tables it reads."""
+	parts = [request.url.path, request.url.query]
+	parts.extend(f"{name}:{state[name][0]}" for name in sorted(state))
+	return '"' + hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def last_modified(state: dict) -> Optional[str]:
+	stamps = [modified_at for _, modified_at in state.values() if modified_at]
+	if not stamps:
+		return None
+	latest = datetime.fromisoformat(max(stamps).replace("Z", "+00:00"))
+	return format_datetime(latest, usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+	if if_none_match.strip() == "*":
+		return True
+	tags = (tag.strip() for tag in if_none_match.split(","))
+	# Weak comparison (RFC 9110 13.1.2): ignore a W/ prefix
+	return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in tags)
+
+
+def conditional_get(*tables: str) -> Callable:
+	"""Dependency answering If-None-Match with 304 before the endpoint touches the ORM.
+
+	`tables` are every table the response is built from. On a miss the ETag and
+	Last-Modified headers are added to the normal response. Bodies served from a
+	CachedCRUD snapshot agree with the tag: the snapshot reloads whenever the same
+	generation counters move, including for writes made by other processes.
+	"""
+
+	async def dependency(request: Request, response: Response, db: AnySession = Depends(get_session)) -> None:
+		state = await run_db(db, generations.current, tables)
+		if not state:
+			return
+		etag = make_etag(request, state)
+		headers = {"ETag": etag}
+		modified = last_modified(state)
+		if modified:
+			headers["Last-Modified"] = modified
+		if_none_match = request.headers.get("if-none-match")
+		if if_none_match and etag_matches(if_none_match, etag):
+			raise HTTPException(status_code=304, headers=headers)
+		response.headers.update(headers)
+
+	return dependency
@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from datetime import datetime
 from decimal import Decimal
-from app.db.session import get_db
+from app.db.session import AnySession, get_session, run_db
 from app.crud import inventory as crud_inventory
 from app.crud import category as crud_category
 from app.crud import weight as crud_weight
-from app.schemas.inventory import InventoryRead, InventoryCreate, InventoryUpdate, InventoryReadSimple, InventoryReadDetailed
+from app.schemas.inventory import InventoryRead, InventoryCreate, InventoryUpdate, InventoryReadSimple, InventoryReadDetailed, InventoryBulkResponse, InventoryAsOf
+from app.crud.pagination import NEXT_CURSOR_HEADER
+from app.core.config import settings
+from app.routers.conditional import conditional_get
+from app.routers.responses import list_response
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
-@router.get("/search", response_model=list[InventoryReadSimple])
-def search_inventory(
+@router.get("/search", response_model=list[InventoryReadSimple], dependencies=[Depends(conditional_get("inventory"))])
+async def search_inventory(
     *,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     q: Optional[str] = Query(default=None, description="Search in name or shortname"),
     category_id: Optional[int] = Query(default=None, description="Filter by category ID"),
     weight_id: Optional[int] = Query(default=None, description="Filter by weight ID"),
@@ -21,10 +25,12 @@ def search_inventory(
     max_quantity: Optional[Decimal] = Query(default=None, ge=0, description="Maximum quantity"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1),
+    response: Response,
 ):
     """Search inventory items with various filters."""
-    return crud_inventory.search(
+    items = await run_db(
         db,
+        crud_inventory.search,
         q=q,
         category_id=category_id,
         weight_id=weight_id,
@@ -33,52 +39,134 @@ def search_inventory(
         skip=skip,
         limit=limit,
     )
+    return list_response(InventoryReadSimple, items, response)
 
 @router.post("", response_model=InventoryReadSimple, status_code=201)
-def create_inventory(*, db: Session = Depends(get_db), obj_in: InventoryCreate):
-    if not crud_category.get(db, obj_in.category_id):
+async def create_inventory(*, db: AnySession = Depends(get_session), obj_in: InventoryCreate):
+    if not await run_db(db, crud_category.exists, obj_in.category_id):
         raise HTTPException(status_code=404, detail="Category not found")
-    if not crud_weight.get(db, obj_in.weight_id):
+    if not await run_db(db, crud_weight.exists, obj_in.weight_id):
         raise HTTPException(status_code=404, detail="Weight not found")
-    return crud_inventory.create(db, obj_in)
+    try:
+        return await run_db(db, crud_inventory.create, obj_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("", response_model=list[InventoryReadSimple])
-def list_inventory(*, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1)):
-    return crud_inventory.get_multi(db, skip=skip, limit=limit)
+@router.post("/bulk", response_model=InventoryBulkResponse)
+async def upsert_inventory_bulk(*, db: AnySession = Depends(get_session), objs_in: List[InventoryCreate]):
+    """Create or update catalogue items keyed by shortname in one database transaction."""
+    if len(objs_in) > settings.bulk_max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {settings.bulk_max_rows} rows per request")
+    if not await run_db(db, crud_inventory.shortname_index_ready):
+        raise HTTPException(
+            status_code=503,
+            detail="Inventory shortnames are not unique; run `python scripts/migrate_inventory_shortname_unique.py --fix`",
+        )
+    results = await run_db(db, crud_inventory.upsert_many, objs_in)
+    created = sum(1 for result in results if result.status == "created")
+    updated = sum(1 for result in results if result.status == "updated")
+    return InventoryBulkResponse(created=created, updated=updated, failed=len(results) - created - updated, results=results)
 
-@router.get("/{inventory_id}", response_model=InventoryRead)
-def get_inventory(*, db: Session = Depends(get_db), inventory_id: int):
-    db_obj = crud_inventory.get(db, inventory_id)
+@router.get("", response_model=list[InventoryReadSimple], dependencies=[Depends(conditional_get("inventory"))])
+async def list_inventory(
+    *,
+    db: AnySession = Depends(get_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+    response: Response,
+):
+    if cursor is not None:
+        try:
+            items, next_cursor = await run_db(db, crud_inventory.get_page, cursor=cursor, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return list_response(InventoryReadSimple, items, response)
+    return list_response(InventoryReadSimple, await run_db(db, crud_inventory.get_multi, skip=skip, limit=limit), response)
+
+@router.get("/detailed", response_model=list[InventoryReadDetailed], dependencies=[Depends(conditional_get("inventory", "categories", "weights"))])
+async def list_inventory_detailed(
+    *,
+    db: AnySession = Depends(get_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+    response: Response,
+):
+    """List inventory with category and weight; three queries regardless of page size."""
+    if cursor is not None:
+        try:
+            items, next_cursor = await run_db(db, crud_inventory.get_page_detailed, cursor=cursor, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return list_response(InventoryReadDetailed, items, response)
+    return list_response(InventoryReadDetailed, await run_db(db, crud_inventory.get_multi_detailed, skip=skip, limit=limit), response)
+
+@router.get("/as-of", response_model=list[InventoryAsOf], dependencies=[Depends(conditional_get("inventory", "transactions"))])
+async def list_inventory_as_of(
+    *,
+    db: AnySession = Depends(get_session),
+    at: datetime = Query(..., description="Point in time; transactions dated at or before it are counted"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    response: Response,
+):
+    """Stock per item at `at`, from the nearest earlier snapshot plus the transactions since."""
+    return list_response(InventoryAsOf, await run_db(db, crud_inventory.get_multi_as_of, at, skip=skip, limit=limit), response)
+
+@router.get("/{inventory_id}", response_model=InventoryRead, dependencies=[Depends(conditional_get("inventory"))])
+async def get_inventory(*, db: AnySession = Depends(get_session), inventory_id: int):
+    db_obj = await run_db(db, crud_inventory.get, inventory_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Inventory not found")
     return db_obj
 
-@router.get("/{inventory_id}/detailed", response_model=InventoryReadDetailed)
-def get_inventory_detailed(*, db: Session = Depends(get_db), inventory_id: int):
+@router.get("/{inventory_id}/detailed", response_model=InventoryReadDetailed, dependencies=[Depends(conditional_get("inventory", "categories", "weights"))])
+async def get_inventory_detailed(*, db: AnySession = Depends(get_session), inventory_id: int):
     """Get inventory with detailed category and weight information."""
-    db_obj = crud_inventory.get(db, inventory_id)
+    db_obj = await run_db(db, crud_inventory.get_detailed, inventory_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Inventory not found")
     return db_obj
 
+@router.get("/{inventory_id}/as-of", response_model=InventoryAsOf, dependencies=[Depends(conditional_get("inventory", "transactions"))])
+async def get_inventory_as_of(
+    *,
+    db: AnySession = Depends(get_session),
+    inventory_id: int,
+    at: datetime = Query(..., description="Point in time; transactions dated at or before it are counted"),
+):
+    """Stock of one item at `at`, from the nearest earlier snapshot plus the transactions since."""
+    result = await run_db(db, crud_inventory.get_as_of, inventory_id, at)
+    if not result:
+        raise HTTPException(status_code=404, detail="Inventory not found")
+    return result
+
 @router.put("/{inventory_id}", response_model=InventoryRead)
-def update_inventory(*, db: Session = Depends(get_db), inventory_id: int, obj_in: InventoryUpdate):
-    db_obj = crud_inventory.get(db, inventory_id)
+async def update_inventory(*, db: AnySession = Depends(get_session), inventory_id: int, obj_in: InventoryUpdate):
+    db_obj = await run_db(db, crud_inventory.get, inventory_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Inventory not found")
     # Validate category_id if being updated
     if obj_in.category_id is not None and obj_in.category_id != db_obj.category_id:
-        if not crud_category.get(db, obj_in.category_id):
+        if not await run_db(db, crud_category.exists, obj_in.category_id):
             raise HTTPException(status_code=404, detail="Category not found")
     # Validate weight_id if being updated
     if obj_in.weight_id is not None and obj_in.weight_id != db_obj.weight_id:
-        if not crud_weight.get(db, obj_in.weight_id):
+        if not await run_db(db, crud_weight.exists, obj_in.weight_id):
             raise HTTPException(status_code=404, detail="Weight not found")
-    return crud_inventory.update(db, db_obj, obj_in)
+    try:
+        return await run_db(db, crud_inventory.update, db_obj, obj_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{inventory_id}", response_model=InventoryReadSimple)
-def delete_inventory(*, db: Session = Depends(get_db), inventory_id: int):
-    db_obj = crud_inventory.get(db, inventory_id)
+async def delete_inventory(*, db: AnySession = Depends(get_session), inventory_id: int):
+    db_obj = await run_db(db, crud_inventory.get, inventory_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Inventory not found")
-    return crud_inventory.remove(db, db_obj)
\ No newline at end of file
+    return await run_db(db, crud_inventory.remove, db_obj)
\ No newline at end of file
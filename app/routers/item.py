@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import csv
+import io
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import Optional
-from app.db.session import get_db
+from decimal import Decimal
+from typing import Iterator, List, Literal, Optional
+from app.db.session import AnySession, SessionLocal, get_session, run_db
 from app.crud import item as crud_transaction
 from app.crud import user as crud_user
 from app.schemas.item import (
@@ -11,84 +14,255 @@ from app.schemas.item import (
 	TransactionUpdate,
 	TransactionReadSimple,
 	TransactionReadDetailed,
+	TransactionBulkResponse,
+	TransactionSummary,
 )
 from app.models.transaction import TransactionType
 from app.crud import inventory as crud_inventory
+from app.crud.pagination import NEXT_CURSOR_HEADER
+from app.core.config import settings
+from app.routers.conditional import conditional_get
+from app.routers.responses import list_response
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
-@router.get("/search", response_model=list[TransactionReadSimple])
-def search_transactions(
+@router.get("/search", response_model=list[TransactionReadSimple], dependencies=[Depends(conditional_get("transactions"))])
+async def search_transactions(
 	*,
-	db: Session = Depends(get_db),
+	db: AnySession = Depends(get_session),
 	owner_id: Optional[int] = Query(default=None),
 	q: Optional[str] = Query(default=None),
 	transaction_type: Optional[TransactionType] = Query(default=None),
 	date_from: Optional[datetime] = Query(default=None),
 	date_to: Optional[datetime] = Query(default=None),
+	min_total: Optional[Decimal] = Query(default=None, description="Lowest total_amount (inclusive)"),
+	max_total: Optional[Decimal] = Query(default=None, description="Highest total_amount (inclusive)"),
+	sort: Optional[Literal["date", "-date", "total_amount", "-total_amount"]] = Query(
+		default=None, description="Result order; cursor pages default to date. Without it, q results are ranked by relevance."
+	),
 	skip: int = Query(0, ge=0),
 	limit: int = Query(100, ge=1),
+	cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+	response: Response,
 ):
-	return crud_transaction.search(
+	if cursor is not None:
+		try:
+			items, next_cursor = await run_db(
+				db,
+				crud_transaction.search_page,
+				owner_id=owner_id,
+				q=q,
+				transaction_type=transaction_type,
+				date_from=date_from,
+				date_to=date_to,
+				min_total=min_total,
+				max_total=max_total,
+				sort=sort or "date",
+				cursor=cursor,
+				limit=limit,
+			)
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		if next_cursor:
+			response.headers[NEXT_CURSOR_HEADER] = next_cursor
+		return list_response(TransactionReadSimple, items, response)
+	items = await run_db(
 		db,
+		crud_transaction.search,
 		owner_id=owner_id,
 		q=q,
 		transaction_type=transaction_type,
 		date_from=date_from,
 		date_to=date_to,
+		min_total=min_total,
+		max_total=max_total,
+		sort=sort,
 		skip=skip,
 		limit=limit,
 	)
+	return list_response(TransactionReadSimple, items, response)
 
 
 @router.post("", response_model=TransactionReadSimple, status_code=201)
-def create_transaction(*, db: Session = Depends(get_db), obj_in: TransactionCreate):
-	if not crud_user.get(db, obj_in.owner_id):
+async def create_transaction(*, db: AnySession = Depends(get_session), obj_in: TransactionCreate):
+	if not await run_db(db, crud_user.get, obj_in.owner_id):
 		raise HTTPException(status_code=404, detail="Owner not found")
-	if obj_in.inventory_id is not None and not crud_inventory.get(db, obj_in.inventory_id):
+	if obj_in.inventory_id is not None and not await run_db(db, crud_inventory.get, obj_in.inventory_id):
 		raise HTTPException(status_code=404, detail="Inventory not found")
-	return crud_transaction.create(db, obj_in)
+	return await run_db(db, crud_transaction.create, obj_in)
 
 
-@router.get("", response_model=list[TransactionReadSimple])
-def list_transactions(
-	*, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1)
+@router.post("/bulk", response_model=TransactionBulkResponse)
+async def create_transactions_bulk(*, db: AnySession = Depends(get_session), objs_in: List[TransactionCreate]):
+	"""Ingest many transactions in one database transaction; returns a result per row."""
+	if len(objs_in) > settings.bulk_max_rows:
+		raise HTTPException(status_code=413, detail=f"At most {settings.bulk_max_rows} rows per request")
+	results = await run_db(db, crud_transaction.create_many, objs_in)
+	failed = sum(1 for result in results if result.error is not None)
+	return TransactionBulkResponse(created=len(results) - failed, failed=failed, results=results)
+
+
+@router.get("", response_model=list[TransactionReadSimple], dependencies=[Depends(conditional_get("transactions"))])
+async def list_transactions(
+	*,
+	db: AnySession = Depends(get_session),
+	skip: int = Query(0, ge=0),
+	limit: int = Query(100, ge=1),
+	cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+	response: Response,
+):
+	if cursor is not None:
+		try:
+			items, next_cursor = await run_db(db, crud_transaction.get_page, cursor=cursor, limit=limit)
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		if next_cursor:
+			response.headers[NEXT_CURSOR_HEADER] = next_cursor
+		return list_response(TransactionReadSimple, items, response)
+	return list_response(TransactionReadSimple, await run_db(db, crud_transaction.get_multi, skip=skip, limit=limit), response)
+
+
+EXPORT_FIELDS = list(TransactionRead.model_fields)
+
+
+def export_chunks(filters: dict, export_format: str) -> Iterator[str]:
+	"""Render the export one batch per chunk from a dedicated session.
+
+	The request session is closed before a streaming body is sent, so the export opens its own.
+	"""
+	db = SessionLocal()
+	try:
+		if export_format == "csv":
+			buffer = io.StringIO()
+			writer = csv.writer(buffer)
+			writer.writerow(EXPORT_FIELDS)
+		for batch in crud_transaction.stream_search(db, batch_size=settings.export_batch_size, **filters):
+			rows = [TransactionRead.model_validate(obj) for obj in batch]
+			if export_format == "csv":
+				for row in rows:
+					data = row.model_dump(mode="json")
+					writer.writerow([data[field] for field in EXPORT_FIELDS])
+				yield buffer.getvalue()
+				buffer.seek(0)
+				buffer.truncate()
+			else:
+				yield "".join(row.model_dump_json() + "\n" for row in rows)
+		if export_format == "csv" and buffer.tell():
+			yield buffer.getvalue()
+	finally:
+		db.close()
+
+
+@router.get("/summary", response_model=list[TransactionSummary], dependencies=[Depends(conditional_get("transactions"))])
+async def summarize_transactions(
+	*,
+	db: AnySession = Depends(get_session),
+	group_by: List[Literal["day", "week", "month", "type", "owner_id", "inventory_id"]] = Query(
+		default=[], description="Repeatable; at most one of day/week/month (week = ISO week, labelled by its Monday)"
+	),
+	owner_id: Optional[int] = Query(default=None),
+	q: Optional[str] = Query(default=None),
+	transaction_type: Optional[TransactionType] = Query(default=None),
+	date_from: Optional[datetime] = Query(default=None),
+	date_to: Optional[datetime] = Query(default=None),
+	response: Response,
+):
+	"""Count, quantity, total and average amount per group, computed in SQL with exact decimals."""
+	try:
+		rows = await run_db(
+			db,
+			crud_transaction.summarize,
+			group_by=group_by,
+			owner_id=owner_id,
+			q=q,
+			transaction_type=transaction_type,
+			date_from=date_from,
+			date_to=date_to,
+		)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	return list_response(TransactionSummary, rows, response)
+
+
+@router.get("/export")
+async def export_transactions(
+	*,
+	export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+	owner_id: Optional[int] = Query(default=None),
+	q: Optional[str] = Query(default=None),
+	transaction_type: Optional[TransactionType] = Query(default=None),
+	date_from: Optional[datetime] = Query(default=None),
+	date_to: Optional[datetime] = Query(default=None),
+	min_total: Optional[Decimal] = Query(default=None),
+	max_total: Optional[Decimal] = Query(default=None),
+):
+	"""Stream every matching transaction (same filters as /search) as NDJSON or CSV, in (date, id) order."""
+	filters = dict(
+		owner_id=owner_id, q=q, transaction_type=transaction_type, date_from=date_from, date_to=date_to,
+		min_total=min_total, max_total=max_total,
+	)
+	if export_format == "csv":
+		return StreamingResponse(
+			export_chunks(filters, export_format),
+			media_type="text/csv",
+			headers={"Content-Disposition": 'attachment; filename="transactions.csv"'},
+		)
+	return StreamingResponse(export_chunks(filters, export_format), media_type="application/x-ndjson")
+
+
+@router.get("/detailed", response_model=list[TransactionReadDetailed], dependencies=[Depends(conditional_get("transactions", "users", "inventory"))])
+async def list_transactions_detailed(
+	*,
+	db: AnySession = Depends(get_session),
+	skip: int = Query(0, ge=0),
+	limit: int = Query(100, ge=1),
+	cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+	response: Response,
 ):
-	return crud_transaction.get_multi(db, skip=skip, limit=limit)
+	"""List transactions with owner and inventory; three queries regardless of page size."""
+	if cursor is not None:
+		try:
+			items, next_cursor = await run_db(db, crud_transaction.get_page_detailed, cursor=cursor, limit=limit)
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		if next_cursor:
+			response.headers[NEXT_CURSOR_HEADER] = next_cursor
+		return list_response(TransactionReadDetailed, items, response)
+	return list_response(TransactionReadDetailed, await run_db(db, crud_transaction.get_multi_detailed, skip=skip, limit=limit), response)
 
 
-@router.get("/{transaction_id}", response_model=TransactionRead)
-def get_transaction(*, db: Session = Depends(get_db), transaction_id: int):
-	db_obj = crud_transaction.get(db, transaction_id)
+@router.get("/{transaction_id}", response_model=TransactionRead, dependencies=[Depends(conditional_get("transactions"))])
+async def get_transaction(*, db: AnySession = Depends(get_session), transaction_id: int):
+	db_obj = await run_db(db, crud_transaction.get, transaction_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="Transaction not found")
 	return db_obj
 
 
-@router.get("/{transaction_id}/detailed", response_model=TransactionReadDetailed)
-def get_transaction_detailed(*, db: Session = Depends(get_db), transaction_id: int):
+@router.get("/{transaction_id}/detailed", response_model=TransactionReadDetailed, dependencies=[Depends(conditional_get("transactions", "users", "inventory"))])
+async def get_transaction_detailed(*, db: AnySession = Depends(get_session), transaction_id: int):
 	"""Get transaction with detailed owner and inventory information."""
-	db_obj = crud_transaction.get(db, transaction_id)
+	db_obj = await run_db(db, crud_transaction.get_detailed, transaction_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="Transaction not found")
 	return db_obj
 
 
 @router.put("/{transaction_id}", response_model=TransactionRead)
-def update_transaction(*, db: Session = Depends(get_db), transaction_id: int, obj_in: TransactionUpdate):
-	db_obj = crud_transaction.get(db, transaction_id)
+async def update_transaction(*, db: AnySession = Depends(get_session), transaction_id: int, obj_in: TransactionUpdate):
+	db_obj = await run_db(db, crud_transaction.get, transaction_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="Transaction not found")
 	if obj_in.inventory_id is not None and obj_in.inventory_id != db_obj.inventory_id:
-		if obj_in.inventory_id is not None and not crud_inventory.get(db, obj_in.inventory_id):
+		if obj_in.inventory_id is not None and not await run_db(db, crud_inventory.get, obj_in.inventory_id):
 			raise HTTPException(status_code=404, detail="Inventory not found")
-	return crud_transaction.update(db, db_obj, obj_in)
+	return await run_db(db, crud_transaction.update, db_obj, obj_in)
 
 
 @router.delete("/{transaction_id}", response_model=TransactionReadSimple)
-def delete_transaction(*, db: Session = Depends(get_db), transaction_id: int):
-	db_obj = crud_transaction.get(db, transaction_id)
+async def delete_transaction(*, db: AnySession = Depends(get_session), transaction_id: int):
+	db_obj = await run_db(db, crud_transaction.get, transaction_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="Transaction not found")
-	return crud_transaction.remove(db, db_obj)
+	return await run_db(db, crud_transaction.remove, db_obj)
@@ -0,0 +1,80 @@
+from typing import List, Literal
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.concurrency import run_in_threadpool
+from app.core.memory import capture_snapshot, memory_tracer
+from app.schemas.profile import AllocationRead, MemorySnapshotRead, MemoryStatus, RequestMemoryRead
+
+router = APIRouter(prefix="/admin/memory", tags=["admin"])
+
+SNAPSHOT_NAME = r"^[A-Za-z0-9_.-]{1,64}$"
+GroupBy = Literal["lineno", "filename"]
+
+
+@router.get("", response_model=MemoryStatus)
+async def read_memory_status():
+	return memory_tracer.status()
+
+
+@router.post("/start", response_model=MemoryStatus)
+async def start_tracing(frames: int = Query(1, ge=1, le=100)):
+	"""Start a tracemalloc session. `frames` only applies when tracing is not already running."""
+	memory_tracer.start(frames)
+	return memory_tracer.status()
+
+
+@router.post("/stop", response_model=MemoryStatus)
+async def stop_tracing():
+	memory_tracer.stop()
+	return memory_tracer.status()
+
+
+@router.get("/snapshots", response_model=List[MemorySnapshotRead])
+async def read_snapshots():
+	return memory_tracer.status()["snapshots"]
+
+
+@router.post("/snapshots/{name}", response_model=MemorySnapshotRead, status_code=201)
+async def take_snapshot(name: str = Path(..., pattern=SNAPSHOT_NAME)):
+	try:
+		memory_tracer.check_snapshot(name)
+		# gc.collect() and take_snapshot() walk the whole heap; keep them off the event loop
+		snapshot = await run_in_threadpool(capture_snapshot)
+		return memory_tracer.add_snapshot(name, snapshot)
+	except RuntimeError as exc:
+		raise HTTPException(status_code=409, detail=str(exc))
+	except KeyError:
+		raise HTTPException(status_code=409, detail=f"Snapshot {name!r} already exists")
+
+
+@router.delete("/snapshots/{name}", status_code=204)
+async def delete_snapshot(name: str):
+	if memory_tracer.snapshots.pop(name, None) is None:
+		raise HTTPException(status_code=404, detail="Snapshot not found")
+
+
+@router.get("/snapshots/{name}/top", response_model=List[AllocationRead])
+async def read_snapshot_top(name: str, group_by: GroupBy = "lineno", limit: int = Query(20, ge=1, le=1000)):
+	"""Largest live allocation sites in one snapshot."""
+	if name not in memory_tracer.snapshots:
+		raise HTTPException(status_code=404, detail="Snapshot not found")
+	return await run_in_threadpool(memory_tracer.top, name, group_by, limit)
+
+
+@router.get("/diff", response_model=List[AllocationRead])
+async def read_snapshot_diff(
+	base: str,
+	target: str,
+	group_by: GroupBy = "lineno",
+	limit: int = Query(20, ge=1, le=1000),
+):
+	"""Top-N allocation sites by size change from snapshot `base` to snapshot `target`."""
+	missing = [name for name in (base, target) if name not in memory_tracer.snapshots]
+	if missing:
+		raise HTTPException(status_code=404, detail=f"Snapshot not found: {', '.join(missing)}")
+	return await run_in_threadpool(memory_tracer.diff, base, target, group_by, limit)
+
+
+@router.get("/requests", response_model=List[RequestMemoryRead])
+async def read_request_peaks(limit: int = Query(20, ge=1, le=100)):
+	"""Peak traced memory of the most recent profiled requests, newest first."""
+	return list(memory_tracer.requests)[:limit]
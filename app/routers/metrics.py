@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+import anyio.to_thread
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus client defaults (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests that match no route share one label so unknown paths cannot grow the series set
+UNMATCHED = "<unmatched>"
+
+
+class Histogram:
+	__slots__ = ("counts", "sum", "count")
+
+	def __init__(self):
+		self.counts = [0] * len(LATENCY_BUCKETS)
+		self.sum = 0.0
+		self.count = 0
+
+	def observe(self, value: float) -> None:
+		for i, bound in enumerate(LATENCY_BUCKETS):
+			if value <= bound:
+				self.counts[i] += 1
+				break
+		self.sum += value
+		self.count += 1
+
+
+class Metrics:
+	"""In-process counters rendered in the Prometheus text format (0.0.4).
+
+	Request metrics are only touched from the event loop; pool events arrive from worker
+	threads and greenlets and go through a lock. Values are per process.
+	"""
+
+	def __init__(self):
+		self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+		self.errors: Dict[Tuple[str, str], int] = defaultdict(int)
+		self.in_progress: Dict[Tuple[str, str], int] = defaultdict(int)
+		self.latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+		self.pool_checkouts: Dict[str, int] = defaultdict(int)
+		self.pools: Dict[str, object] = {}
+		self._lock = threading.Lock()
+
+	def watch_pool(self, name: str, engine) -> None:
+		"""Count checkouts from `engine`'s pool (a sync Engine) and report its occupancy."""
+		self.pools[name] = engine.pool
+
+		def on_checkout(dbapi_connection, connection_record, connection_proxy):
+			with self._lock:
+				self.pool_checkouts[name] += 1
+
+		event.listen(engine, "checkout", on_checkout)
+
+	def render(self) -> str:
+		lines: List[str] = []
+
+		def family(name: str, kind: str, help_text: str) -> None:
+			lines.append(f"# HELP {name} {help_text}")
+			lines.append(f"# TYPE {name} {kind}")
+
+		family("http_requests_total", "counter", "HTTP requests by route template and status code.")
+		for (method, route, status), value in sorted(self.requests.items()):
+			lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {value}')
+
+		family("http_request_errors_total", "counter", "Requests that raised or answered 5xx.")
+		for (method, route), value in sorted(self.errors.items()):
+			lines.append(f'http_request_errors_total{{method="{method}",route="{_escape(route)}"}} {value}')
+
+		family("http_requests_in_progress", "gauge", "Requests currently being handled.")
+		for (method, route), value in sorted(self.in_progress.items()):
+			lines.append(f'http_requests_in_progress{{method="{method}",route="{_escape(route)}"}} {value}')
+
+		family("http_request_duration_seconds", "histogram", "Request latency, until the response body is sent.")
+		for (method, route), histogram in sorted(self.latency.items()):
+			labels = f'method="{method}",route="{_escape(route)}"'
+			cumulative = 0
+			for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+				cumulative += count
+				lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+			lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+			lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+			lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+		family("db_pool_checkouts_total", "counter", "Connections handed out by the SQLAlchemy pool.")
+		with self._lock:
+			checkouts = dict(self.pool_checkouts)
+		for name in self.pools:
+			lines.append(f'db_pool_checkouts_total{{engine="{name}"}} {checkouts.get(name, 0)}')
+		family("db_pool_checked_out", "gauge", "Connections currently checked out of the pool.")
+		for name, pool in self.pools.items():
+			lines.append(f'db_pool_checked_out{{engine="{name}"}} {pool.checkedout() if hasattr(pool, "checkedout") else 0}')
+		family("db_pool_size", "gauge", "Configured pool size (overflow connections come on top).")
+		for name, pool in self.pools.items():
+			lines.append(f'db_pool_size{{engine="{name}"}} {pool.size() if hasattr(pool, "size") else 0}')
+
+		# Sync CRUD calls and sync endpoints share anyio's default limiter
+		limiter = anyio.to_thread.current_default_thread_limiter()
+		family("threadpool_busy_threads", "gauge", "Worker threads in use by run_in_threadpool / sync endpoints.")
+		lines.append(f"threadpool_busy_threads {limiter.borrowed_tokens}")
+		family("threadpool_max_threads", "gauge", "Worker thread limit.")
+		lines.append(f"threadpool_max_threads {int(limiter.total_tokens)}")
+		family("threadpool_waiting_tasks", "gauge", "Tasks queued for a worker thread (saturation).")
+		lines.append(f"threadpool_waiting_tasks {limiter.statistics().tasks_waiting}")
+		return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def route_template(routes: Sequence[BaseRoute], scope: Scope) -> str:
+	"""Path template of the route `scope` will be dispatched to, or UNMATCHED."""
+	for route in routes:
+		match, _ = route.matches(scope)
+		if match == Match.FULL:
+			return route.path
+	return UNMATCHED
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+	"""Record count, latency, in-flight and errors per (method, route template) into `metrics`.
+
+	`routes` (the app's routes) label requests by template, e.g. /transactions/{transaction_id},
+	before the router runs, so the in-flight gauge is per route too.
+	"""
+
+	def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute] = ()):
+		self.app = app
+		self.routes = routes
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		key = (scope["method"], route_template(self.routes, scope))
+		metrics.in_progress[key] += 1
+		status = 500
+		started = time.perf_counter()
+
+		async def send_with_status(message: Message) -> None:
+			nonlocal status
+			if message["type"] == "http.response.start":
+				status = message["status"]
+			await send(message)
+
+		try:
+			await self.app(scope, receive, send_with_status)
+		except Exception:
+			status = 500
+			raise
+		finally:
+			elapsed = time.perf_counter() - started
+			metrics.in_progress[key] -= 1
+			metrics.requests[key + (status,)] += 1
+			metrics.latency[key].observe(elapsed)
+			if status >= 500:
+				metrics.errors[key] += 1
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+	"""Prometheus text exposition of this process's request, DB pool and thread-pool metrics."""
+	return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.memory import memory_tracer
+from app.core.profiling import PROFILE_FORMATS, RequestProfile, active_profile
+from app.routers.metrics import UNMATCHED, route_template
+from app.schemas.profile import ProfileRead
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+PROFILE_NAME = re.compile(r"^[0-9]{8}T[0-9]{6}-[A-Z]+-[A-Za-z0-9_]+-[0-9a-f]{8}\.(prof|collapsed)$")
+MEDIA_TYPES = {".prof": "application/octet-stream", ".collapsed": "text/plain; charset=utf-8"}
+OFF = ("", "0", "false", "no", "off")
+
+
+def profile_name(method: str, route: str, suffix: str) -> str:
+	slug = "unmatched" if route == UNMATCHED else re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+	return f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def list_profiles() -> List[ProfileRead]:
+	"""Profile files in settings.profile_dir, newest first."""
+	try:
+		entries = [entry for entry in os.scandir(settings.profile_dir) if PROFILE_NAME.match(entry.name) and entry.is_file()]
+	except FileNotFoundError:
+		return []
+	entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name), reverse=True)
+	return [
+		ProfileRead(
+			name=entry.name,
+			format="collapsed" if entry.name.endswith(".collapsed") else "pstats",
+			size=entry.stat().st_size,
+			created=datetime.fromtimestamp(entry.stat().st_mtime),
+		)
+		for entry in entries
+	]
+
+
+def save_profile(profile: RequestProfile, name: str) -> None:
+	os.makedirs(settings.profile_dir, exist_ok=True)
+	profile.dump(os.path.join(settings.profile_dir, name))
+	for old in list_profiles()[max(settings.profile_keep, 1):]:
+		try:
+			os.remove(os.path.join(settings.profile_dir, old.name))
+		except FileNotFoundError:
+			pass
+
+
+class ProfilingMiddleware:
+	"""Profile single requests on demand and write the result to settings.profile_dir.
+
+	A request is profiled when it carries `X-Profile` or `?profile=` (value 1/true for
+	settings.profile_format, or a format name), or when it is the Nth request to a route
+	template listed in settings.profile_sample_rates. One request is profiled at a time;
+	others arriving meanwhile run unprofiled. The file name is returned in X-Profile-Id.
+
+	Profiled requests also report their peak traced (tracemalloc) memory above the level
+	at request start in X-Memory-Peak, measured when the response starts, and in
+	memory_tracer.requests, measured when it ends.
+	"""
+
+	def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute] = ()):
+		self.app = app
+		self.routes = routes
+		self.seen: Dict[str, int] = defaultdict(int)
+		self.busy = False
+
+	def requested_format(self, scope: Scope) -> Optional[str]:
+		value = Headers(scope=scope).get("x-profile")
+		if value is None:
+			value = QueryParams(scope.get("query_string", b"")).get("profile")
+		if value is None or value.strip().lower() in OFF:
+			return None
+		value = value.strip().lower()
+		return value if value in PROFILE_FORMATS else settings.profile_format
+
+	def sampled_format(self, route: str) -> Optional[str]:
+		rate = settings.profile_sample_rates.get(route, 0)
+		if rate <= 0:
+			return None
+		self.seen[route] += 1
+		return settings.profile_format if self.seen[route] % rate == 0 else None
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		route = route_template(self.routes, scope)
+		profile_format = self.requested_format(scope) or self.sampled_format(route)
+		if profile_format is None or self.busy:
+			await self.app(scope, receive, send)
+			return
+
+		self.busy = True
+		profile = PROFILE_FORMATS[profile_format]()
+		name = profile_name(scope["method"], route, profile.suffix)
+
+		async def send_with_profile_id(message: Message) -> None:
+			if message["type"] == "http.response.start":
+				headers = MutableHeaders(scope=message)
+				headers.append("X-Profile-Id", name)
+				headers.append("X-Memory-Peak", str(memory_tracer.request_peak(baseline)))
+			await send(message)
+
+		baseline = memory_tracer.begin_request()
+		token = active_profile.set(profile)
+		profile.start()
+		try:
+			await self.app(scope, receive, send_with_profile_id)
+		finally:
+			profile.stop()
+			active_profile.reset(token)
+			memory_tracer.end_request(baseline, method=scope["method"], route=route, profile=name)
+			self.busy = False
+			await run_in_threadpool(save_profile, profile, name)
+
+
+@router.get("", response_model=List[ProfileRead])
+async def read_profiles(limit: int = Query(20, ge=1, le=1000)):
+	"""Most recent request profiles, newest first."""
+	return (await run_in_threadpool(list_profiles))[:limit]
+
+
+@router.get("/latest")
+async def download_latest_profile():
+	profiles = await run_in_threadpool(list_profiles)
+	if not profiles:
+		raise HTTPException(status_code=404, detail="No profiles recorded")
+	return profile_file(profiles[0].name)
+
+
+@router.get("/{name}")
+async def download_profile(name: str):
+	# Only names this module generates, so the path cannot leave profile_dir
+	if not PROFILE_NAME.match(name) or not os.path.isfile(os.path.join(settings.profile_dir, name)):
+		raise HTTPException(status_code=404, detail="Profile not found")
+	return profile_file(name)
+
+
+def profile_file(name: str) -> FileResponse:
+	suffix = os.path.splitext(name)[1]
+	return FileResponse(os.path.join(settings.profile_dir, name), media_type=MEDIA_TYPES[suffix], filename=name)
@@ -0,0 +1,51 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from app.core.config import settings
+
+try:
+	import orjson
+except ImportError:  # pinned in requirements.txt; tolerated for partial installs
+	orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+	# Same wire format as Pydantic's JSON mode: exact decimal strings, not floats
+	if isinstance(value, Decimal):
+		return str(value)
+	raise TypeError(f"Type {type(value)} is not JSON serializable")
+
+
+class DecimalORJSONResponse(JSONResponse):
+	"""JSONResponse rendered by orjson; Decimals are written as strings."""
+
+	def render(self, content: Any) -> bytes:
+		return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class() -> Type[JSONResponse]:
+	if settings.orjson_responses and orjson is not None:
+		return DecimalORJSONResponse
+	return JSONResponse
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+	return TypeAdapter(List[schema])
+
+
+def list_response(schema: Type[BaseModel], items: Iterable[Any], response: Response) -> Response:
+	"""Serialize ORM rows straight to JSON bytes with one validation pass.
+
+	Skips FastAPI's response_model round trip (validate, dump to Python, jsonable_encoder,
+	json.dumps); keep response_model on the route for the OpenAPI schema. Headers already set on
+	the injected `response` (ETag, X-Next-Cursor) are carried over.
+	"""
+	adapter = list_adapter(schema)
+	body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+	fast = Response(content=body, media_type="application/json")
+	fast.raw_headers.extend(header for header in response.raw_headers if header[0] != b"content-length")
+	return fast
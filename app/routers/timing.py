@@ -0,0 +1,39 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db.session import QueryStats, query_stats
+
+
+def server_timing(stats: QueryStats, total: float) -> str:
+	return f'db;dur={stats.seconds * 1000:.2f};desc="queries={stats.count}", total;dur={total * 1000:.2f}'
+
+
+class ServerTimingMiddleware:
+	"""Collect the SQL statements each HTTP request runs and report them in a Server-Timing header.
+
+	Plain ASGI (not BaseHTTPMiddleware) so the endpoint runs in this context and sees the
+	QueryStats set here. The header is written when the response starts; statements a
+	streaming body runs afterwards are not included.
+	"""
+
+	def __init__(self, app: ASGIApp):
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		stats = QueryStats()
+		token = query_stats.set(stats)
+		started = time.perf_counter()
+
+		async def send_with_timing(message: Message) -> None:
+			if message["type"] == "http.response.start":
+				headers = MutableHeaders(scope=message)
+				headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+			await send(message)
+
+		try:
+			await self.app(scope, receive, send_with_timing)
+		finally:
+			query_stats.reset(token)
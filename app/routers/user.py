@@ -1,49 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
+from app.db.session import AnySession, get_session, run_db
 from app.crud import user as crud_user
+from app.crud import item as crud_transaction
 from app.schemas.user import UserRead, UserCreate, UserUpdate, UserReadSimple
+from app.schemas.item import TransactionReadSimple
+from app.crud.pagination import NEXT_CURSOR_HEADER
+from app.routers.conditional import conditional_get
+from app.routers.responses import list_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("", response_model=UserReadSimple, status_code=201)
-def create_user(*, db: Session = Depends(get_db), obj_in: UserCreate):
+async def create_user(*, db: AnySession = Depends(get_session), obj_in: UserCreate):
 	try:
-		return crud_user.create(db, obj_in)
+		return await run_db(db, crud_user.create, obj_in)
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("", response_model=list[UserReadSimple])
-def list_users(
-	*, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1)
+@router.get("", response_model=list[UserReadSimple], dependencies=[Depends(conditional_get("users"))])
+async def list_users(
+	*,
+	db: AnySession = Depends(get_session),
+	skip: int = Query(0, ge=0),
+	limit: int = Query(100, ge=1),
+	cursor: Optional[str] = Query(default=None, description="Keyset cursor from X-Next-Cursor; send empty to start. Ignores skip."),
+	response: Response,
 ):
-	return crud_user.get_multi(db, skip=skip, limit=limit)
+	if cursor is not None:
+		try:
+			items, next_cursor = await run_db(db, crud_user.get_page, cursor=cursor, limit=limit)
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=str(e))
+		if next_cursor:
+			response.headers[NEXT_CURSOR_HEADER] = next_cursor
+		return list_response(UserReadSimple, items, response)
+	return list_response(UserReadSimple, await run_db(db, crud_user.get_multi, skip=skip, limit=limit), response)
 
 
-@router.get("/{user_id}", response_model=UserRead)
-def get_user(*, db: Session = Depends(get_db), user_id: int):
-	db_obj = crud_user.get(db, user_id)
+@router.get("/{user_id}", response_model=UserRead, dependencies=[Depends(conditional_get("users", "transactions"))])
+async def get_user(
+	*,
+	db: AnySession = Depends(get_session),
+	user_id: int,
+	include_transactions: int = Query(0, ge=0, le=1000, description="Embed this many most recent transactions (0 = none). Use /users/{id}/transactions to page through all."),
+):
+	db_obj = await run_db(db, crud_user.get_with_transactions, user_id, include_transactions)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="User not found")
 	return db_obj
 
 
+@router.get("/{user_id}/transactions", response_model=list[TransactionReadSimple], dependencies=[Depends(conditional_get("users", "transactions"))])
+async def list_user_transactions(
+	*,
+	db: AnySession = Depends(get_session),
+	user_id: int,
+	limit: int = Query(100, ge=1),
+	cursor: str = Query(default="", description="Keyset cursor from X-Next-Cursor; empty for the first page."),
+	response: Response,
+):
+	"""A user's transactions in (date, id) order, keyset-paginated over ix_transactions_owner_id_date."""
+	if not await run_db(db, crud_user.get, user_id):
+		raise HTTPException(status_code=404, detail="User not found")
+	try:
+		items, next_cursor = await run_db(db, crud_transaction.search_page, owner_id=user_id, cursor=cursor, limit=limit)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	if next_cursor:
+		response.headers[NEXT_CURSOR_HEADER] = next_cursor
+	return list_response(TransactionReadSimple, items, response)
+
+
 @router.put("/{user_id}", response_model=UserRead)
-def update_user(*, db: Session = Depends(get_db), user_id: int, obj_in: UserUpdate):
-	db_obj = crud_user.get(db, user_id)
+async def update_user(*, db: AnySession = Depends(get_session), user_id: int, obj_in: UserUpdate):
+	db_obj = await run_db(db, crud_user.get, user_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="User not found")
 	try:
-		return crud_user.update(db, db_obj, obj_in)
+		await run_db(db, crud_user.update, db_obj, obj_in)
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e))
+	return await run_db(db, crud_user.get_with_transactions, user_id)
 
 
 @router.delete("/{user_id}", response_model=UserReadSimple)
-def delete_user(*, db: Session = Depends(get_db), user_id: int):
-	db_obj = crud_user.get(db, user_id)
+async def delete_user(*, db: AnySession = Depends(get_session), user_id: int):
+	db_obj = await run_db(db, crud_user.get, user_id)
 	if not db_obj:
 		raise HTTPException(status_code=404, detail="User not found")
-	return crud_user.remove(db, db_obj)
+	return await run_db(db, crud_user.remove, db_obj)
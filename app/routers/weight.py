@@ -1,37 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import Optional
-from app.db.session import get_db
+from sqlalchemy.exc import IntegrityError
+from app.db.session import AnySession, get_session, run_db
 from app.crud import weight as crud_weight
 from app.schemas.weight import WeightRead, WeightCreate, WeightUpdate, WeightReadSimple
+from app.routers.conditional import conditional_get
+from app.routers.responses import list_response
 
 router = APIRouter(prefix="/weights", tags=["weights"])
 
 @router.post("", response_model=WeightReadSimple, status_code=201)
-def create_weight(*, db: Session = Depends(get_db), obj_in: WeightCreate):
-    return crud_weight.create(db, obj_in)
+async def create_weight(*, db: AnySession = Depends(get_session), obj_in: WeightCreate):
+    return await run_db(db, crud_weight.create, obj_in)
 
-@router.get("", response_model=list[WeightReadSimple])
-def list_weights(*, db: Session = Depends(get_db), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1)):
-    return crud_weight.get_multi(db, skip=skip, limit=limit)
+@router.get("", response_model=list[WeightReadSimple], dependencies=[Depends(conditional_get("weights"))])
+async def list_weights(*, db: AnySession = Depends(get_session), skip: int = Query(0, ge=0), limit: int = Query(100, ge=1), response: Response):
+    return list_response(WeightReadSimple, await run_db(db, crud_weight.get_multi, skip=skip, limit=limit), response)
 
-@router.get("/{weight_id}", response_model=WeightRead)
-def get_weight(*, db: Session = Depends(get_db), weight_id: int):
-    db_obj = crud_weight.get(db, weight_id)
+@router.get("/{weight_id}", response_model=WeightRead, dependencies=[Depends(conditional_get("weights"))])
+async def get_weight(*, db: AnySession = Depends(get_session), weight_id: int):
+    db_obj = await run_db(db, crud_weight.get_cached, weight_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Weight not found")
     return db_obj
 
 @router.put("/{weight_id}", response_model=WeightRead)
-def update_weight(*, db: Session = Depends(get_db), weight_id: int, obj_in: WeightUpdate):
-    db_obj = crud_weight.get(db, weight_id)
+async def update_weight(*, db: AnySession = Depends(get_session), weight_id: int, obj_in: WeightUpdate):
+    db_obj = await run_db(db, crud_weight.get, weight_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Weight not found")
-    return crud_weight.update(db, db_obj, obj_in)
+    return await run_db(db, crud_weight.update, db_obj, obj_in)
 
 @router.delete("/{weight_id}", response_model=WeightReadSimple)
-def delete_weight(*, db: Session = Depends(get_db), weight_id: int):
-    db_obj = crud_weight.get(db, weight_id)
+async def delete_weight(*, db: AnySession = Depends(get_session), weight_id: int):
+    db_obj = await run_db(db, crud_weight.get, weight_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Weight not found")
-    return crud_weight.remove(db, db_obj)
\ No newline at end of file
+    try:
+        return await run_db(db, crud_weight.remove, db_obj)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Weight is still used by inventory items")
\ No newline at end of file
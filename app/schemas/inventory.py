@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, TYPE_CHECKING
+from typing import List, Literal, Optional, TYPE_CHECKING
+from datetime import datetime
 from decimal import Decimal
 
 if TYPE_CHECKING:
@@ -41,6 +42,28 @@ class InventoryReadSimple(BaseModel):
     weight_id: int
     model_config = {"from_attributes": True}
 
+class InventoryAsOf(BaseModel):
+    id: int
+    name: str
+    shortname: Optional[str]
+    quantity: Decimal
+    at: datetime
+    # Snapshot the quantity was replayed from (None: replayed backwards from the current stock)
+    snapshot_at: Optional[datetime] = None
+
+class InventoryBulkResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    shortname: Optional[str] = None
+    status: Optional[Literal["created", "updated"]] = None
+    error: Optional[str] = None
+
+class InventoryBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[InventoryBulkResult]
+
 # Enhanced read schema with nested category and weight information
 class InventoryReadDetailed(BaseModel):
     id: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from app.models.transaction import TransactionType
@@ -95,6 +95,30 @@ class TransactionReadSimple(BaseModel):
 	model_config = {"from_attributes": True}
 
 
+class TransactionBulkResult(BaseModel):
+	index: int
+	id: Optional[int] = None
+	error: Optional[str] = None
+
+
+class TransactionBulkResponse(BaseModel):
+	created: int
+	failed: int
+	results: List[TransactionBulkResult]
+
+
+class TransactionSummary(BaseModel):
+	"""One GROUP BY bucket of /transactions/summary; keys not grouped on are null."""
+	period: Optional[str] = None
+	transaction_type: Optional[TransactionType] = None
+	owner_id: Optional[int] = None
+	inventory_id: Optional[int] = None
+	count: int
+	quantity: Decimal
+	total_amount: Decimal
+	average_amount: Decimal
+
+
 # Enhanced read schema with nested owner and inventory information
 class TransactionReadDetailed(BaseModel):
 	id: int
@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+
+class ProfileRead(BaseModel):
+	name: str
+	format: Literal["pstats", "collapsed"]
+	size: int
+	created: datetime
+
+
+class MemorySnapshotRead(BaseModel):
+	name: str
+	taken: datetime
+	traced_bytes: int
+	blocks: int
+
+
+class MemoryStatus(BaseModel):
+	tracing: bool
+	session: bool
+	frames: int
+	traced_bytes: int
+	peak_bytes: int
+	tracemalloc_bytes: int
+	snapshots: List[MemorySnapshotRead] = []
+
+
+class AllocationRead(BaseModel):
+	file: str
+	line: Optional[int] = None
+	size: int
+	size_diff: int = 0
+	count: int
+	count_diff: int = 0
+
+
+class RequestMemoryRead(BaseModel):
+	method: str
+	route: str
+	profile: str
+	peak_bytes: int
+	finished: datetime
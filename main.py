@@ -1,13 +1,21 @@
 # Entry point will be implemented after scaffolding.
+import asyncio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
+import logging
+from sqlalchemy import inspect, text, and_
 from sqlalchemy.orm import Session
 from datetime import datetime
 from decimal import Decimal
 
 from app.core.config import settings
-from app.db.session import Base, engine, SessionLocal
+from app.db.session import Base, engine, SessionLocal, async_engine
+from app.db.fts import ensure_transactions_fts
+from app.db.generations import ensure_table_generations
+from app.db.rollup import ensure_transaction_rollup
+from app.db.stock import last_periodic_snapshot, take_inventory_snapshot
+from app.db.types import ensure_storage_format
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionType
 from app.models.category import Category
@@ -29,9 +37,16 @@ from app.routers.item import router as transactions_router
 from app.routers.category import router as categories_router
 from app.routers.weight import router as weights_router
 from app.routers.inventory import router as inventory_router
+from app.routers.responses import default_response_class
+from app.routers.timing import ServerTimingMiddleware
+from app.routers.metrics import MetricsMiddleware, metrics, router as metrics_router
+from app.routers.profiling import ProfilingMiddleware, router as profiles_router
+from app.routers.memory import router as memory_router
 
 
-app = FastAPI(title=settings.app_name, debug=settings.debug)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title=settings.app_name, debug=settings.debug, default_response_class=default_response_class())
 
 app.add_middleware(
 	CORSMiddleware,
@@ -39,13 +54,30 @@ app.add_middleware(
 	allow_credentials=True,
 	allow_methods=["*"],
 	allow_headers=["*"],
+	expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "X-Profile-Id", "X-Memory-Peak"],
 )
+if settings.profiling_enabled:
+	# Inside the timing and metrics middleware, so their work is not in the profiles
+	app.add_middleware(ProfilingMiddleware, routes=app.router.routes)
+if settings.server_timing:
+	app.add_middleware(ServerTimingMiddleware)
+if settings.metrics_enabled:
+	# Outermost, so latency covers the other middleware too
+	app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+	metrics.watch_pool("sync", engine)
+	if async_engine is not None:
+		metrics.watch_pool("async", async_engine.sync_engine)
 
 app.include_router(users_router)
 app.include_router(transactions_router)
 app.include_router(categories_router)
 app.include_router(weights_router)
 app.include_router(inventory_router)
+if settings.metrics_enabled:
+	app.include_router(metrics_router)
+if settings.profiling_enabled:
+	app.include_router(profiles_router)
+	app.include_router(memory_router)
 
 
 def enforce_columns(conn):
@@ -63,6 +95,33 @@ def enforce_columns(conn):
 			conn.execute(text(f'ALTER TABLE transactions ADD COLUMN {name} {sql_type}'))
 
 
+def has_duplicates(conn, index) -> bool:
+	columns = list(index.columns)
+	stmt = (
+		select(*columns)
+		.where(and_(*[c.is_not(None) for c in columns]))
+		.group_by(*columns)
+		.having(func.count() > 1)
+		.limit(1)
+	)
+	return conn.execute(stmt).first() is not None
+
+
+def enforce_indexes(conn):
+	# create_all() skips tables that already exist, so indexes declared later are added here.
+	existing = {}
+	for table in Base.metadata.sorted_tables:
+		for index in table.indexes:
+			if table.name not in existing:
+				existing[table.name] = {ix['name'] for ix in inspect(conn).get_indexes(table.name)}
+			if index.name in existing[table.name]:
+				continue
+			if index.unique and has_duplicates(conn, index):
+				logger.warning("Skipping unique index %s: %s has duplicate values", index.name, table.name)
+				continue
+			index.create(conn)
+
+
 def seed(db: Session):
 	# Seed user only if no users exist
 	user_count = db.scalar(select(func.count()).select_from(User))
@@ -158,16 +217,70 @@ def seed(db: Session):
 			)
 
 
+def warm_reference_cache():
+	"""Load the category/weight caches so the first inventory write does not pay for it."""
+	db = SessionLocal()
+	try:
+		crud_category.category.load(db)
+		crud_weight.weight.load(db)
+	finally:
+		db.close()
+
+
+def snapshot_inventory_if_due() -> int:
+	"""Take a periodic inventory snapshot unless one is younger than the interval (restarts, other workers)."""
+	now = datetime.now()
+	with engine.begin() as conn:
+		last = last_periodic_snapshot(conn)
+		if last is not None and (now - last).total_seconds() < settings.inventory_snapshot_interval:
+			return 0
+		return take_inventory_snapshot(conn, now)
+
+
+async def snapshot_inventory_periodically():
+	while True:
+		try:
+			await run_in_threadpool(snapshot_inventory_if_due)
+		except Exception:
+			logger.exception("Inventory snapshot failed")
+		await asyncio.sleep(settings.inventory_snapshot_interval)
+
+
 @app.on_event("startup")
 def on_startup():
+	# Refuse to read integer fixed-point data as NUMERIC (or the reverse) before anything touches it
+	with engine.begin() as conn:
+		ensure_storage_format(conn)
 	# Create tables
 	Base.metadata.create_all(bind=engine)
 	# Enforce columns for backward compatibility
-	with engine.connect() as conn:
+	with engine.begin() as conn:
 		enforce_columns(conn)
+		enforce_indexes(conn)
+		if settings.transaction_fts_enabled:
+			ensure_transactions_fts(conn)
+		ensure_table_generations(conn)
+		if settings.transaction_rollup_enabled:
+			ensure_transaction_rollup(conn)
+	warm_reference_cache()
 	# Note: Seeding is now manual via POST /seed endpoint
 
 
+@app.on_event("startup")
+async def start_background_jobs():
+	if settings.inventory_snapshot_interval > 0:
+		app.state.snapshot_task = asyncio.create_task(snapshot_inventory_periodically())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+	task = getattr(app.state, "snapshot_task", None)
+	if task is not None:
+		task.cancel()
+	if async_engine is not None:
+		await async_engine.dispose()
+
+
 @app.get("/health")
 def health():
 	return {"status": "ok"}
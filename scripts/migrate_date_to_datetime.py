@@ -88,13 +88,13 @@ def migrate_date_to_datetime():
             """))
             
             # Copy data from old table to new table
-            # Convert DATE to DATETIME by appending time portion
+            # Convert DATE to DATETIME by appending the time portion in SQLAlchemy's '.ffffff' format
             conn.execute(text("""
                 INSERT INTO transactions_new 
                     (id, title, description, owner_id, transaction_type, amount, quantity, purchase_price, inventory_id, date)
                 SELECT 
                     id, title, description, owner_id, transaction_type, amount, quantity, purchase_price, inventory_id,
-                    datetime(date) as date
+                    datetime(date) || '.000000' as date
                 FROM transactions
             """))
             
@@ -0,0 +1,94 @@
+"""
+Switch money and quantity storage between NUMERIC (REAL-backed) and integer fixed-point.
+Fixed-point stores amount / purchase_price as integer cents and every quantity as integer
+thousandths; set FIXED_POINT_STORAGE to match afterwards (the app refuses to start otherwise).
+The rollup, stock ledger and snapshot triggers and the generated transactions.total_amount_cents
+column scale differently per format, so they are recreated; transaction_daily_rollup itself is already integer and is left as is.
+
+Usage:
+    python scripts/migrate_fixed_point.py               # NUMERIC -> integer fixed-point
+    python scripts/migrate_fixed_point.py --to-decimal  # integer fixed-point -> NUMERIC
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import inspect, text
+from app.core.config import settings
+from app.db.session import engine
+from app.db import rollup, stock, totals
+from app.db.types import current_fixed_point, record_fixed_point
+
+# (table, column, scale)
+COLUMNS = [
+    ("transactions", "amount", 2),
+    ("transactions", "purchase_price", 2),
+    ("transactions", "quantity", 3),
+    ("inventory", "quantity", 3),
+    ("inventory", "opening_quantity", 3),
+    (stock.INVENTORY_SNAPSHOTS, "quantity", 3),
+]
+
+
+def rescale_sql(table, column, scale, to_fixed):
+    if to_fixed:
+        return f"UPDATE {table} SET {column} = CAST(round({column} * {10 ** scale}) AS INTEGER)"
+    return f"UPDATE {table} SET {column} = round({column} / {10.0 ** scale}, {scale})"
+
+
+def main():
+    to_fixed = "--to-decimal" not in sys.argv[1:]
+    target = "integer fixed-point" if to_fixed else "NUMERIC"
+    print("=" * 70)
+    print(f"MIGRATE MONEY / QUANTITY STORAGE TO {target.upper()}")
+    print("=" * 70)
+    print()
+
+    try:
+        with engine.begin() as conn:
+            if current_fixed_point(conn) == to_fixed:
+                record_fixed_point(conn, to_fixed)
+                print(f"✓ Database already uses {target} storage")
+                return True
+            # First statement is DML, so pysqlite opens the transaction here and the trigger
+            # drops and rescaling below commit or roll back together
+            record_fixed_point(conn, to_fixed)
+            installed = {
+                name for (name,) in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+            }
+            scaled_triggers = rollup.ROLLUP_TRIGGERS + stock.STOCK_TRIGGERS + stock.SNAPSHOT_TRIGGERS
+            for name in scaled_triggers:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            # Its generated expression is per format too; re-added (with its indexes) below
+            if inspect(conn).has_table("transactions"):
+                totals.drop_total_amount_column(conn)
+
+            for table, column, scale in COLUMNS:
+                # opening_quantity / inventory_snapshots appear on the app's first start after the stock ledger
+                if not inspect(conn).has_table(table):
+                    continue
+                if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+                    continue
+                result = conn.execute(text(rescale_sql(table, column, scale, to_fixed)))
+                print(f"  {table}.{column}: {result.rowcount} row(s)")
+
+            settings.fixed_point_storage = to_fixed
+            totals.ensure_total_amount_column(conn)
+            if installed.issuperset(stock.STOCK_TRIGGERS):
+                stock.install_stock_triggers(conn)
+            if installed.issuperset(rollup.ROLLUP_TRIGGERS):
+                for ddl in rollup.trigger_ddl():
+                    conn.execute(text(ddl))
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        return False
+
+    print()
+    print(f"✓ Migrated to {target} storage; set FIXED_POINT_STORAGE={str(to_fixed).lower()}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
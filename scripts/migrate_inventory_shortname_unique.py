@@ -0,0 +1,71 @@
+"""
+In-place migration: make inventory.shortname unique so catalogue imports can upsert on it.
+Duplicate shortnames are reported; with --fix every duplicate except the oldest row gets
+its id appended (e.g. "DI" -> "DI-42") before the unique index ix_inventory_shortname is created.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.db.session import engine
+
+DUPLICATES_SQL = """
+    SELECT id, shortname FROM inventory
+    WHERE shortname IN (
+        SELECT shortname FROM inventory WHERE shortname IS NOT NULL
+        GROUP BY shortname HAVING COUNT(*) > 1
+    )
+    ORDER BY shortname, id
+"""
+
+
+def find_duplicates(conn):
+    return conn.execute(text(DUPLICATES_SQL)).all()
+
+
+def dedupe_shortnames(conn) -> int:
+    """Suffix all but the first row of each duplicate shortname with its id; returns rows renamed."""
+    renamed = 0
+    previous = None
+    for row_id, shortname in find_duplicates(conn):
+        if shortname == previous:
+            conn.execute(
+                text("UPDATE inventory SET shortname = :shortname WHERE id = :id"),
+                {"shortname": f"{shortname}-{row_id}", "id": row_id},
+            )
+            renamed += 1
+        previous = shortname
+    return renamed
+
+
+def main():
+    fix = "--fix" in sys.argv[1:]
+    print("=" * 70)
+    print("IN-PLACE MIGRATION: Unique inventory shortname")
+    print("=" * 70)
+    print()
+
+    from main import enforce_indexes
+
+    with engine.begin() as conn:
+        duplicates = find_duplicates(conn)
+        if duplicates and not fix:
+            print("✗ Duplicate shortnames found:")
+            for row_id, shortname in duplicates:
+                print(f"    id={row_id} shortname={shortname}")
+            print("\nRe-run with --fix to rename all but the oldest row of each shortname.")
+            return False
+        if duplicates:
+            renamed = dedupe_shortnames(conn)
+            print(f"✓ Renamed {renamed} duplicate shortname(s)")
+        enforce_indexes(conn)
+
+    print("✓ Unique index ix_inventory_shortname in place")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
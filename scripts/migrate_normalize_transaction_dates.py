@@ -0,0 +1,43 @@
+"""
+In-place migration: normalize legacy transaction dates to the '.ffffff' storage format.
+Rows restored by migrate_date_to_datetime.py before it wrote microseconds are stored as
+'YYYY-MM-DD HH:MM:SS'; SQLAlchemy writes 'YYYY-MM-DD HH:MM:SS.ffffff'. The shorter form
+breaks string ordering against bound datetimes (range filters, keyset cursors, as-of reads),
+so '.000000' is appended to every such row. Safe to run more than once.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import inspect, text
+from app.db.session import engine
+
+
+def normalize_dates(conn) -> int:
+    """Append '.000000' to transaction dates stored without microseconds; returns rows changed."""
+    if not inspect(conn).has_table('transactions'):
+        return 0
+    return conn.execute(text("UPDATE transactions SET date = date || '.000000' WHERE length(date) = 19")).rowcount
+
+
+def main():
+    print("=" * 70)
+    print("IN-PLACE MIGRATION: Normalize transaction dates")
+    print("=" * 70)
+    print()
+
+    try:
+        with engine.begin() as conn:
+            changed = normalize_dates(conn)
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        return False
+
+    print(f"✓ {changed} transaction date(s) normalized")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
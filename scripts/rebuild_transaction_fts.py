@@ -0,0 +1,39 @@
+"""
+Backfill / repair the FTS5 full-text index used by transaction keyword search.
+Creates the transactions_fts table and its sync triggers if missing, then re-indexes
+every existing transaction.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.db.session import engine
+from app.db.fts import TRANSACTIONS_FTS, ensure_transactions_fts, rebuild_transactions_fts
+
+
+def main():
+    print("=" * 70)
+    print("REBUILD TRANSACTION FULL-TEXT INDEX")
+    print("=" * 70)
+    print()
+
+    try:
+        with engine.begin() as conn:
+            ensure_transactions_fts(conn)
+            rebuild_transactions_fts(conn)
+            conn.execute(text(f"INSERT INTO {TRANSACTIONS_FTS}({TRANSACTIONS_FTS}) VALUES ('optimize')"))
+            total = conn.execute(text("SELECT COUNT(*) FROM transactions")).scalar()
+    except Exception as e:
+        print(f"✗ Rebuild failed: {e}")
+        print("\nCheck that your SQLite build includes the FTS5 extension.")
+        return False
+
+    print(f"✓ Indexed {total} transactions into {TRANSACTIONS_FTS}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
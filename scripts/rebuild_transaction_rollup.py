@@ -0,0 +1,61 @@
+"""
+Backfill / repair the transaction_daily_rollup table used by long-range /transactions/summary.
+Creates the table and its sync triggers if missing, then recomputes every row from transactions.
+
+Usage:
+    python scripts/rebuild_transaction_rollup.py          # rebuild
+    python scripts/rebuild_transaction_rollup.py --check  # report drift only, exit 1 if any
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.db.session import engine
+from app.db.rollup import TRANSACTION_DAILY_ROLLUP, ensure_transaction_rollup, has_transaction_rollup, rebuild_transaction_rollup
+
+
+def snapshot(conn):
+    return set(conn.execute(text(f"SELECT * FROM {TRANSACTION_DAILY_ROLLUP}")).all())
+
+
+def main():
+    check_only = "--check" in sys.argv[1:]
+    print("=" * 70)
+    print("REBUILD TRANSACTION DAILY ROLLUP")
+    print("=" * 70)
+    print()
+
+    try:
+        with engine.begin() as conn:
+            if check_only and not has_transaction_rollup(conn):
+                # Creating it here would commit an empty table (SQLite DDL is not rolled back by pysqlite)
+                print(f"✗ {TRANSACTION_DAILY_ROLLUP} does not exist; run without --check to create it.")
+                return False
+            ensure_transaction_rollup(conn)
+            before = snapshot(conn)
+            rows = rebuild_transaction_rollup(conn)
+            after = snapshot(conn)
+            if check_only:
+                conn.rollback()
+    except Exception as e:
+        print(f"✗ Rebuild failed: {e}")
+        return False
+
+    drift = before ^ after
+    stale_keys = {row[:4] for row in drift}
+    if check_only:
+        if stale_keys:
+            print(f"✗ {len(stale_keys)} rollup bucket(s) differ from transactions; run without --check to repair.")
+            return False
+        print(f"✓ Rollup matches transactions ({len(after)} buckets)")
+        return True
+
+    print(f"✓ Rebuilt {rows} rollup buckets ({len(stale_keys)} had drifted)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
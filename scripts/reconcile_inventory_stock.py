@@ -0,0 +1,50 @@
+"""
+Verify / repair Inventory.quantity against the stock ledger.
+Expected stock = opening_quantity + signed quantities of every linked transaction
+(expense adds, earning removes, capital ignored). Installs the ledger triggers if missing.
+
+Usage:
+    python scripts/reconcile_inventory_stock.py          # report drift only, exit 1 if any
+    python scripts/reconcile_inventory_stock.py --fix    # reset drifted items to the ledger quantity
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import engine
+from app.db.stock import ensure_stock_ledger, find_drift, repair_drift
+
+
+def main():
+    fix = "--fix" in sys.argv[1:]
+    print("=" * 70)
+    print("RECONCILE INVENTORY STOCK")
+    print("=" * 70)
+    print()
+
+    try:
+        with engine.begin() as conn:
+            ensure_stock_ledger(conn)
+            drift = find_drift(conn)
+            for row in drift:
+                print(f"  {row.id:>6}  {row.name[:40]:<40} quantity={row.quantity} ledger={row.expected}")
+            if fix and drift:
+                repair_drift(conn)
+    except Exception as e:
+        print(f"✗ Reconcile failed: {e}")
+        return False
+
+    if not drift:
+        print("✓ All inventory quantities match the ledger")
+        return True
+    if fix:
+        print(f"✓ Repaired {len(drift)} item(s)")
+        return True
+    print(f"✗ {len(drift)} item(s) drifted from the ledger; run with --fix to repair.")
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import event
+from app.core.config import settings
+from app.db import session as db_session
+
+
+@pytest.fixture
+def captured_statements():
+    """Factory: `captured_statements(filter=None)` starts recording the SQL requests run.
+
+    Returns a list that fills up as statements execute; `filter(statement)` picks which
+    are kept. Recording stops when the test ends.
+    """
+    # Requests run on the async engine when DB_ASYNC=true
+    target = db_session.async_engine.sync_engine if settings.db_async else db_session.engine
+    listeners = []
+
+    def capture(filter=None):
+        captured = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if filter is None or filter(statement):
+                captured.append(statement)
+
+        event.listen(target, "before_cursor_execute", record)
+        listeners.append(record)
+        return captured
+
+    yield capture
+    for record in listeners:
+        event.remove(target, "before_cursor_execute", record)
@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: the session dependency is chosen from DB_ASYNC at import time
+ROUND_TRIP = """
+import json
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from main import app
+from app.db import session as db_session
+
+assert db_session.get_session is db_session.get_async_db
+checkouts = {"sync": 0, "async": 0}
+
+def counter(name):
+    def count(*args):
+        checkouts[name] += 1
+    return count
+
+with TestClient(app) as client:
+    # Startup DDL runs on the sync engine; count from the first request on
+    event.listen(db_session.engine, "checkout", counter("sync"))
+    event.listen(db_session.async_engine.sync_engine, "checkout", counter("async"))
+    user = client.post("/users", json={"email": "async.mode@example.com", "full_name": "Async"}).json()
+    item = client.get("/inventory?limit=1").json()[0]
+    created = client.post("/transactions", json={
+        "title": "Async", "owner_id": user["id"], "amount_per_unit": "2.50", "quantity": "4",
+        "inventory_id": item["id"],
+    })
+    tid = created.json()["id"]
+    updated = client.put(f"/transactions/{tid}", json={"title": "Async updated"})
+    listed = client.get(f"/users/{user['id']}/transactions").json()
+    deleted = client.delete(f"/transactions/{tid}")
+    print(json.dumps({
+        "created": [created.status_code, created.json()],
+        "read": client.get(f"/transactions/{tid}").json(),
+        "updated": [updated.status_code, updated.json()],
+        "listed": [row["id"] for row in listed],
+        "deleted": deleted.status_code,
+        "missing": client.get(f"/transactions/{tid}").status_code,
+        "checkouts": checkouts,
+    }))
+"""
+
+
+def test_crud_round_trip_on_the_async_session(tmp_path):
+    db_path = tmp_path / "fastapi.db"
+    shutil.copy(ROOT / "fastapi.db", db_path)
+    env = dict(
+        os.environ,
+        DB_ASYNC="true",
+        DATABASE_URL=f"sqlite:///{db_path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        INVENTORY_SNAPSHOT_INTERVAL="0",
+    )
+    result = subprocess.run([sys.executable, "-c", ROUND_TRIP], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout.strip().splitlines()[-1])
+
+    status, created = out["created"]
+    assert status == 201, created
+    assert Decimal(created["total_amount"]) == Decimal("10.00")
+    status, updated = out["updated"]
+    assert status == 200, updated
+    assert updated["title"] == "Async updated"
+    assert out["listed"] == [created["id"]]
+    assert out["deleted"] == 200
+    assert out["missing"] == 404
+    # Every request ran on the aiosqlite engine, none on the sync engine
+    assert out["checkouts"]["async"] > 0
+    assert out["checkouts"]["sync"] == 0, out["checkouts"]
@@ -0,0 +1,172 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from decimal import Decimal
+from main import app, seed, SessionLocal, Base, engine
+from sqlalchemy import select
+from app.models.user import User
+from app.models.inventory import Inventory
+
+client = TestClient(app)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Upserts need the unique shortname index, which startup cannot build while the shared
+# database holds duplicate shortnames; run against a fresh database in its own interpreter
+UPSERT = """
+import json
+from fastapi.testclient import TestClient
+from main import app
+
+with TestClient(app) as client:
+    client.post("/seed")
+    cat_id = client.get("/categories").json()[0]["id"]
+    wt_id = client.get("/weights").json()[0]["id"]
+    rows = [
+        {"name": "Upsert A", "shortname": "UPS-A", "quantity": "5", "category_id": cat_id, "weight_id": wt_id},
+        {"name": "Upsert B", "shortname": "UPS-B", "quantity": "1.5", "category_id": cat_id, "weight_id": wt_id},
+        {"name": "No Code", "quantity": "1", "category_id": cat_id, "weight_id": wt_id},
+        {"name": "Bad Category", "shortname": "UPS-C", "quantity": "1", "category_id": 999999, "weight_id": wt_id},
+    ]
+    first = client.post("/inventory/bulk", json=rows)
+    # Re-sending the catalogue updates in place and keeps ids
+    rows[0]["quantity"] = "42"
+    second = client.post("/inventory/bulk", json=rows[:2])
+    item_id = first.json()["results"][0]["id"]
+    duplicate = client.post("/inventory", json={
+        "name": "Dup", "shortname": "UPS-A", "quantity": 1, "category_id": cat_id, "weight_id": wt_id,
+    })
+    print(json.dumps({
+        "first": [first.status_code, first.json()],
+        "second": [second.status_code, second.json()],
+        "item": client.get(f"/inventory/{item_id}").json(),
+        "duplicate": duplicate.status_code,
+    }))
+"""
+
+# A database that already held duplicate shortnames when the unique index was introduced
+DUPLICATE_SHORTNAMES = """
+import json
+from fastapi.testclient import TestClient
+from main import app, seed, Base, SessionLocal, engine
+from app.models.inventory import Inventory
+from scripts.migrate_inventory_shortname_unique import dedupe_shortnames
+
+Base.metadata.create_all(bind=engine)
+with engine.begin() as conn:
+    conn.exec_driver_sql("DROP INDEX ix_inventory_shortname")
+db = SessionLocal()
+seed(db)
+template = db.query(Inventory).first()
+for name in ("Dup 1", "Dup 2"):
+    db.add(Inventory(name=name, shortname="DUP", quantity=1, category_id=template.category_id, weight_id=template.weight_id))
+db.commit()
+row = {"name": "Upsert", "shortname": "UPS-D", "quantity": "1", "category_id": template.category_id, "weight_id": template.weight_id}
+db.close()
+
+with TestClient(app) as client:
+    blocked = client.post("/inventory/bulk", json=[row])
+    with engine.begin() as conn:
+        dedupe_shortnames(conn)
+with TestClient(app) as client:
+    fixed = client.post("/inventory/bulk", json=[row])
+print(json.dumps({"blocked": [blocked.status_code, blocked.json()], "fixed": [fixed.status_code, fixed.json()]}))
+"""
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def get_refs():
+    db = SessionLocal()
+    try:
+        user = db.scalars(select(User)).first()
+        inventory = db.scalars(select(Inventory)).first()
+        return user.id, inventory.id
+    finally:
+        db.close()
+
+
+def test_bulk_transactions_report_per_row_results():
+    user_id, inventory_id = get_refs()
+    rows = [
+        {"title": "Bulk 0", "owner_id": user_id, "amount_per_unit": "2.50", "quantity": 4, "inventory_id": inventory_id},
+        {"title": "Bulk 1", "owner_id": 999999, "amount_per_unit": "1.00"},
+        {"title": "Bulk 2", "owner_id": user_id, "inventory_id": 999999},
+        {"title": "Bulk 3", "owner_id": user_id, "transaction_type": "earning", "amount_per_unit": "7.25"},
+    ]
+    r = client.post("/transactions/bulk", json=rows)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    results = body["results"]
+    assert [res["index"] for res in results] == [0, 1, 2, 3]
+    assert results[1] == {"index": 1, "id": None, "error": "Owner not found"}
+    assert results[2]["error"] == "Inventory not found"
+
+    first = client.get(f"/transactions/{results[0]['id']}").json()
+    assert first["title"] == "Bulk 0"
+    assert first["inventory_id"] == inventory_id
+    assert Decimal(first["total_amount"]) == Decimal("10.00")
+    last = client.get(f"/transactions/{results[3]['id']}").json()
+    assert last["title"] == "Bulk 3"
+    assert last["transaction_type"] == "earning"
+
+
+def run_script(script, db_path):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        INVENTORY_SNAPSHOT_INTERVAL="0",
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_bulk_inventory_upsert_by_shortname(tmp_path):
+    out = run_script(UPSERT, tmp_path / "upsert.db")
+
+    status, body = out["first"]
+    assert status == 200, body
+    results = body["results"]
+    assert results[2]["error"] == "shortname is required for upsert"
+    assert results[3]["error"] == "Category not found"
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    first_id = results[0]["id"]
+
+    status, body = out["second"]
+    assert status == 200, body
+    assert body["created"] == 0
+    assert body["updated"] == 2
+    assert body["results"][0]["id"] == first_id
+    assert Decimal(out["item"]["quantity"]) == Decimal("42")
+
+    # Shortname stays unique for single-row writes too
+    assert out["duplicate"] == 400
+
+
+def test_bulk_upsert_refuses_while_shortnames_are_duplicated(tmp_path):
+    out = run_script(DUPLICATE_SHORTNAMES, tmp_path / "duplicates.db")
+
+    status, body = out["blocked"]
+    assert status == 503, body
+    assert "migrate_inventory_shortname_unique.py" in body["detail"]
+    # Startup builds the index once the duplicates are renamed
+    status, body = out["fixed"]
+    assert status == 200, body
+    assert body["created"] == 1
@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from sqlalchemy import text
+from app.db.generations import ensure_table_generations
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_table_generations(conn)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def test_unchanged_list_answers_304_until_a_write():
+    r = client.get("/categories")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert "Last-Modified" in r.headers
+
+    r = client.get("/categories", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+    # Weak form and lists are accepted; other URLs get their own tag
+    assert client.get("/categories", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/categories?limit=1", headers={"If-None-Match": etag}).status_code == 200
+
+    created = client.post("/categories", json={"name": "ETag Probe"})
+    assert created.status_code == 201, created.text
+    r = client.get("/categories", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert "ETag Probe" in [c["name"] for c in r.json()]
+    client.delete(f"/categories/{created.json()['id']}")
+
+
+def test_cached_reference_body_matches_its_tag_after_an_outside_write():
+    first = client.get("/categories").json()[0]
+    stale = client.get("/categories").headers["ETag"]
+    # A write from another worker or a script bumps the generation but never reaches this process
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE categories SET name = 'RENAMED' WHERE id = :id"), {"id": first["id"]})
+    try:
+        r = client.get("/categories", headers={"If-None-Match": stale})
+        assert r.status_code == 200
+        assert r.json()[0]["name"] == "RENAMED"
+        assert client.get("/categories", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE categories SET name = :name WHERE id = :id"), first)
+
+
+def test_detailed_tag_tracks_related_tables():
+    inventory = client.get("/inventory").json()[0]
+    url = f"/inventory/{inventory['id']}/detailed"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # A weight write changes the nested payload's source, so the tag must change
+    r = client.post("/weights", json={"name": "ETag Weight Probe"})
+    assert r.status_code == 201, r.text
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+    client.delete(f"/weights/{r.json()['id']}")
+
+
+def generation(name):
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT generation, deferred FROM table_generations WHERE name = :name"), {"name": name}
+        ).one()
+
+
+def test_bulk_writes_bump_the_generation_once():
+    etag = client.get("/transactions?limit=5").headers["ETag"]
+    before, _ = generation("transactions")
+    rows = [{"title": f"Generation {i}", "owner_id": 1, "amount_per_unit": "1.00"} for i in range(5)]
+    r = client.post("/transactions/bulk", json=rows)
+    assert r.status_code == 200, r.text
+    assert r.json()["created"] == 5
+    assert generation("transactions") == (before + 1, 0)
+    assert client.get("/transactions?limit=5", headers={"If-None-Match": etag}).status_code == 200
+
+    # Single-row writes still bump through the triggers
+    client.put(f"/transactions/{r.json()['results'][0]['id']}", json={"title": "Generation updated"})
+    assert generation("transactions") == (before + 2, 0)
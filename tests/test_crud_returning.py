@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def keywords(statements):
+    return [statement.split(None, 1)[0].upper() for statement in statements]
+
+
+def test_create_and_update_use_a_single_returning_statement(captured_statements):
+    statements = captured_statements()
+    r = client.post("/categories", json={"name": "Returning Probe", "description": "first"})
+    assert r.status_code == 201, r.text
+    created = r.json()
+    assert created["name"] == "Returning Probe"
+    assert keywords(statements) == ["INSERT"]
+
+    statements.clear()
+    r = client.put(f"/categories/{created['id']}", json={"description": "second"})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"id": created["id"], "name": "Returning Probe", "description": "second"}
+    # one SELECT to load the row for the 404 check, then UPDATE ... RETURNING; no refresh
+    assert keywords(statements) == ["SELECT", "UPDATE"]
+
+    r = client.delete(f"/categories/{created['id']}")
+    assert r.status_code == 200, r.text
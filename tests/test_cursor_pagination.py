@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, enforce_indexes, SessionLocal, Base, engine
+from sqlalchemy import select
+from app.db.fts import ensure_transactions_fts
+from app.models.user import User
+from scripts.migrate_normalize_transaction_dates import normalize_dates
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        normalize_dates(conn)
+        enforce_indexes(conn)
+        ensure_transactions_fts(conn)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def get_user_id():
+    db = SessionLocal()
+    try:
+        user = db.scalars(select(User)).first()
+        return user.id
+    finally:
+        db.close()
+
+
+def walk(path, params):
+    """Follow X-Next-Cursor until exhausted and return all ids seen."""
+    ids = []
+    cursor = ""
+    while cursor is not None:
+        r = client.get(path, params={**params, "cursor": cursor})
+        assert r.status_code == 200, r.text
+        ids.extend(row["id"] for row in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+    return ids
+
+
+def test_transaction_cursor_pages_cover_everything_once():
+    user_id = get_user_id()
+    for day in range(1, 6):
+        payload = {
+            "title": f"Cursor Test {day}",
+            "owner_id": user_id,
+            "amount_per_unit": "1.00",
+            "date": f"2024-03-0{day}T08:00:00",
+        }
+        r = client.post("/transactions", json=payload)
+        assert r.status_code == 201, r.text
+
+    ids = walk("/transactions", {"limit": 2})
+    assert len(ids) == len(set(ids))
+    assert len(ids) == len(client.get("/transactions", params={"limit": 100000}).json())
+
+    searched = walk("/transactions/search", {"owner_id": user_id, "q": "cursor test", "limit": 2})
+    assert len(searched) >= 5
+    assert set(searched) <= set(ids)
+
+
+def test_inventory_and_user_cursor_pages():
+    inventory_ids = walk("/inventory", {"limit": 3})
+    assert inventory_ids == sorted(inventory_ids)
+    assert len(inventory_ids) == len(set(inventory_ids))
+
+    user_ids = walk("/users", {"limit": 1})
+    assert user_ids == sorted(user_ids)
+
+
+def test_invalid_cursor_is_rejected():
+    r = client.get("/transactions", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
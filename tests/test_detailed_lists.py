@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+@pytest.mark.parametrize("url", ["/transactions/detailed", "/inventory/detailed"])
+def test_detailed_lists_use_a_fixed_number_of_queries(captured_statements, url):
+    # Only the endpoint's own reads; ETag generation lookups are not part of the payload
+    selects = captured_statements(lambda s: s.startswith("SELECT") and "table_generations" not in s)
+    counts = []
+    for limit in (1, 1000):
+        selects.clear()
+        r = client.get(url, params={"limit": limit})
+        assert r.status_code == 200, r.text
+        assert len(r.json()) >= 1
+        counts.append(len(selects))
+    # base SELECT + one IN query per relationship (skipped when no row references it)
+    assert max(counts) <= 3
+
+
+def test_detailed_list_nests_relationships_and_paginates():
+    r = client.get("/transactions/detailed", params={"cursor": "", "limit": 1})
+    assert r.status_code == 200, r.text
+    first = r.json()[0]
+    assert first["owner"]["id"] == first["owner_id"]
+    assert r.headers.get("X-Next-Cursor")
+
+    item = client.get("/inventory/detailed").json()[0]
+    assert item["category"]["id"] == item["category_id"]
+    assert item["weight"]["id"] == item["weight_id"]
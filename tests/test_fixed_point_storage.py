@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+from decimal import Decimal
+from pathlib import Path
+import pytest
+from app.core.config import settings
+from app.db.types import FixedPoint
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: the storage mode is read from the environment at startup
+CAPTURE = """
+import json
+from fastapi.testclient import TestClient
+from main import app
+
+with TestClient(app) as client:
+    urls = [
+        "/transactions?limit=1000",
+        "/transactions/summary?group_by=type&group_by=inventory_id",
+        "/transactions/summary?group_by=month&start=2000-01-01&end=2100-01-01",
+        "/inventory?limit=1000",
+        "/inventory/as-of?at=2100-01-01T00:00:00",
+        "/inventory/as-of?at=2025-11-01T00:00:00",
+    ]
+    print(json.dumps({url: client.get(url).json() for url in urls}))
+"""
+
+WRITE = """
+import json
+from fastapi.testclient import TestClient
+from main import app
+
+with TestClient(app) as client:
+    item = client.get("/inventory?limit=1").json()[0]
+    created = client.post("/transactions", json={
+        "title": "Fixed point", "owner_id": 1, "transaction_type": "expense",
+        "amount_per_unit": "0.10", "quantity": "0.333", "inventory_id": item["id"],
+    }).json()
+    print(json.dumps({
+        "created": created,
+        "before": item["quantity"],
+        "after": client.get(f"/inventory/{item['id']}").json()["quantity"],
+    }))
+"""
+
+
+def run(code, db_path, fixed_point):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{db_path}",
+        FIXED_POINT_STORAGE=str(fixed_point).lower(),
+        INVENTORY_SNAPSHOT_INTERVAL="0",
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def migrate(db_path, *args):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    result = subprocess.run(
+        [sys.executable, "scripts/migrate_fixed_point.py", *args], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+@pytest.fixture
+def db_copy(tmp_path):
+    path = tmp_path / "fastapi.db"
+    shutil.copy(ROOT / "fastapi.db", path)
+    return path
+
+
+def test_fixed_point_binds_integer_units_and_loads_decimals(monkeypatch):
+    monkeypatch.setattr(settings, "fixed_point_storage", True)
+    money, quantity = FixedPoint(10, 2), FixedPoint(10, 3)
+    assert money.process_bind_param(Decimal("12.345"), None) == 1234
+    assert money.process_bind_param(Decimal("-0.01"), None) == -1
+    assert quantity.process_bind_param(2.5, None) == 2500
+    assert money.process_result_value(1250, None) == Decimal("12.50")
+    assert str(quantity.process_result_value(-333, None)) == "-0.333"
+    assert money.process_bind_param(None, None) is None
+
+
+def test_numeric_mode_passes_values_through(monkeypatch):
+    monkeypatch.setattr(settings, "fixed_point_storage", False)
+    assert FixedPoint(10, 2).process_bind_param(Decimal("1.25"), None) == Decimal("1.25")
+    assert FixedPoint(10, 3).process_result_value(1.5, None) == 1.5
+
+
+def test_migrated_database_serves_identical_responses(db_copy):
+    numeric = run(CAPTURE, db_copy, fixed_point=False)
+    migrate(db_copy)
+
+    con = sqlite3.connect(db_copy)
+    types = con.execute(
+        "SELECT DISTINCT typeof(amount), typeof(purchase_price), typeof(quantity) FROM transactions"
+    ).fetchall()
+    assert types == [("integer", "integer", "integer")]
+    assert {row[0] for row in con.execute("SELECT typeof(quantity) FROM inventory")} == {"integer"}
+    con.close()
+
+    assert json.loads(run(CAPTURE, db_copy, fixed_point=True)) == json.loads(numeric)
+
+    migrate(db_copy, "--to-decimal")
+    assert json.loads(run(CAPTURE, db_copy, fixed_point=False)) == json.loads(numeric)
+
+
+def test_app_refuses_a_database_in_the_other_format(db_copy):
+    run(CAPTURE, db_copy, fixed_point=False)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_copy}", FIXED_POINT_STORAGE="true")
+    result = subprocess.run([sys.executable, "-c", CAPTURE], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "migrate_fixed_point.py" in result.stderr
+
+
+def test_fixed_point_writes_keep_exact_totals_and_stock(db_copy):
+    run(CAPTURE, db_copy, fixed_point=False)
+    migrate(db_copy)
+    written = json.loads(run(WRITE, db_copy, fixed_point=True))
+
+    assert written["created"]["amount_per_unit"] == "0.10"
+    assert written["created"]["quantity"] == "0.333"
+    assert written["created"]["total_amount"] == "0.03"
+    assert Decimal(written["after"]) - Decimal(written["before"]) == Decimal("0.333")
+    con = sqlite3.connect(db_copy)
+    row = con.execute(
+        "SELECT amount, quantity, typeof(quantity) FROM transactions WHERE title = 'Fixed point'"
+    ).fetchone()
+    con.close()
+    assert row == (10, 333, "integer")
@@ -0,0 +1,120 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from main import app, seed, enforce_indexes, snapshot_inventory_if_due, SessionLocal, Base, engine
+from app.core.config import settings
+from app.crud.inventory import as_of_statement
+from app.db.stock import take_inventory_snapshot
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        enforce_indexes(conn)
+    yield
+
+
+def as_of(item_id, at):
+    r = client.get(f"/inventory/{item_id}/as-of", params={"at": at})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    listed, skip = [], 0
+    while page := client.get("/inventory/as-of", params={"at": at, "skip": skip, "limit": 1000}).json():
+        listed += [row for row in page if row["id"] == item_id]
+        skip += len(page)
+    assert listed == [body]
+    return Decimal(body["quantity"]), body["snapshot_at"]
+
+
+def test_as_of_combines_nearest_snapshot_with_later_transactions():
+    template = client.get("/inventory").json()[0]
+    r = client.post("/inventory", json={"name": "As-of item", "quantity": "10",
+                                        "category_id": template["category_id"], "weight_id": template["weight_id"]})
+    assert r.status_code == 201, r.text
+    item_id = r.json()["id"]
+    owner_id = client.post("/users", json={"email": "asof@example.com"}).json()["id"]
+
+    def post(kind, quantity, day):
+        r = client.post("/transactions", json={
+            "title": "As-of", "owner_id": owner_id, "inventory_id": item_id, "transaction_type": kind,
+            "amount_per_unit": "1.00", "quantity": quantity, "date": f"2024-01-{day}T12:00:00",
+        })
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    post("expense", "5", "10")
+    post("earning", "2", "20")
+    # Before the item's opening snapshot: replayed backwards from it
+    assert as_of(item_id, "2024-01-15T00:00:00") == (Decimal("15"), None)
+    assert as_of(item_id, "2024-01-01T00:00:00") == (Decimal("10"), None)
+    # An offset-aware `at` is the same instant in local time, not its wall clock read as local
+    utc = datetime(2024, 1, 15).astimezone(timezone.utc).isoformat()
+    assert as_of(item_id, utc) == (Decimal("15"), None)
+    assert client.get(f"/inventory/{item_id}/as-of", params={"at": utc}).json()["at"] == "2024-01-15T00:00:00"
+
+    with engine.begin() as conn:
+        take_inventory_snapshot(conn, datetime(2024, 1, 25))
+    assert as_of(item_id, "2024-02-01T00:00:00") == (Decimal("13"), "2024-01-25T00:00:00")
+
+    # A backdated transaction shifts the snapshots it precedes
+    backdated = post("expense", "1.5", "05")
+    assert as_of(item_id, "2024-02-01T00:00:00") == (Decimal("14.5"), "2024-01-25T00:00:00")
+    assert as_of(item_id, "2024-01-07T00:00:00") == (Decimal("11.5"), None)
+    post("earning", "4", "28")
+    assert as_of(item_id, "2024-01-26T00:00:00")[0] == Decimal("14.5")
+    assert as_of(item_id, "2024-01-30T00:00:00")[0] == Decimal("10.5")
+    assert client.put(f"/transactions/{backdated}", json={"date": "2024-01-27T00:00:00"}).status_code == 200
+    assert as_of(item_id, "2024-01-26T00:00:00")[0] == Decimal("13")
+    assert as_of(item_id, "2024-01-30T00:00:00")[0] == Decimal("10.5")
+
+    # A manual count is recorded as a snapshot; history before it is unchanged
+    assert client.put(f"/inventory/{item_id}", json={"quantity": "50"}).status_code == 200
+    quantity, snapshot_at = as_of(item_id, datetime.now().isoformat())
+    assert quantity == Decimal("50") and snapshot_at is not None
+    assert as_of(item_id, "2024-01-30T00:00:00")[0] == Decimal("10.5")
+
+    assert client.get("/inventory/999999/as-of", params={"at": "2024-01-01T00:00:00"}).status_code == 404
+    assert client.get("/inventory/as-of", params={"at": "2024-01-01T00:00:00", "limit": 1001}).status_code == 422
+
+
+def test_counts_after_at_do_not_change_the_answer():
+    template = client.get("/inventory").json()[0]
+    r = client.post("/inventory", json={"name": "Counted later", "quantity": "0",
+                                        "category_id": template["category_id"], "weight_id": template["weight_id"]})
+    assert r.status_code == 201, r.text
+    item_id = r.json()["id"]
+    owner_id = client.post("/users", json={"email": "counted-later@example.com"}).json()["id"]
+    r = client.post("/transactions", json={
+        "title": "Counted later", "owner_id": owner_id, "inventory_id": item_id, "transaction_type": "expense",
+        "amount_per_unit": "1.00", "quantity": "5", "date": "2024-01-10T12:00:00",
+    })
+    assert r.status_code == 201, r.text
+    assert as_of(item_id, "2024-01-15T00:00:00")[0] == Decimal("5")
+
+    # A stock count today corrects today's quantity, not history
+    assert client.put(f"/inventory/{item_id}", json={"quantity": "3"}).status_code == 200
+    assert as_of(item_id, "2024-01-15T00:00:00")[0] == Decimal("5")
+    assert as_of(item_id, "2024-01-05T00:00:00")[0] == Decimal("0")
+    assert as_of(item_id, datetime.now().isoformat())[0] == Decimal("3")
+
+
+def test_as_of_reads_are_index_range_scans():
+    stmt = as_of_statement(datetime(2024, 1, 30), inventory_id=1)
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = " | ".join(row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+    assert "SCAN" not in plan, plan
+
+
+def test_periodic_job_skips_when_a_recent_snapshot_exists(monkeypatch):
+    monkeypatch.setattr(settings, "inventory_snapshot_interval", 3600.0)
+    snapshot_inventory_if_due()
+    assert snapshot_inventory_if_due() == 0
@@ -1,3 +1,4 @@
+import uuid
 import pytest
 from fastapi.testclient import TestClient
 from decimal import Decimal
@@ -27,30 +28,24 @@ def get_refs():
     finally:
         db.close()
 
-def test_inventory_decimal_prices_round_trip():
+def test_inventory_decimal_quantity_round_trip():
     cat_id, wt_id = get_refs()
     payload = {
         "name": "Decimal Item",
-        "shortname": "DI",
-        "purchase_price": "12.345",
-        "selling_price": 45.6789,
-        "quantity": 10,
+        # Shortnames are unique; the shared database keeps rows from earlier runs
+        "shortname": f"DI-{uuid.uuid4().hex[:8]}",
+        "quantity": "12.345",
         "category_id": cat_id,
         "weight_id": wt_id
     }
     r = client.post("/inventory", json=payload)
     assert r.status_code == 201, r.text
     created = r.json()
-    # Expect two decimal places rounding
-    assert created["selling_price"] == str(Decimal("45.6789").quantize(Decimal("0.01")))
-    assert created["selling_price"].endswith(".68")
-    assert created["selling_price"] == "45.68"
-    assert created["purchase_price"] == "12.35"
+    assert Decimal(created["quantity"]) == Decimal("12.345")
 
     inv_id = created["id"]
-    # Update purchase_price and selling_price
-    upd = client.put(f"/inventory/{inv_id}", json={"purchase_price": 99, "selling_price": "100.1"})
+    # Update with a float and read back the stored three-decimal value
+    upd = client.put(f"/inventory/{inv_id}", json={"quantity": 0.5})
     assert upd.status_code == 200, upd.text
-    updated = upd.json()
-    assert updated["purchase_price"] == "99.00"
-    assert updated["selling_price"] == "100.10"
+    assert Decimal(upd.json()["quantity"]) == Decimal("0.5")
+    assert Decimal(client.get(f"/inventory/{inv_id}").json()["quantity"]) == Decimal("0.5")
@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from sqlalchemy import select
+from app.db.fts import ensure_transactions_fts
+from app.crud import item as crud_transaction
+from app.crud import user as crud_user
+from app.crud import inventory as crud_inventory
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.inventory import Inventory
+from app.schemas.item import TransactionReadSimple
+from app.schemas.user import UserReadSimple
+from app.schemas.inventory import InventoryReadSimple
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        ensure_transactions_fts(conn)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def dumped(schema, items):
+    return [schema.model_validate(item).model_dump(mode="json") for item in items]
+
+
+def test_list_reads_return_dicts_without_touching_the_identity_map(db):
+    results = [
+        crud_transaction.get_multi(db, limit=50),
+        crud_transaction.search(db, transaction_type="expense", limit=50),
+        crud_transaction.search_page(db, cursor="", limit=5)[0],
+        crud_user.get_multi(db),
+        crud_user.get_page(db, cursor="")[0],
+        crud_inventory.get_multi(db),
+        crud_inventory.search(db, min_quantity=0),
+        crud_inventory.get_page(db, cursor="")[0],
+    ]
+    assert all(results)
+    assert all(isinstance(row, dict) for rows in results for row in rows)
+    assert len(db.identity_map) == 0
+
+
+def test_column_rows_serialize_like_entities(db):
+    entities = db.scalars(select(Transaction).order_by(Transaction.date, Transaction.id).limit(20)).all()
+    page, _ = crud_transaction.search_page(db, cursor="", limit=20)
+    assert dumped(TransactionReadSimple, page) == dumped(TransactionReadSimple, entities)
+    assert dumped(UserReadSimple, crud_user.get_page(db, cursor="")[0]) == dumped(UserReadSimple, db.scalars(select(User).order_by(User.id).limit(100)))
+    inventory = db.scalars(select(Inventory).order_by(Inventory.id).limit(100))
+    assert dumped(InventoryReadSimple, crud_inventory.get_page(db, cursor="")[0]) == dumped(InventoryReadSimple, inventory)
+
+
+def test_keyset_pages_and_fts_search_over_column_rows():
+    owner_id = client.post("/users", json={"email": "readpath@example.com"}).json()["id"]
+    for n in range(5):
+        r = client.post("/transactions", json={
+            "title": f"Readpath parcel {n}", "owner_id": owner_id, "transaction_type": "expense",
+            "amount_per_unit": "0.15", "quantity": "0.5", "date": f"2024-07-0{n + 1}T09:00:00",
+        })
+        assert r.status_code == 201, r.text
+
+    seen, cursor = [], ""
+    while True:
+        r = client.get(f"/users/{owner_id}/transactions", params={"cursor": cursor, "limit": 2})
+        assert r.status_code == 200, r.text
+        seen.extend(row["title"] for row in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [f"Readpath parcel {n}" for n in range(5)]
+
+    found = client.get("/transactions/search", params={"q": "readpath", "owner_id": owner_id}).json()
+    assert len(found) == 5
+    # 0.15 x 0.5 = 0.075 rounds half-even to 0.08, as Decimal.quantize does
+    assert {row["total_amount"] for row in found} == {"0.08"}
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tracemalloc
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from app.core.config import settings
+from app.core.memory import capture_snapshot, memory_tracer
+from app.routers import memory as memory_routes
+from app.routers.memory import router as memory_router
+from app.routers.profiling import ProfilingMiddleware
+
+# The app is built with profiling off; wrap it here instead of reloading main
+client = TestClient(ProfilingMiddleware(app, routes=app.router.routes))
+admin_app = FastAPI()
+admin_app.include_router(memory_router)
+admin = TestClient(admin_app)
+
+retained = []
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clean_tracer(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    yield
+    memory_tracer.stop()
+    memory_tracer.snapshots.clear()
+    retained.clear()
+
+
+def grow():
+    # Stand-in for a leak: memory allocated on this line and kept alive between snapshots
+    retained.extend(bytearray(10_000) for _ in range(100))
+
+
+def test_snapshots_need_a_running_session():
+    assert admin.get("/admin/memory").json()["tracing"] is False
+    assert admin.post("/admin/memory/snapshots/before").status_code == 409
+
+    status = admin.post("/admin/memory/start?frames=3").json()
+    assert status["tracing"] and status["session"] and status["frames"] == 3
+    assert admin.post("/admin/memory/snapshots/before").status_code == 201
+    assert admin.post("/admin/memory/snapshots/before").status_code == 409
+    assert admin.post("/admin/memory/snapshots/not%20valid").status_code == 422
+
+    status = admin.post("/admin/memory/stop").json()
+    assert status["tracing"] is False
+    # Snapshots outlive the session
+    assert [s["name"] for s in status["snapshots"]] == ["before"]
+
+
+def test_snapshot_is_captured_off_the_event_loop(monkeypatch):
+    captured = []
+
+    def capture():
+        try:
+            asyncio.get_running_loop()
+            captured.append("event loop")
+        except RuntimeError:
+            captured.append("worker thread")
+        return capture_snapshot()
+
+    monkeypatch.setattr(memory_routes, "capture_snapshot", capture)
+    admin.post("/admin/memory/start")
+    assert admin.post("/admin/memory/snapshots/threaded").status_code == 201
+    assert captured == ["worker thread"]
+
+
+def test_diff_ranks_the_growing_allocation_site_first():
+    admin.post("/admin/memory/start")
+    admin.post("/admin/memory/snapshots/before")
+    grow()
+    admin.post("/admin/memory/snapshots/after")
+
+    r = admin.get("/admin/memory/diff?base=before&target=after&limit=5")
+    assert r.status_code == 200
+    top = r.json()[0]
+    assert os.path.basename(top["file"]) == "test_memory_profiling.py"
+    assert top["line"] == grow.__code__.co_firstlineno + 2
+    assert top["size_diff"] >= 1_000_000 and top["count_diff"] >= 100
+
+    by_file = admin.get("/admin/memory/diff?base=before&target=after&group_by=filename").json()
+    assert by_file[0]["line"] is None and by_file[0]["file"] == top["file"]
+
+    assert admin.get("/admin/memory/diff?base=before&target=missing").status_code == 404
+    assert admin.get("/admin/memory/snapshots/after/top?limit=3").status_code == 200
+    assert admin.delete("/admin/memory/snapshots/after").status_code == 204
+    assert admin.get("/admin/memory/snapshots/after/top").status_code == 404
+
+
+def test_snapshot_limit_drops_the_oldest(monkeypatch):
+    monkeypatch.setattr(settings, "memory_snapshot_limit", 2)
+    admin.post("/admin/memory/start")
+    for name in ("one", "two", "three"):
+        admin.post(f"/admin/memory/snapshots/{name}")
+    assert [s["name"] for s in admin.get("/admin/memory/snapshots").json()] == ["two", "three"]
+
+
+def test_profiled_requests_report_peak_memory():
+    r = client.get("/transactions?limit=500", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    assert int(r.headers["X-Memory-Peak"]) > 0
+    # Tracing was started for the request only
+    assert not tracemalloc.is_tracing()
+
+    latest = admin.get("/admin/memory/requests").json()[0]
+    assert latest["route"] == "/transactions" and latest["profile"] == r.headers["X-Profile-Id"]
+    assert latest["peak_bytes"] >= int(r.headers["X-Memory-Peak"])
+
+    assert "X-Memory-Peak" not in client.get("/transactions?limit=5").headers
+
+
+def test_measured_request_keeps_an_admin_session_running():
+    admin.post("/admin/memory/start")
+    client.get("/transactions?limit=5", headers={"X-Profile": "1"})
+    assert tracemalloc.is_tracing()
+    assert admin.post("/admin/memory/snapshots/after-request").status_code == 201
@@ -0,0 +1,95 @@
+import re
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from app.crud import item as crud_transaction
+from app.db.fts import ensure_transactions_fts
+from app.db.generations import ensure_table_generations
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        ensure_transactions_fts(conn)
+        ensure_table_generations(conn)
+    yield
+
+
+def scrape():
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return r.text
+
+
+def sample(text, name, **labels):
+    """Value of the series `name{labels}`, or 0 when it has not been exported yet."""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(wanted)}\}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_counted_per_route_template():
+    before = scrape()
+    client.get("/transactions/search?owner_id=1")
+    client.get("/transactions/search?q=coke")
+    client.get("/inventory/search?q=lpg")
+    client.get("/transactions/999999")
+    after = scrape()
+
+    search = dict(method="GET", route="/transactions/search", status="200")
+    assert sample(after, "http_requests_total", **search) - sample(before, "http_requests_total", **search) == 2
+    inventory = dict(method="GET", route="/inventory/search", status="200")
+    assert sample(after, "http_requests_total", **inventory) - sample(before, "http_requests_total", **inventory) == 1
+    # Path parameters collapse into the template
+    missing = dict(method="GET", route="/transactions/{transaction_id}", status="404")
+    assert sample(after, "http_requests_total", **missing) >= 1
+    assert "/transactions/999999" not in after
+
+
+def test_latency_histogram_is_cumulative():
+    client.get("/transactions/search?owner_id=1")
+    text = scrape()
+    labels = 'method="GET",route="/transactions/search"'
+    buckets = [float(value) for value in re.findall(
+        rf'^http_request_duration_seconds_bucket\{{{re.escape(labels)},le="[^"]+"\}} (\S+)$', text, re.MULTILINE
+    )]
+    assert buckets == sorted(buckets)
+    count = sample(text, "http_request_duration_seconds_count", method="GET", route="/transactions/search")
+    assert buckets[-1] == count > 0
+    assert sample(text, "http_request_duration_seconds_sum", method="GET", route="/transactions/search") > 0
+
+
+def test_unknown_paths_share_one_label():
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+    text = scrape()
+    assert sample(text, "http_requests_total", method="GET", route="<unmatched>", status="404") >= 2
+    assert "/no/such/path" not in text
+
+
+def test_in_flight_errors_pool_and_thread_pool(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(crud_transaction, "get_multi", broken)
+    failing = TestClient(app, raise_server_exceptions=False)
+    assert failing.get("/transactions").status_code == 500
+
+    text = scrape()
+    assert sample(text, "http_request_errors_total", method="GET", route="/transactions") >= 1
+    assert sample(text, "http_requests_total", method="GET", route="/transactions", status="500") >= 1
+    # The scrape itself is the only request in flight
+    assert sample(text, "http_requests_in_progress", method="GET", route="/metrics") == 1
+    assert sample(text, "http_requests_in_progress", method="GET", route="/transactions") == 0
+    assert sample(text, "db_pool_checkouts_total", engine="sync") > 0
+    assert int(re.search(r"^threadpool_max_threads (\d+)$", text, re.MULTILINE).group(1)) > 0
+    assert re.search(r"^threadpool_busy_threads \d+$", text, re.MULTILINE)
+    assert re.search(r"^threadpool_waiting_tasks \d+$", text, re.MULTILINE)
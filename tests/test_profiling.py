@@ -0,0 +1,104 @@
+import os
+import pstats
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from app.core.config import settings
+from app.core import profiling
+from app.routers.profiling import ProfilingMiddleware, router as profiles_router
+
+# The app is built with profiling off; wrap it here instead of reloading main
+client = TestClient(ProfilingMiddleware(app, routes=app.router.routes))
+admin_app = FastAPI()
+admin_app.include_router(profiles_router)
+admin = TestClient(admin_app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profile_format", "pstats")
+    monkeypatch.setattr(settings, "profile_sample_rates", {})
+    return tmp_path
+
+
+def test_requests_are_not_profiled_by_default(profile_dir):
+    r = client.get("/transactions?limit=5")
+    assert r.status_code == 200
+    assert "X-Profile-Id" not in r.headers
+    assert not os.listdir(profile_dir)
+
+
+def test_header_profiles_one_request_including_the_worker_thread(profile_dir):
+    r = client.get("/transactions/search?owner_id=1", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    name = r.headers["X-Profile-Id"]
+    assert name.endswith(".prof") and "GET-transactions_search" in name
+
+    stats = pstats.Stats(str(profile_dir / name))
+    functions = {(os.path.basename(filename), function) for filename, _, function in stats.stats}
+    # The CRUD call runs in a worker thread (or greenlet in async mode) and must be in the profile
+    assert ("item.py", "search") in functions
+
+
+def test_query_parameter_selects_the_collapsed_format(profile_dir):
+    r = client.get("/transactions/search?q=coke&profile=collapsed")
+    assert r.status_code == 200
+    name = r.headers["X-Profile-Id"]
+    assert name.endswith(".collapsed")
+    lines = (profile_dir / name).read_text().splitlines()
+    assert all(re.fullmatch(r"\S.* \d+", line) for line in lines)
+
+
+def test_one_in_n_requests_to_a_route_are_sampled(profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "profile_sample_rates", {"/inventory/search": 3})
+    profiled = [bool(client.get("/inventory/search").headers.get("X-Profile-Id")) for _ in range(6)]
+    assert profiled == [False, False, True, False, False, True]
+    # Other routes are not sampled
+    assert "X-Profile-Id" not in client.get("/transactions?limit=1").headers
+
+
+def test_admin_lists_and_downloads_profiles(profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "profile_keep", 2)
+    names = [client.get("/transactions?limit=1", headers={"X-Profile": "1"}).headers["X-Profile-Id"] for _ in range(3)]
+
+    listed = admin.get("/admin/profiles").json()
+    # Older files beyond profile_keep are pruned
+    assert sorted(p["name"] for p in listed) == sorted(names[1:])
+    assert all(p["format"] == "pstats" and p["size"] > 0 for p in listed)
+
+    latest = admin.get("/admin/profiles/latest")
+    assert latest.status_code == 200
+    assert latest.content == (profile_dir / listed[0]["name"]).read_bytes()
+    assert admin.get(f"/admin/profiles/{names[1]}").status_code == 200
+    assert admin.get(f"/admin/profiles/{names[0]}").status_code == 404
+    assert admin.get("/admin/profiles/..%2F..%2Fmain.py").status_code == 404
+
+
+def test_latest_is_404_without_profiles():
+    assert admin.get("/admin/profiles").json() == []
+    assert admin.get("/admin/profiles/latest").status_code == 404
+
+
+def test_no_second_cprofile_where_it_covers_all_threads(monkeypatch):
+    # Python 3.12+ allows a single active profiler, which already sees worker threads
+    monkeypatch.setattr(profiling, "PER_THREAD_CPROFILE", False)
+    profile = profiling.CProfileRequestProfile()
+    profile.start()
+    try:
+        assert profile.run(sum, [1, 2]) == 3
+    finally:
+        profile.stop()
+    assert profile.workers == []
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import text
+from fastapi.testclient import TestClient
+from main import app, seed, warm_reference_cache, SessionLocal, Base, engine
+from app.db.generations import ensure_table_generations
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        ensure_table_generations(conn)
+    warm_reference_cache()
+    yield
+
+
+def test_reference_reads_and_inventory_validation_skip_the_database(captured_statements):
+    statements = captured_statements()
+    categories = client.get("/categories").json()
+    weights = client.get("/weights").json()
+    assert categories and weights
+    assert client.get(f"/categories/{categories[0]['id']}").json()["name"] == categories[0]["name"]
+
+    payload = {"name": "Cache Probe", "quantity": "1", "category_id": categories[0]["id"], "weight_id": weights[0]["id"]}
+    r = client.post("/inventory", json=payload)
+    assert r.status_code == 201, r.text
+    assert not any("FROM categories" in s or "FROM weights" in s for s in statements)
+    client.delete(f"/inventory/{r.json()['id']}")
+
+    r = client.post("/inventory", json={**payload, "category_id": 999999})
+    assert r.status_code == 404
+
+
+def test_writes_invalidate_the_cache():
+    r = client.post("/categories", json={"name": "Cache Invalidation Probe"})
+    assert r.status_code == 201, r.text
+    category_id = r.json()["id"]
+    assert category_id in [c["id"] for c in client.get("/categories", params={"limit": 1000}).json()]
+
+    r = client.put(f"/categories/{category_id}", json={"description": "renamed"})
+    assert r.status_code == 200, r.text
+    assert client.get(f"/categories/{category_id}").json()["description"] == "renamed"
+
+    r = client.delete(f"/categories/{category_id}")
+    assert r.status_code == 200, r.text
+    assert client.get(f"/categories/{category_id}").status_code == 404
+
+
+def test_writes_outside_the_api_are_seen_by_the_next_read():
+    # Another worker or a script: no invalidate() on this process's cache
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO categories (name) VALUES ('Written Elsewhere')"))
+        category_id = conn.execute(text("SELECT max(id) FROM categories")).scalar()
+    assert client.get(f"/categories/{category_id}").json()["name"] == "Written Elsewhere"
+    weight_id = client.get("/weights").json()[0]["id"]
+    payload = {"name": "Elsewhere Probe", "quantity": "1", "category_id": category_id, "weight_id": weight_id}
+    r = client.post("/inventory", json=payload)
+    assert r.status_code == 201, r.text
+    client.delete(f"/inventory/{r.json()['id']}")
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM categories WHERE id = :id"), {"id": category_id})
+    assert client.get(f"/categories/{category_id}").status_code == 404
+    assert category_id not in [c["id"] for c in client.get("/categories", params={"limit": 1000}).json()]
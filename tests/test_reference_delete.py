@@ -0,0 +1,39 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+@pytest.mark.parametrize("resource", ["categories", "weights"])
+def test_deleting_referenced_reference_data_is_a_conflict(resource):
+    suffix = uuid.uuid4().hex[:8]
+    ref_id = client.post(f"/{resource}", json={"name": f"Delete {suffix}"}).json()["id"]
+    other = {"categories": "weights", "weights": "categories"}[resource]
+    other_id = client.get(f"/{other}").json()[0]["id"]
+    keys = {"categories": "category_id", "weights": "weight_id"}
+    item = client.post("/inventory", json={
+        "name": f"Uses {suffix}", "shortname": f"DEL-{suffix}", "quantity": 1,
+        keys[resource]: ref_id, keys[other]: other_id,
+    })
+    assert item.status_code == 201, item.text
+
+    r = client.delete(f"/{resource}/{ref_id}")
+    assert r.status_code == 409, r.text
+    assert client.get(f"/{resource}/{ref_id}").status_code == 200
+
+    # Once nothing references it the delete goes through
+    assert client.delete(f"/inventory/{item.json()['id']}").status_code == 200
+    assert client.delete(f"/{resource}/{ref_id}").status_code == 200
+    assert client.get(f"/{resource}/{ref_id}").status_code == 404
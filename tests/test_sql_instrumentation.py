@@ -0,0 +1,78 @@
+import logging
+import re
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from app.core.config import settings
+from app.db.generations import ensure_table_generations
+from app.db.session import QueryStats, query_stats
+
+client = TestClient(app)
+
+TIMING = re.compile(r'db;dur=(?P<db>[\d.]+);desc="queries=(?P<count>\d+)", total;dur=(?P<total>[\d.]+)')
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        ensure_table_generations(conn)
+    yield
+
+
+def timing(response):
+    match = TIMING.fullmatch(response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return int(match["count"]), float(match["db"]), float(match["total"])
+
+
+def test_server_timing_counts_the_request_statements():
+    r = client.get("/transactions?limit=5")
+    assert r.status_code == 200
+    count, db_ms, total_ms = timing(r)
+    # table_generations lookup for the ETag + the page itself
+    assert count == 2
+    assert 0 < db_ms <= total_ms
+
+    cached = client.get("/transactions?limit=5", headers={"If-None-Match": r.headers["ETag"]})
+    assert cached.status_code == 304
+    assert timing(cached)[0] == 1
+
+
+def test_requests_without_sql_report_zero():
+    r = client.get("/health")
+    assert timing(r)[:2] == (0, 0.0)
+
+
+def test_statements_outside_a_request_are_not_counted():
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1").all()
+    finally:
+        query_stats.reset(token)
+    assert stats.count == 1
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1").all()
+    assert stats.count == 1
+
+
+def test_slow_queries_are_logged_with_their_plan(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.db.session"):
+        r = client.get("/transactions/search?owner_id=1&limit=2")
+    assert r.status_code == 200
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    assert any("FROM transactions" in message and "ix_transactions_owner_id" in message for message in slow), slow
+
+
+def test_slow_query_log_can_be_disabled(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    with caplog.at_level(logging.WARNING, logger="app.db.session"):
+        client.get("/transactions?limit=2")
+    assert not [record for record in caplog.records if record.getMessage().startswith("Slow query")]
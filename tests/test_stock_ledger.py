@@ -0,0 +1,78 @@
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from sqlalchemy import text
+from app.db.stock import find_drift, repair_drift
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def stock(inventory_id):
+    r = client.get(f"/inventory/{inventory_id}")
+    assert r.status_code == 200, r.text
+    return Decimal(r.json()["quantity"])
+
+
+def post_transaction(owner_id, inventory_id, kind, quantity):
+    r = client.post("/transactions", json={
+        "title": "Stock", "owner_id": owner_id, "inventory_id": inventory_id, "transaction_type": kind,
+        "amount_per_unit": "1.00", "quantity": quantity, "date": "2024-05-01T10:00:00",
+    })
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def drifted(inventory_id):
+    with engine.connect() as conn:
+        return [row for row in find_drift(conn) if row.id == inventory_id]
+
+
+def test_transactions_move_stock_and_reconcile_repairs_drift():
+    template = client.get("/inventory").json()[0]
+    r = client.post("/inventory", json={"name": "Ledger item", "quantity": "10",
+                                        "category_id": template["category_id"], "weight_id": template["weight_id"]})
+    assert r.status_code == 201, r.text
+    item_id = r.json()["id"]
+    r = client.post("/users", json={"email": "ledger@example.com"})
+    assert r.status_code == 201, r.text
+    owner_id = r.json()["id"]
+
+    purchase = post_transaction(owner_id, item_id, "expense", "2.5")
+    assert stock(item_id) == Decimal("12.5")
+    sale = post_transaction(owner_id, item_id, "earning", "4")
+    post_transaction(owner_id, item_id, "capital", "3")
+    assert stock(item_id) == Decimal("8.5")
+
+    # Updates apply the difference; unlinking or deleting reverses the movement
+    assert client.put(f"/transactions/{sale}", json={"quantity": "1"}).status_code == 200
+    assert stock(item_id) == Decimal("11.5")
+    assert client.put(f"/transactions/{sale}", json={"transaction_type": "expense"}).status_code == 200
+    assert stock(item_id) == Decimal("13.5")
+    assert client.delete(f"/transactions/{purchase}").status_code == 200
+    assert stock(item_id) == Decimal("11")
+
+    # A manual count becomes the new baseline rather than drift
+    assert client.put(f"/inventory/{item_id}", json={"quantity": "20"}).status_code == 200
+    assert drifted(item_id) == []
+    post_transaction(owner_id, item_id, "earning", "0.125")
+    assert stock(item_id) == Decimal("19.875")
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE inventory SET quantity = 7 WHERE id = :id"), {"id": item_id})
+    [row] = drifted(item_id)
+    assert Decimal(str(row.expected)) == Decimal("19.875")
+    with engine.begin() as conn:
+        assert repair_drift(conn) >= 1
+    assert drifted(item_id) == []
+    assert stock(item_id) == Decimal("19.875")
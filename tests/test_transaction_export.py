@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import pytest
+from fastapi.testclient import TestClient
+from main import app, Base, engine
+from app.core.config import settings
+from scripts.migrate_normalize_transaction_dates import normalize_dates
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        normalize_dates(conn)
+    yield
+
+
+@pytest.fixture(scope="module")
+def owner_id():
+    r = client.post("/users", json={"email": "export@example.com", "full_name": "Export"})
+    assert r.status_code == 201, r.text
+    user_id = r.json()["id"]
+    for day in range(1, 6):
+        r = client.post("/transactions", json={
+            "title": f"Export {day}",
+            "owner_id": user_id,
+            "amount_per_unit": "1.25",
+            "quantity": day,
+            "date": f"2025-04-0{day}T09:00:00",
+        })
+        assert r.status_code == 201, r.text
+    yield user_id
+    client.delete(f"/users/{user_id}")
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Force several chunks per export
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+
+
+def test_ndjson_export_streams_every_matching_row(owner_id):
+    r = client.get("/transactions/export", params={"owner_id": owner_id})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Export {day}" for day in range(1, 6)]
+    assert rows[2]["total_amount"] == "3.75"
+
+    r = client.get("/transactions/export", params={"owner_id": owner_id, "date_from": "2025-04-04T00:00:00"})
+    assert len(r.text.splitlines()) == 2
+
+
+def test_csv_export_has_header_and_rows(owner_id):
+    r = client.get("/transactions/export", params={"owner_id": owner_id, "format": "csv"})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 5
+    assert rows[0]["title"] == "Export 1"
+    assert rows[0]["owner_id"] == str(owner_id)
+
+    r = client.get("/transactions/export", params={"owner_id": 999999, "format": "csv"})
+    assert r.text.strip() == ",".join(csv.DictReader(io.StringIO(r.text)).fieldnames)
+    assert client.get("/transactions/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, seed, SessionLocal, Base, engine
+from sqlalchemy import select
+from app.crud import item as crud_transaction
+from app.db.fts import ensure_transactions_fts, match_query
+from app.db.totals import ensure_total_amount_column
+from app.models.user import User
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_transactions_fts(conn)
+        ensure_total_amount_column(conn)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+
+
+def get_user_id():
+    db = SessionLocal()
+    try:
+        user = db.scalars(select(User)).first()
+        return user.id
+    finally:
+        db.close()
+
+
+def test_match_query_quotes_words_as_prefixes():
+    assert match_query("Coke crate") == '"Coke"* "crate"*'
+    assert match_query('AND "OR" NEAR(') == '"AND"* "OR"* "NEAR"*'
+    assert match_query("%%") is None
+
+
+def search_plan(q):
+    stmt, _ = crud_transaction.search_statement(q=q)
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def test_keyword_search_uses_index_and_tracks_updates():
+    # The keyword is answered by the FTS table, never by scanning transactions
+    plan = search_plan("refillable crate")
+    assert any("transactions_fts" in detail for detail in plan), plan
+    assert not any(detail.startswith("SCAN transactions") and "transactions_fts" not in detail for detail in plan), plan
+
+    user_id = get_user_id()
+    payload = {
+        "title": "Zanzibar delivery",
+        "description": "Crate of refillable bottles",
+        "owner_id": user_id,
+        "transaction_type": "expense",
+        "amount_per_unit": "10.00",
+    }
+    r = client.post("/transactions", json=payload)
+    assert r.status_code == 201, r.text
+    created_id = r.json()["id"]
+
+    # Prefix match on title and case-insensitive match on description
+    ids = [t["id"] for t in client.get("/transactions/search?q=zanzib").json()]
+    assert created_id in ids
+    ids = [t["id"] for t in client.get("/transactions/search?q=REFILLABLE crate").json()]
+    assert created_id in ids
+
+    # Triggers keep the index in sync with updates and deletes
+    r = client.put(f"/transactions/{created_id}", json={"title": "Quixotic delivery"})
+    assert r.status_code == 200, r.text
+    assert created_id not in [t["id"] for t in client.get("/transactions/search?q=zanzibar").json()]
+    assert created_id in [t["id"] for t in client.get("/transactions/search?q=quixotic").json()]
+
+    r = client.delete(f"/transactions/{created_id}")
+    assert r.status_code == 200, r.text
+    assert created_id not in [t["id"] for t in client.get("/transactions/search?q=quixotic").json()]
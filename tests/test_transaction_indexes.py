@@ -0,0 +1,35 @@
+import pytest
+from main import Base, engine, enforce_indexes
+from app.db.fts import ensure_transactions_fts
+from app.db.totals import ensure_total_amount_column
+from scripts.index_advisor import SAMPLE_FILTERS, explain, is_full_scan, is_ordered_walk, search_shapes, sort_shapes
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        enforce_indexes(conn)
+        ensure_transactions_fts(conn)
+        ensure_total_amount_column(conn)
+    yield
+
+
+def test_every_search_shape_avoids_a_full_scan():
+    flagged = {}
+    with engine.connect() as conn:
+        for label, stmt in search_shapes(list(SAMPLE_FILTERS)):
+            plan = explain(conn, stmt)
+            assert plan, label
+            if any(is_full_scan(detail) for detail in plan):
+                flagged[label] = plan
+    assert not flagged, flagged
+
+
+def test_sort_shapes_walk_an_index_in_order():
+    flagged = {}
+    with engine.connect() as conn:
+        for label, stmt in sort_shapes():
+            plan = explain(conn, stmt)
+            if not is_ordered_walk(label, plan) and any(is_full_scan(detail) for detail in plan):
+                flagged[label] = plan
+    assert not flagged, flagged
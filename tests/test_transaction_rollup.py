@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, Base, engine
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.rollup import ensure_transaction_rollup, rebuild_transaction_rollup
+from scripts.migrate_normalize_transaction_dates import normalize_dates
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        normalize_dates(conn)
+        ensure_transaction_rollup(conn)
+    yield
+
+
+def summary(monkeypatch, use_rollup, **params):
+    monkeypatch.setattr(settings, "transaction_rollup_enabled", use_rollup)
+    r = client.get("/transactions/summary", params=params)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def assert_rollup_matches_raw(monkeypatch, **params):
+    assert summary(monkeypatch, True, **params) == summary(monkeypatch, False, **params)
+
+
+def rollup_rows():
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT * FROM transaction_daily_rollup ORDER BY 1, 2, 3, 4")).all()
+
+
+def test_rollup_tracks_writes_and_matches_raw_aggregation(monkeypatch):
+    r = client.post("/users", json={"email": "rollup@example.com"})
+    assert r.status_code == 201, r.text
+    owner_id = r.json()["id"]
+    ids = []
+    for day, kind, amount in [("01", "expense", "1.15"), ("01", "expense", "2.00"), ("15", "earning", "9.99"), ("28", "capital", "0.05")]:
+        r = client.post("/transactions", json={
+            "title": "Rollup", "owner_id": owner_id, "transaction_type": kind,
+            "amount_per_unit": amount, "quantity": "1.5", "date": f"2024-02-{day}T12:30:00",
+        })
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    grouped = {"owner_id": owner_id, "group_by": ["day", "type", "inventory_id"]}
+    assert_rollup_matches_raw(monkeypatch, **grouped)
+
+    # Update moves the row to another day/type; delete removes its contribution
+    assert client.put(f"/transactions/{ids[1]}", json={"date": "2024-03-02T08:00:00", "transaction_type": "earning"}).status_code == 200
+    assert client.delete(f"/transactions/{ids[0]}").status_code == 200
+    assert_rollup_matches_raw(monkeypatch, **grouped)
+    # Long range with partial first/last days: rollup for whole days + raw edges
+    assert_rollup_matches_raw(monkeypatch, owner_id=owner_id, group_by=["month"],
+                              date_from="2024-02-15T13:00:00", date_to="2024-03-20T10:00:00")
+    assert_rollup_matches_raw(monkeypatch, group_by=["week", "type"])
+
+    # Incremental maintenance equals a full rebuild
+    before = rollup_rows()
+    with engine.begin() as conn:
+        rebuild_transaction_rollup(conn)
+    assert rollup_rows() == before
+
+    # Cascaded deletes (user -> transactions) are tracked too
+    assert client.delete(f"/users/{owner_id}").status_code == 200
+    assert not [row for row in rollup_rows() if row.owner_id == owner_id]
@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from main import app, Base, engine
+from scripts.migrate_normalize_transaction_dates import normalize_dates
+
+client = TestClient(app)
+
+ROWS = [
+    # date, type, amount_per_unit, quantity -> total_amount
+    ("2025-05-05T08:00:00", "expense", "0.15", "0.100"),   # 0.015 -> 0.02 (half-even)
+    ("2025-05-07T08:00:00", "expense", "10.00", "3"),      # 30.00
+    ("2025-05-12T08:00:00", "earning", "2.50", "2"),       # 5.00
+    ("2025-06-01T08:00:00", "capital", "1.10", "3"),       # 3.30 (a Sunday)
+]
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        normalize_dates(conn)
+    yield
+
+
+@pytest.fixture(scope="module")
+def owner_id():
+    r = client.post("/users", json={"email": "summary@example.com", "full_name": "Summary"})
+    assert r.status_code == 201, r.text
+    user_id = r.json()["id"]
+    for date, kind, amount, quantity in ROWS:
+        r = client.post("/transactions", json={
+            "title": "Summary", "owner_id": user_id, "date": date,
+            "transaction_type": kind, "amount_per_unit": amount, "quantity": quantity,
+        })
+        assert r.status_code == 201, r.text
+    yield user_id
+    client.delete(f"/users/{user_id}")
+
+
+def summary(owner_id, *group_by):
+    r = client.get("/transactions/summary", params={"owner_id": owner_id, "group_by": list(group_by)})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_totals_match_per_row_amounts(owner_id):
+    [total] = summary(owner_id)
+    assert total["count"] == 4
+    assert Decimal(total["total_amount"]) == Decimal("38.32")
+    assert Decimal(total["quantity"]) == Decimal("8.100")
+    assert Decimal(total["average_amount"]) == Decimal("9.58")
+
+    rows = client.get("/transactions/search", params={"owner_id": owner_id}).json()
+    assert sum(Decimal(row["total_amount"]) for row in rows) == Decimal(total["total_amount"])
+
+
+def test_group_by_period_and_type(owner_id):
+    months = {row["period"]: Decimal(row["total_amount"]) for row in summary(owner_id, "month")}
+    assert months == {"2025-05": Decimal("35.02"), "2025-06": Decimal("3.30")}
+
+    weeks = {row["period"]: row["count"] for row in summary(owner_id, "week")}
+    assert weeks == {"2025-05-05": 2, "2025-05-12": 1, "2025-05-26": 1}
+
+    by_type = {(row["period"], row["transaction_type"]): Decimal(row["total_amount"]) for row in summary(owner_id, "day", "type")}
+    assert by_type[("2025-05-07", "expense")] == Decimal("30.00")
+    assert by_type[("2025-06-01", "capital")] == Decimal("3.30")
+    assert all(row["owner_id"] is None for row in summary(owner_id, "type"))
+
+
+def test_rejects_two_periods(owner_id):
+    r = client.get("/transactions/summary", params={"group_by": ["day", "month"]})
+    assert r.status_code == 400
+    assert client.get("/transactions/summary", params={"group_by": "year"}).status_code == 422
+
+
+def test_offset_aware_bounds_are_converted_to_local_time(owner_id):
+    # 07:00 local on 2025-05-07, written with an offset whose wall clock reads 12:00
+    local = datetime(2025, 5, 7, 7).astimezone()
+    shifted = local.astimezone(timezone(local.utcoffset() + timedelta(hours=5)))
+    params = {"owner_id": owner_id, "date_from": shifted.isoformat(), "date_to": "2025-05-07T23:59:59"}
+    r = client.get("/transactions/summary", params=params)
+    assert r.status_code == 200, r.text
+    # The 08:00 row is inside the range; reading 12:00 as local time would drop it
+    assert [row["count"] for row in r.json()] == [1]
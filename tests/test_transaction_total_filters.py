@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+from decimal import Decimal
+from main import app, seed, SessionLocal, Base, engine, enforce_indexes
+from sqlalchemy import select
+from app.crud import item as crud_transaction
+from app.crud.pagination import keyset_statement
+from app.models.transaction import Transaction
+from app.models.user import User
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        enforce_indexes(conn)
+    user_id = get_user_id()
+    # Totals 0.03 (0.10 x 0.333 = 0.0333), 12.35 (4.94 x 2.5), 12.36 (12.36 x 1)
+    for amount, quantity in (("0.10", "0.333"), ("4.94", "2.5"), ("12.36", "1")):
+        r = client.post("/transactions", json={
+            "title": "Total filter", "owner_id": user_id, "amount_per_unit": amount, "quantity": quantity,
+        })
+        assert r.status_code == 201, r.text
+    yield
+
+
+def get_user_id():
+    db = SessionLocal()
+    try:
+        return db.scalars(select(User)).first().id
+    finally:
+        db.close()
+
+
+def totals(rows):
+    return [Decimal(row["total_amount"]) for row in rows]
+
+
+def test_generated_column_matches_the_python_total():
+    db = SessionLocal()
+    try:
+        for obj in db.scalars(select(Transaction)):
+            assert Decimal(obj.total_amount_cents).scaleb(-2) == obj.total_amount
+    finally:
+        db.close()
+
+
+def test_total_range_is_inclusive_in_cents():
+    r = client.get("/transactions/search?q=Total filter&min_total=12.35&max_total=12.355")
+    assert r.status_code == 200, r.text
+    assert totals(r.json()) == [Decimal("12.35")]
+
+    r = client.get("/transactions/search?q=Total filter&min_total=0.021&max_total=12.36&sort=total_amount")
+    assert totals(r.json()) == [Decimal("0.03"), Decimal("12.35"), Decimal("12.36")]
+
+
+@pytest.mark.parametrize("sort", ["total_amount", "-total_amount", "date", "-date"])
+def test_sorted_search_and_cursor_pages_agree(sort):
+    r = client.get(f"/transactions/search?sort={sort}&limit=1000")
+    assert r.status_code == 200, r.text
+    expected = [row["id"] for row in r.json()]
+    key = "total_amount" if sort.endswith("total_amount") else "date"
+    values = [Decimal(row[key]) if key == "total_amount" else row[key] for row in r.json()]
+    assert values == sorted(values, reverse=sort.startswith("-"))
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get(f"/transactions/search?sort={sort}&limit=7&cursor={cursor}")
+        assert page.status_code == 200, page.text
+        assert all("total_amount_cents" not in row for row in page.json())
+        seen.extend(row["id"] for row in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+    assert seen == expected
+
+
+def test_total_sorts_need_no_sort_step():
+    stmt, _ = crud_transaction.search_statement(owner_id=get_user_id())
+    keys, descending = crud_transaction.SEARCH_SORTS["-total_amount"]
+    page = keyset_statement(stmt, keys=keys, cursor="", limit=50, descending=descending)
+    sql = str(page.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    assert any("ix_transactions_owner_id_total_amount_cents" in detail for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app, Base, engine
+from scripts.migrate_normalize_transaction_dates import normalize_dates
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        normalize_dates(conn)
+    yield
+
+
+@pytest.fixture(scope="module")
+def user_with_history():
+    r = client.post("/users", json={"email": "history@example.com", "full_name": "History"})
+    assert r.status_code == 201, r.text
+    user_id = r.json()["id"]
+    for day in range(1, 6):
+        r = client.post("/transactions", json={
+            "title": f"History {day}",
+            "owner_id": user_id,
+            "date": f"2025-03-0{day}T10:00:00",
+        })
+        assert r.status_code == 201, r.text
+    yield user_id
+    client.delete(f"/users/{user_id}")
+
+
+def test_embedded_transactions_are_opt_in_and_bounded(user_with_history):
+    r = client.get(f"/users/{user_with_history}")
+    assert r.status_code == 200, r.text
+    assert r.json()["transactions"] == []
+
+    r = client.get(f"/users/{user_with_history}", params={"include_transactions": 2})
+    assert [t["title"] for t in r.json()["transactions"]] == ["History 5", "History 4"]
+
+    assert client.get(f"/users/{user_with_history}", params={"include_transactions": 100000}).status_code == 422
+
+
+def test_user_transactions_endpoint_pages_with_cursor(user_with_history):
+    titles = []
+    cursor = ""
+    while True:
+        r = client.get(f"/users/{user_with_history}/transactions", params={"limit": 2, "cursor": cursor})
+        assert r.status_code == 200, r.text
+        titles.extend(t["title"] for t in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert titles == [f"History {day}" for day in range(1, 6)]
+
+    assert client.get("/users/999999/transactions").status_code == 404